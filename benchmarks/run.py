@@ -0,0 +1,107 @@
+"""Runs the benchmarks against the local fixture server (requires python 3.4 or newer).
+
+    python -m benchmarks.run
+    python -m benchmarks.run --only find --json results.json
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import argparse
+import gc
+import io
+import json
+import tracemalloc
+from timeit import default_timer as timer
+from prettytable import PrettyTable
+from steemengine.api import Api
+from steemengine.sweep import plan_sweep
+from steemengine.tokens import Tokens
+from steemengine.transaction import Transaction
+from benchmarks.server import FixtureServer, load_fixture
+
+
+def measure(name, func, number):
+    """Calls func number times and returns a dict with ``ops`` (calls per
+        second), ``peak`` (highest traced memory in KiB during the calls)
+        and ``blocks`` (memory blocks per call which are still allocated
+        when the results are kept).
+    """
+    func()
+    gc.collect()
+    start = timer()
+    for i in range(number):
+        func()
+    elapsed = timer() - start
+    results = []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        if hasattr(tracemalloc, "reset_peak"):
+            # python 3.9 and newer, otherwise the peak includes the snapshot
+            tracemalloc.reset_peak()
+        for i in range(number):
+            results.append(func())
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return {"name": name, "number": number, "ops": number / elapsed, "peak": peak / 1024.,
+            "blocks": blocks / number}
+
+
+def get_benchmarks(server, scale=1):
+    """Returns a list of (name, func, number) tuples"""
+    api = Api(url=server.url, rpcurl=server.rpcurl)
+    block = load_fixture("block")
+    tokens = Tokens(api=api)
+    symbols = [token["symbol"] for token in api.find_all("tokens", "tokens")]
+    token = tokens.get_token("ENG")
+    amounts = ["%d.%s" % (i, "123456789"[:i % 10]) for i in range(1000)]
+    wallet = list(api.find_all("tokens", "balances", query={"account": "holger80"}))
+    metrics = dict((m["symbol"], m) for m in api.find_all("market", "metrics"))
+
+    def decode_block():
+        return [(trx.payload, trx.logs) for trx in (Transaction(trx) for trx in block["transactions"])]
+
+    return [
+        ("rpc.rpcexec", lambda: api.rpc.getLatestBlockInfo(endpoint="blockchain"), 200 * scale),
+        ("api.find (1000 rows)", lambda: api.find("tokens", "balances", limit=1000), 20 * scale),
+        ("api.find_all (5000 rows)", lambda: list(api.find_all("tokens", "balances")), 5 * scale),
+        ("api.find_all prefetch", lambda: list(api.find_all("tokens", "balances", prefetch=True)), 5 * scale),
+        ("api.get_blocks (200 blocks)", lambda: list(api.get_blocks(1, 201)), 5 * scale),
+        ("Transaction decoding (block)", decode_block, 5000 * scale),
+        ("Tokens.get_token (all symbols)", lambda: [tokens.get_token(s) for s in symbols], 100 * scale),
+        ("Token.quantize (1000 amounts)", lambda: [token.quantize(a) for a in amounts], 20 * scale),
+        ("plan_sweep sell", lambda: plan_sweep("sell", wallet, tokens, metrics), 50 * scale),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="steemengine benchmarks")
+    parser.add_argument("--only", help="only run benchmarks which contain this text")
+    parser.add_argument("--scale", type=int, default=1, help="multiplies the number of calls")
+    parser.add_argument("--json", help="stores the results in this file")
+    args = parser.parse_args()
+    with FixtureServer() as server:
+        results = []
+        for name, func, number in get_benchmarks(server, scale=args.scale):
+            if args.only is not None and args.only.lower() not in name.lower():
+                continue
+            results.append(measure(name, func, number))
+    t = PrettyTable(["benchmark", "calls", "ops/s", "peak KiB", "blocks/call"])
+    t.align = "r"
+    t.align["benchmark"] = "l"
+    for result in results:
+        t.add_row([result["name"], result["number"], "%.1f" % result["ops"], "%.1f" % result["peak"],
+                   "%.1f" % result["blocks"]])
+    print(t)
+    if args.json is not None:
+        with io.open(args.json, "w", encoding="utf-8") as f:
+            f.write(json.dumps(results, indent=1, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
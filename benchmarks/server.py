@@ -0,0 +1,166 @@
+"""Local stand-in for the steem-engine JSON-RPC api, which serves the fixtures."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import copy
+import io
+import json
+import os
+import threading
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name):
+    """Returns the decoded JSON fixture ``fixtures/<name>.json``"""
+    with io.open(os.path.join(FIXTURE_DIR, name + ".json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_table(rows, count, unique_field=None):
+    """Returns count rows, which are copies of the fixture rows with
+        increasing ``_id``. The unique field (e.g. ``symbol``) gets the
+        row number appended to stay unique.
+    """
+    table = []
+    for i in range(count):
+        row = copy.deepcopy(rows[i % len(rows)])
+        row["_id"] = i + 1
+        if unique_field is not None and i >= len(rows):
+            row[unique_field] = "%s%d" % (row[unique_field], i)
+        table.append(row)
+    return table
+
+
+def match(row, query):
+    """Returns True when the row matches the query (only equality and $in)"""
+    for key, value in query.items():
+        if isinstance(value, dict) and "$in" in value:
+            if row.get(key) not in value["$in"]:
+                return False
+        elif row.get(key) != value:
+            return False
+    return True
+
+
+class FixtureData(object):
+    """ Tables and blocks which are served by :class:`FixtureServer`
+
+        :param int tokens: number of rows of tokens.tokens and market.metrics
+        :param int balances: number of rows of tokens.balances
+        :param int head_block: block number of the latest block
+    """
+    def __init__(self, tokens=500, balances=5000, head_block=1000000):
+        token_table = make_table(load_fixture("tokens"), tokens, "symbol")
+        metrics = make_table(load_fixture("metrics"), tokens)
+        for row, token in zip(metrics, token_table):
+            row["symbol"] = token["symbol"]
+        balance_table = make_table(load_fixture("balances"), balances)
+        for row in balance_table:
+            row["symbol"] = token_table[row["_id"] % len(token_table)]["symbol"]
+        self.tables = {("tokens", "tokens"): token_table,
+                       ("tokens", "balances"): balance_table,
+                       ("market", "metrics"): metrics}
+        self.block = load_fixture("block")
+        self.head_block = head_block
+
+    def get_block(self, block_num):
+        if block_num > self.head_block:
+            return None
+        block = dict(self.block)
+        block["_id"] = block_num
+        block["blockNumber"] = block_num
+        return block
+
+    def find(self, params):
+        rows = self.tables.get((params["contract"], params["table"]), [])
+        query = params.get("query") or {}
+        if len(query) > 0:
+            rows = [row for row in rows if match(row, query)]
+        offset = params.get("offset", 0)
+        return rows[offset:offset + params.get("limit", 1000)]
+
+    def handle(self, path, query):
+        method = query.get("method")
+        params = query.get("params") or {}
+        if path.endswith("blockchain") and method == "getLatestBlockInfo":
+            result = self.get_block(self.head_block)
+        elif path.endswith("blockchain") and method == "getBlockInfo":
+            result = self.get_block(params["blockNumber"])
+        elif path.endswith("contracts") and method == "find":
+            result = self.find(params)
+        elif path.endswith("contracts") and method == "findOne":
+            rows = self.find(dict(params, limit=1))
+            result = rows[0] if len(rows) > 0 else None
+        else:
+            return {"jsonrpc": "2.0", "id": query.get("id"),
+                    "error": {"code": -32601, "message": "Method not found"}}
+        return {"jsonrpc": "2.0", "id": query.get("id"), "result": result}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, Nagle's algorithm would delay the body
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8"))
+        data = self.server.data
+        if isinstance(body, list):
+            reply = [data.handle(self.path, query) for query in body]
+        else:
+            reply = data.handle(self.path, body)
+        reply = json.dumps(reply).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+
+class FixtureServer(ThreadingMixIn, HTTPServer):
+    """ Serves the fixtures on a free local port in a background thread
+
+        .. code-block:: python
+
+            from benchmarks.server import FixtureServer
+            from steemengine.api import Api
+            with FixtureServer() as server:
+                api = Api(url=server.url, rpcurl=server.rpcurl)
+                print(api.get_latest_block_info()["blockNumber"])
+
+    """
+    daemon_threads = True
+
+    def __init__(self, data=None):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), FixtureHandler)
+        self.data = data or FixtureData()
+        self.url = "http://127.0.0.1:%d/" % self.server_address[1]
+        self.rpcurl = self.url + "rpc/"
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -7,7 +7,7 @@ from __future__ import unicode_literals
 from beem import Steem
 from beem.comment import Comment
 from beem.nodelist import NodeList
-from steemengine.wallet import Wallet
+from steemengine.watcher import TransferWatcher
 import time
 
 
@@ -29,58 +29,53 @@ if __name__ == "__main__":
     only_main_posts = True
     stm.wallet.unlock("wallet-passwd")
     
-    wallet = Wallet(upvote_account, steem_instance=stm)
-    
-    last_steem_block = 1950 # It is a good idea to store this block, otherwise all transfers will be checked again
-    while True:
-        history = wallet.get_history(upvote_token)
-        for h in history:
-            if int(h["block"]) <= last_steem_block:
-                continue
-            if h["to"] != upvote_account:
-                continue
-            last_steem_block = int(h["block"])
-            if len(whitelist) > 0 and h["from"] not in whitelist:
-                print("%s is not in the whitelist, skipping" % h["from"])
-                continue
-            if float(h["quantity"]) < min_token_amount:
-                print("Below min token amount skipping...")
-                continue
-            try:
-                c = Comment(h["memo"], steem_instance=stm)
-            except:
-                print("%s is not a valid url, skipping" % h["memo"])
-                continue
-            
-            if c.is_comment() and only_main_posts:
-                print("%s from %s is a comment, skipping" % (c["permlink"], c["author"]))
-                continue
-            if (c.time_elapsed().total_seconds() / 60 / 60 / 24) > max_post_age_days:
-                print("Post is to old, skipping")
-                continue                
-            tags_ok = True
-            if len(blacklist_tags) > 0 and "tags" in c:
-                for t in blacklist_tags:
-                    if t in c["tags"]:
-                        tags_ok = False
-            if not tags_ok:
-                print("skipping, as one tag is blacklisted")
-                continue
-            already_voted = False
-            for v in c["active_votes"]:
-                if v["voter"] == upvote_account:
-                    already_voted = True
-            if already_voted:
-                print("skipping, as already upvoted")
-                continue
-            
-            upvote_weight = float(h["quantity"]) * token_weight_factor
-            if upvote_weight > 100:
-                upvote_weight = 100
-            print("upvote %s from %s with %.2f %%" % (c["permlink"], c["author"], upvote_weight))
-            print(c.upvote(weight=upvote_weight, voter=upvote_account))
-            if len(reply_comment) > 0:
-                time.sleep(4)
-                print(c.reply(reply_comment, author=upvote_account))
-            
-        time.sleep(60)
+    # The transfers are handled as soon as their block is streamed. The last handled
+    # block is stored in this file, so that no transfer is checked twice
+    watcher = TransferWatcher([upvote_account], [upvote_token], checkpoint_store="upvote_bot_checkpoint.json")
+
+    def upvote(h):
+        if len(whitelist) > 0 and h["from"] not in whitelist:
+            print("%s is not in the whitelist, skipping" % h["from"])
+            return
+        if float(h["quantity"]) < min_token_amount:
+            print("Below min token amount skipping...")
+            return
+        try:
+            c = Comment(h["memo"], steem_instance=stm)
+        except:
+            print("%s is not a valid url, skipping" % h["memo"])
+            return
+
+        if c.is_comment() and only_main_posts:
+            print("%s from %s is a comment, skipping" % (c["permlink"], c["author"]))
+            return
+        if (c.time_elapsed().total_seconds() / 60 / 60 / 24) > max_post_age_days:
+            print("Post is to old, skipping")
+            return
+        tags_ok = True
+        if len(blacklist_tags) > 0 and "tags" in c:
+            for t in blacklist_tags:
+                if t in c["tags"]:
+                    tags_ok = False
+        if not tags_ok:
+            print("skipping, as one tag is blacklisted")
+            return
+        already_voted = False
+        for v in c["active_votes"]:
+            if v["voter"] == upvote_account:
+                already_voted = True
+        if already_voted:
+            print("skipping, as already upvoted")
+            return
+
+        upvote_weight = float(h["quantity"]) * token_weight_factor
+        if upvote_weight > 100:
+            upvote_weight = 100
+        print("upvote %s from %s with %.2f %%" % (c["permlink"], c["author"], upvote_weight))
+        print(c.upvote(weight=upvote_weight, voter=upvote_account))
+        if len(reply_comment) > 0:
+            time.sleep(4)
+            print(c.reply(reply_comment, author=upvote_account))
+
+    watcher.add_callback(upvote)
+    watcher.run()
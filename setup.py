@@ -16,7 +16,7 @@ except LookupError:
     ascii = codecs.lookup('ascii')
     codecs.register(lambda name, enc=ascii: {True: enc}.get(name == 'mbcs'))
 
-VERSION = '0.5.3'
+VERSION = '0.6.0'
 
 tests_require = ['mock >= 2.0.0', 'pytest', 'pytest-mock', 'parameterized']
 
@@ -24,6 +24,7 @@ requires = [
     "beem",
     "requests",
     "six",
+    'futures; python_version < "3"',
 ]
 
 
@@ -76,6 +77,11 @@ if __name__ == '__main__':
             'Intended Audience :: Developers',
         ],
         install_requires=requires,
+        extras_require={
+            'aio': ['aiohttp'],
+            'orjson': ['orjson'],
+            'analytics': ['numpy'],
+        },
         entry_points={
             'console_scripts': [
                 'steemengine=steemengine.cli:cli',
@@ -2,11 +2,26 @@
 from .version import version as __version__
 
 __all__ = [
+    "actionbatch",
     "api",
+    "blockchain",
+    "cache",
+    "checkpoint",
     "exceptions",
+    "history",
+    "holders",
     "market",
+    "mirror",
+    "node",
+    "orderbook",
+    "portfolio",
     "rpc",
+    "serializer",
+    "sweep",
     "tokenobject",
     "tokens",
-    "wallet"
+    "tradestore",
+    "transaction",
+    "wallet",
+    "watcher"
 ]
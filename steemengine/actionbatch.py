@@ -0,0 +1,148 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import logging
+from builtins import range
+from beem.instance import shared_steem_instance
+from steemengine.exceptions import CustomJsonTooLarge
+
+log = logging.getLogger(__name__)
+
+# Maximum length of the json field of a custom_json operation
+CUSTOM_JSON_MAX_SIZE = 8192
+
+
+def get_json_size(json_data):
+    """Returns the length of the json field as it is broadcasted by beem"""
+    return len(json.dumps(json_data, separators=(',', ':')))
+
+
+def get_action(contract_name, contract_action, contract_payload):
+    """Returns a contract action as dict with contractName, contractAction and contractPayload"""
+    return {"contractName": contract_name, "contractAction": contract_action,
+            "contractPayload": contract_payload}
+
+
+def get_transfer_action(to, quantity, symbol, memo=""):
+    """Returns a ``tokens.transfer`` action, quantity has to be quantized"""
+    return get_action("tokens", "transfer", {"symbol": symbol.upper(), "to": to, "quantity": str(quantity),
+                                             "memo": memo})
+
+
+def get_stake_action(contract_action, quantity, symbol):
+    """Returns a ``tokens.stake`` or ``tokens.unstake`` action, quantity has to be quantized"""
+    return get_action("tokens", contract_action, {"symbol": symbol.upper(), "quantity": str(quantity)})
+
+
+def get_order_action(order_type, quantity, symbol, price):
+    """Returns a ``market.buy`` or ``market.sell`` action, quantity has to be quantized"""
+    return get_action("market", order_type, {"symbol": symbol.upper(), "quantity": str(quantity),
+                                             "price": str(price)})
+
+
+class ActionBatch(object):
+    """ Collects contract actions and broadcasts them as JSON arrays
+
+        steem-engine executes all actions of a JSON array which is sent
+        in one custom_json operation. The collected actions are packed in
+        as few custom_json operations as possible, each operation is
+        smaller than ``max_size``.
+
+        :param str account: account which signs the actions
+        :param Steem steem_instance: Steem instance
+        :param str ssc_id: sidechain id (default is ssc-mainnet1)
+        :param int max_size: maximum length of the json field of one operation
+
+        .. code-block:: python
+
+            from steemengine.actionbatch import ActionBatch
+            from steemengine.wallet import Wallet
+            from beem import Steem
+            active_wif = "5xxxx"
+            stm = Steem(keys=[active_wif])
+            wallet = Wallet("test", steem_instance=stm)
+            with ActionBatch("test", steem_instance=stm) as batch:
+                wallet.transfer("test1", 1, "ENG", "test", batch=batch)
+                wallet.stake(1, "ENG", batch=batch)
+            print(batch.results)
+
+    """
+    def __init__(self, account, steem_instance=None, ssc_id="ssc-mainnet1", max_size=CUSTOM_JSON_MAX_SIZE):
+        self.account = account
+        self.steem = steem_instance or shared_steem_instance()
+        self.ssc_id = ssc_id
+        self.max_size = max_size
+        self.actions = []
+        self.results = None
+
+    def __len__(self):
+        return len(self.actions)
+
+    def append(self, json_data):
+        """Adds a contract action (dict with contractName, contractAction and
+            contractPayload) and returns its index in the results of :meth:`flush`
+        """
+        if get_json_size([json_data]) > self.max_size:
+            raise CustomJsonTooLarge("The action is larger than %d bytes" % self.max_size)
+        self.actions.append(json_data)
+        return len(self.actions) - 1
+
+    def add_action(self, contract_name, contract_action, contract_payload):
+        """Adds a contract action and returns its index in the results of :meth:`flush`"""
+        return self.append(get_action(contract_name, contract_action, contract_payload))
+
+    def get_chunks(self):
+        """Returns the actions packed into lists which fit into one custom_json"""
+        chunks = []
+        chunk = []
+        chunk_size = 2
+        for json_data in self.actions:
+            size = get_json_size(json_data)
+            if len(chunk) > 0 and chunk_size + 1 + size > self.max_size:
+                chunks.append(chunk)
+                chunk = []
+                chunk_size = 2
+            if len(chunk) > 0:
+                chunk_size += 1
+            chunk_size += size
+            chunk.append(json_data)
+        if len(chunk) > 0:
+            chunks.append(chunk)
+        return chunks
+
+    def flush(self, callback=None):
+        """Broadcasts all collected actions and returns a list with one
+            result per action. The result is the broadcasted transaction,
+            or the exception when the broadcast of this action failed.
+            Actions which are broadcasted together share the same transaction.
+
+            :param callback: (optional) function which is called after each
+                broadcast with the list of action indices and the result
+        """
+        results = []
+        for chunk in self.get_chunks():
+            start = len(results)
+            if len(chunk) == 1:
+                json_data = chunk[0]
+            else:
+                json_data = chunk
+            try:
+                tx = self.steem.custom_json(self.ssc_id, json_data, required_auths=[self.account])
+            except Exception as e:
+                log.warning("Broadcast of %d actions failed: %s" % (len(chunk), str(e)))
+                tx = e
+            results.extend([tx] * len(chunk))
+            if callback is not None:
+                callback(list(range(start, len(results))), tx)
+        self.actions = []
+        self.results = results
+        return results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
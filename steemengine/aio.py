@@ -0,0 +1,286 @@
+"""asyncio versions of RPC and Api (requires python 3.5 and aiohttp)."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import asyncio
+import logging
+import time
+
+from .rpc import RPC, RPCBatch, UnauthorizedError, get_endpoint_name
+from .serializer import get_serializer
+from .transaction import Transaction
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+log = logging.getLogger(__name__)
+
+
+class AsyncRPC(RPC):
+    """
+    This class allows to call API methods from an asyncio event loop.
+
+    All requests share one aiohttp session with a connection pool of
+    ``pool_size`` connections. At most ``max_concurrency`` requests are
+    in flight at the same time, further requests wait until a request
+    has finished.
+
+    :param str url: RPC url
+    :param int max_concurrency: maximum number of concurrent requests
+    :param int pool_size: maximum number of open connections (default is
+        ``max_concurrency``)
+
+    Usage:
+
+        .. code-block:: python
+
+            import asyncio
+            from steemengine.aio import AsyncRPC
+
+            async def main():
+                async with AsyncRPC() as rpc:
+                    print(await rpc.getLatestBlockInfo(endpoint="blockchain"))
+
+            asyncio.get_event_loop().run_until_complete(main())
+
+    """
+
+    def __init__(self, url=None, user=None, password=None, max_concurrency=64, **kwargs):
+        """Init."""
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp is required for steemengine.aio")
+        super(AsyncRPC, self).__init__(url=url, user=user, password=password, **kwargs)
+        self.max_concurrency = max_concurrency
+        self.pool_size = kwargs.get("pool_size", max_concurrency)
+        self.session = None
+        self._semaphore = None
+
+    def _get_session(self):
+        """Returns the aiohttp session, which is created on first use"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            auth = None
+            if self.user is not None and self.password is not None:
+                auth = aiohttp.BasicAuth(self.user, self.password)
+            self.session = aiohttp.ClientSession(connector=connector, headers=self.headers, auth=auth,
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+
+    async def close(self):
+        """Closes the session and all pooled connections"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def request_send(self, endpoint, payload):
+        """Sends the payload and returns the decoded reply"""
+        return await self._request("POST", self.url + endpoint, data=payload)
+
+    async def request_get(self, url, params):
+        """Sends a GET request and returns the decoded JSON reply"""
+        return await self._request("GET", url, params=params)
+
+    async def _request(self, method, url, **kwargs):
+        session = self._get_session()
+        async with self._semaphore:
+            start = time.time()
+            async with session.request(method, url, **kwargs) as response:
+                if response.status == 401:
+                    raise UnauthorizedError
+                reply = await response.read()
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(reply)
+                return self._decode_reply(reply, status_code=response.status, node=url,
+                                          latency=time.time() - start)
+
+    async def rpcexec(self, endpoint, payload):
+        """
+        Execute a call by sending the payload.
+
+        :param json payload: Payload data
+        :raises RPCError: if the server returns an error
+        """
+        data = get_serializer().dumps(payload)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(data)
+
+        ret = await self.request_send(endpoint, data)
+
+        return self._parse_reply(ret)
+
+    async def rpcexec_batch(self, endpoint, queries):
+        """
+        Execute several calls by sending them as one JSON-RPC array.
+
+        :return: list with one entry per query in call order. The entry is
+            the result of the call or an :class:`RPCError` when this call failed.
+        """
+        data = get_serializer().dumps(queries)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(data)
+
+        ret = await self.request_send(endpoint, data)
+
+        return self._parse_batch_reply(queries, ret)
+
+    def batch(self, endpoint="contracts"):
+        """Returns an :class:`AsyncRPCBatch`, which collects calls to one
+            endpoint and sends them as one JSON-RPC array.
+        """
+        return AsyncRPCBatch(self, endpoint=endpoint)
+
+    def __getattr__(self, name):
+        """Map all methods to RPC calls and pass through the arguments."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        async def method(*args, **kwargs):
+            endpoint = get_endpoint_name(*args, **kwargs)
+            query = self._build_query(name, args)
+            return await self.rpcexec(endpoint, [query])
+        return method
+
+
+class AsyncRPCBatch(RPCBatch):
+    """
+    Collects calls and sends them as one JSON-RPC array by
+    :func:`AsyncRPC.rpcexec_batch`. ``execute`` is a coroutine and the batch
+    is used with ``async with``.
+
+    :param AsyncRPC rpc: AsyncRPC instance which is used for sending
+    :param str endpoint: endpoint for all calls (default is contracts)
+
+    Usage:
+
+        .. code-block:: python
+
+            import asyncio
+            from steemengine.aio import AsyncRPC
+
+            async def main():
+                async with AsyncRPC() as rpc:
+                    async with rpc.batch(endpoint="blockchain") as batch:
+                        for block_num in range(1, 11):
+                            batch.getBlockInfo({"blockNumber": block_num})
+                    print(batch.results)
+
+            asyncio.get_event_loop().run_until_complete(main())
+
+    """
+
+    def __enter__(self):
+        raise TypeError("Use async with for an AsyncRPCBatch")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            await self.execute()
+
+    async def execute(self):
+        """Sends all collected calls and returns their results in call order"""
+        queries = self.queries
+        self.queries = []
+        if len(queries) == 0:
+            self.results = []
+        else:
+            self.results = await self.rpc.rpcexec_batch(self.endpoint, queries)
+        return self.results
+
+
+class AsyncApi(object):
+    """ Access the steem-engine API from an asyncio event loop
+
+        :param int max_concurrency: maximum number of concurrent requests
+
+        .. code-block:: python
+
+            import asyncio
+            from steemengine.aio import AsyncApi
+
+            async def main():
+                async with AsyncApi() as api:
+                    balances = await asyncio.gather(*[
+                        api.find("tokens", "balances", query={"account": account})
+                        for account in ["holger80", "beembot"]])
+                    print(balances)
+
+            asyncio.get_event_loop().run_until_complete(main())
+
+    """
+    def __init__(self, url=None, rpcurl=None, user=None, password=None, max_concurrency=64, **kwargs):
+        if url is None:
+            self.url = 'https://api.steem-engine.com/'
+        else:
+            self.url = url
+        if url is not None and rpcurl is None:
+            self.rpc = AsyncRPC(url=url, user=user, password=password, max_concurrency=max_concurrency, **kwargs)
+        else:
+            self.rpc = AsyncRPC(url=rpcurl, user=user, password=password, max_concurrency=max_concurrency, **kwargs)
+
+    async def close(self):
+        """Closes the session and all pooled connections"""
+        await self.rpc.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _unpack(self, ret):
+        if isinstance(ret, list) and len(ret) == 1:
+            return ret[0]
+        else:
+            return ret
+
+    async def get_history(self, account, symbol, limit=1000, offset=0, histtype="user"):
+        """"Get the transaction history for an account and a token"""
+        params = {"account": account, "limit": limit, "offset": offset, "type": histtype, "symbol": symbol}
+        return await self.rpc.request_get(self.url.rstrip("/") + "/history/accountHistory", params)
+
+    async def get_latest_block_info(self):
+        """get the latest block of the sidechain"""
+        return self._unpack(await self.rpc.getLatestBlockInfo(endpoint="blockchain"))
+
+    async def get_block_info(self, blocknumber):
+        """get the block with the specified block number of the sidechain"""
+        block = self._unpack(await self.rpc.getBlockInfo({"blockNumber": blocknumber}, endpoint="blockchain"))
+        if isinstance(block, dict) and "transactions" in block:
+            block["transactions"] = [Transaction(trx) for trx in block["transactions"]]
+        return block
+
+    async def get_transaction_info(self, txid):
+        """Retrieve the specified transaction info of the sidechain"""
+        ret = self._unpack(await self.rpc.getTransactionInfo({"txid": txid}, endpoint="blockchain"))
+        if isinstance(ret, dict):
+            return Transaction(ret)
+        else:
+            return ret
+
+    async def get_contract(self, contract_name):
+        """ Get the contract specified from the database"""
+        return self._unpack(await self.rpc.getContract({"name": contract_name}, endpoint="contracts"))
+
+    async def find_one(self, contract_name, table_name, query={}):
+        """Get the object that matches the query from the table of the specified contract"""
+        return await self.rpc.findOne({"contract": contract_name, "table": table_name, "query": query},
+                                      endpoint="contracts")
+
+    async def find(self, contract_name, table_name, query={}, limit=1000, offset=0, indexes=[]):
+        """Get an array of objects that match the query from the table of the specified contract"""
+        return self._unpack(await self.rpc.find({"contract": contract_name, "table": table_name, "query": query,
+                                                 "limit": limit, "offset": offset, "indexes": indexes},
+                                                endpoint="contracts"))
@@ -9,11 +9,20 @@ import json
 import requests
 from timeit import default_timer as timer
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from .rpc import RPC
+from .transaction import Transaction
 
 
 class Api(object):
     """ Access the steem-engine API
+
+        :param str url: API url
+        :param rpcurl: RPC url or list of RPC urls. With several urls, each call is
+            sent to the fastest healthy node and failed calls are retried on another node.
+
+        All other parameters are passed to :class:`steemengine.rpc.RPC`.
     """
     def __init__(self, url=None, rpcurl=None, user=None, password=None, **kwargs):
         if url is None:
@@ -21,18 +30,18 @@ class Api(object):
         else:
             self.url = url
         if url is not None and rpcurl is None:
-            self.rpc = RPC(url=url)
+            self.rpc = RPC(url=url, user=user, password=password, **kwargs)
         else:
-            self.rpc = RPC(url=rpcurl)
+            self.rpc = RPC(url=rpcurl, user=user, password=password, **kwargs)
 
     def get_history(self, account, symbol, limit=1000, offset=0, histtype="user"):
-        """"Get the transaction history for an account and a token"""
-        response = requests.get(self.url + "/history/accountHistory?account=%s&limit=%d&offset=%d&type=%s&symbol=%s" % (account, limit, offset, histtype, symbol))
-        cnt2 = 0
-        while response.status_code != 200 and cnt2 < 10:
-            response = requests.get(self.url + "/history/accountHistory?account=%s&limit=%d&offset=%d&type=%s&symbol=%s" % (account, limit, offset, histtype, symbol))
-            cnt2 += 1
-        return response.json()
+        """"Get the transaction history for an account and a token
+
+            The request uses the keep-alive session of the RPC and is retried
+            with an exponential backoff when it fails or is rate limited.
+        """
+        params = {"account": account, "limit": limit, "offset": offset, "type": histtype, "symbol": symbol}
+        return self.rpc.request_get(self.url.rstrip("/") + "/history/accountHistory", params)
 
     def get_latest_block_info(self):
         """get the latest block of the sidechain"""
@@ -46,15 +55,72 @@ class Api(object):
         """get the block with the specified block number of the sidechain"""
         ret = self.rpc.getBlockInfo({"blockNumber": blocknumber}, endpoint="blockchain")
         if isinstance(ret, list) and len(ret) == 1:
-            return ret[0]
+            return self._wrap_transactions(ret[0])
         else:
-            return ret
+            return self._wrap_transactions(ret)
+
+    def _wrap_transactions(self, block):
+        """Replaces the transaction dicts of a block by Transaction objects"""
+        if isinstance(block, dict) and "transactions" in block:
+            block["transactions"] = [Transaction(trx) for trx in block["transactions"]]
+        return block
+
+    def get_blocks(self, start, stop, workers=4, batch_size=50):
+        """Yields the sidechain blocks from start to stop (stop is excluded)
+            in order. The blocks are fetched concurrently in batched requests
+            by a pool of workers. Only ``2 * workers`` batches are fetched
+            ahead of the consumer. The generator stops at the first
+            block which does not exist (yet).
+
+            :param int start: first block number
+            :param int stop: block number at which the generator stops
+            :param int workers: number of concurrent requests
+            :param int batch_size: number of blocks which are requested by
+                one JSON-RPC batch
+
+            .. code-block:: python
+
+                from steemengine.api import Api
+                api = Api()
+                for block in api.get_blocks(1, 1000):
+                    print(block["blockNumber"])
+        """
+        def get_batch(first, last):
+            batch = self.rpc.batch(endpoint="blockchain")
+            for blocknumber in range(first, last):
+                batch.getBlockInfo({"blockNumber": blocknumber})
+            blocks = batch.execute()
+            for block in blocks:
+                if isinstance(block, Exception):
+                    raise block
+                self._wrap_transactions(block)
+            return blocks
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        pending = deque()
+        try:
+            next_start = start
+            while next_start < stop or len(pending) > 0:
+                while next_start < stop and len(pending) < 2 * workers:
+                    last = min(next_start + batch_size, stop)
+                    pending.append(executor.submit(get_batch, next_start, last))
+                    next_start = last
+                for block in pending.popleft().result():
+                    if block is None:
+                        return
+                    yield block
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
 
     def get_transaction_info(self, txid):
         """Retrieve the specified transaction info of the sidechain"""
         ret = self.rpc.getTransactionInfo({"txid": txid}, endpoint="blockchain")
         if isinstance(ret, list) and len(ret) == 1:
-            return ret[0]
+            ret = ret[0]
+        if isinstance(ret, dict):
+            return Transaction(ret)
         else:
             return ret
 
@@ -80,3 +146,48 @@ class Api(object):
         else:
             return ret
 
+
+    def find_all(self, contract_name, table_name, query={}, page_size=1000, offset=0, indexes=[], prefetch=False):
+        """Yields all objects that match the query from the table of the specified contract.
+            The objects are requested in pages of ``page_size`` objects. A page is
+            only requested when the previous page was consumed.
+
+            :param str contract_name: contract name (e.g. ``tokens``)
+            :param str table_name: table name (e.g. ``balances``)
+            :param dict query: query
+            :param int page_size: number of objects per request (max. 1000)
+            :param int offset: number of objects which are skipped
+            :param list indexes: indexes which are used for sorting
+            :param bool prefetch: When True, the next page is requested in
+                the background while the current page is processed
+
+            .. code-block:: python
+
+                from steemengine.api import Api
+                api = Api()
+                for token in api.find_all("tokens", "tokens"):
+                    print(token["symbol"])
+        """
+        executor = None
+        if prefetch:
+            executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            page = self.find(contract_name, table_name, query=query, limit=page_size, offset=offset, indexes=indexes)
+            while page is not None and len(page) > 0:
+                offset += len(page)
+                last_page = len(page) < page_size
+                next_page = None
+                if executor is not None and not last_page:
+                    next_page = executor.submit(self.find, contract_name, table_name, query=query,
+                                                limit=page_size, offset=offset, indexes=indexes)
+                for obj in page:
+                    yield obj
+                if last_page:
+                    return
+                elif next_page is not None:
+                    page = next_page.result()
+                else:
+                    page = self.find(contract_name, table_name, query=query, limit=page_size, offset=offset, indexes=indexes)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
@@ -0,0 +1,141 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import str
+import time
+import logging
+from steemengine.api import Api
+
+log = logging.getLogger(__name__)
+
+
+class Blockchain(object):
+    """ Access the steem-engine sidechain blocks
+
+        :param Api api: Api instance
+        :param float min_interval: shortest time in seconds between two polls
+            of the head block
+        :param float max_interval: longest time in seconds between two polls
+            of the head block
+        :param int workers: number of concurrent requests while catching up
+        :param int batch_size: number of blocks which are fetched by one
+            request while catching up
+        :param int direct_fetch_blocks: up to this number of missing blocks are
+            fetched one by one, more are fetched by the worker pool
+
+        Stream example:
+
+            .. code-block:: python
+
+                from steemengine.blockchain import Blockchain
+                b = Blockchain()
+                for trx in b.stream(only_contracts=["market"], only_actions=["buy", "sell"]):
+                    print(trx["sender"], trx.payload)
+
+    """
+    def __init__(self, api=None, min_interval=0.5, max_interval=6, workers=4, batch_size=50,
+                 direct_fetch_blocks=2):
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.workers = workers
+        self.batch_size = batch_size
+        self.direct_fetch_blocks = direct_fetch_blocks
+
+    def get_current_block(self):
+        """Returns the latest block of the sidechain"""
+        return self.api.get_latest_block_info()
+
+    def get_current_block_num(self):
+        """Returns the latest block number of the sidechain"""
+        return self.get_current_block()["blockNumber"]
+
+    def _get_blocks_direct(self, start, stop):
+        """Yields the blocks from start to stop (stop is excluded) one by one.
+            Stops at the first block which does not exist (yet).
+        """
+        for block_num in range(start, stop):
+            block = self.api.get_block_info(block_num)
+            if not block:
+                return
+            yield block
+
+    def blocks(self, start=None, stop=None):
+        """Yields all blocks from start to stop. Missing blocks are fetched
+            concurrently until the head block is reached. Afterwards the head
+            block is polled. The poll interval is halved after each new block
+            and doubled when no new block was found (between ``min_interval``
+            and ``max_interval``). When only a few blocks are missing, they are
+            fetched one by one without a worker pool.
+
+            :param int start: first block number, the head block is used when
+                not set
+            :param int stop: last block number (is included), blocks are
+                streamed forever when not set
+        """
+        head_block_num = self.get_current_block_num()
+        if start is None:
+            start = head_block_num
+        interval = self.min_interval
+        next_block_num = start
+        while stop is None or next_block_num <= stop:
+            if next_block_num <= head_block_num:
+                last = head_block_num if stop is None else min(stop, head_block_num)
+                if last - next_block_num < self.direct_fetch_blocks:
+                    # Following the head block, no worker pool is needed for a few blocks
+                    blocks = self._get_blocks_direct(next_block_num, last + 1)
+                else:
+                    blocks = self.api.get_blocks(next_block_num, last + 1, workers=self.workers,
+                                                 batch_size=self.batch_size)
+                for block in blocks:
+                    yield block
+                    next_block_num = block["blockNumber"] + 1
+                if next_block_num > last:
+                    interval = max(self.min_interval, interval / 2)
+                    continue
+                # The head block is not available yet
+                head_block_num = next_block_num - 1
+            time.sleep(interval)
+            latest_block_num = self.get_current_block_num()
+            if latest_block_num > head_block_num:
+                head_block_num = latest_block_num
+            else:
+                interval = min(self.max_interval, interval * 2)
+
+    def stream(self, start=None, stop=None, only_contracts=None, only_actions=None):
+        """Yields all transactions from start to stop as
+            :class:`steemengine.transaction.Transaction`. ``blockNumber``
+            and ``timestamp`` of the block are added to each transaction.
+            ``logs`` and ``payload`` are only decoded for the returned
+            transactions when they are accessed.
+
+            :param int start: first block number, the head block is used when
+                not set
+            :param int stop: last block number (is included), transactions
+                are streamed forever when not set
+            :param list only_contracts: only transactions of these contracts
+                are returned (e.g. ``["tokens", "market"]``)
+            :param list only_actions: only transactions with these actions
+                are returned (e.g. ``["transfer"]``)
+        """
+        if isinstance(only_contracts, str):
+            only_contracts = [only_contracts]
+        if isinstance(only_actions, str):
+            only_actions = [only_actions]
+        if only_contracts is not None:
+            only_contracts = set(only_contracts)
+        if only_actions is not None:
+            only_actions = set(only_actions)
+        for block in self.blocks(start=start, stop=stop):
+            for trx in block["transactions"]:
+                if only_contracts is not None and trx["contract"] not in only_contracts:
+                    continue
+                if only_actions is not None and trx["action"] not in only_actions:
+                    continue
+                trx["blockNumber"] = block["blockNumber"]
+                trx["timestamp"] = block["timestamp"]
+                yield trx
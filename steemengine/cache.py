@@ -0,0 +1,90 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import threading
+import time
+from collections import OrderedDict
+
+
+class ObjectCache(object):
+    """ Thread-safe cache with a time to live and a maximum size.
+
+        When the maximum size is reached, the least recently used
+        object is removed.
+
+        :param int default_expiration: time to live in seconds
+        :param int max_size: maximum number of cached objects
+
+        .. code-block:: python
+
+            from steemengine.cache import ObjectCache
+            cache = ObjectCache(default_expiration=60, max_size=100)
+            cache["ENG"] = {"symbol": "ENG", "precision": 8}
+            print(cache.get("ENG"))
+
+    """
+    def __init__(self, default_expiration=3600, max_size=1000):
+        self.default_expiration = default_expiration
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def set_expiration(self, expiration):
+        """Sets the time to live in seconds for new objects"""
+        self.default_expiration = expiration
+
+    def __setitem__(self, key, value):
+        expires = time.time() + self.default_expiration
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (expires, value)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def get(self, key, default=None):
+        """Returns the cached object or default when it is not cached
+            or expired
+        """
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is None:
+                return default
+            if item[0] < time.time():
+                return default
+            self._data[key] = item
+            return item[1]
+
+    def __getitem__(self, key):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._data[key]
+
+    def __len__(self):
+        return len(self._data)
+
+    def invalidate(self, match=None):
+        """Removes cached objects
+
+            :param match: when set, only keys for which ``match(key)``
+                returns True are removed. Otherwise the cache is cleared.
+        """
+        with self._lock:
+            if match is None:
+                self._data.clear()
+                return
+            for key in [key for key in self._data if match(key)]:
+                del self._data[key]
+
+    def clear_expired(self):
+        """Removes all expired objects"""
+        now = time.time()
+        self.invalidate(lambda key: self._data[key][0] < now)
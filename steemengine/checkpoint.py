@@ -0,0 +1,123 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import io
+import json
+import os
+import sqlite3
+import threading
+from builtins import str
+
+
+class FileCheckpointStore(object):
+    """ Stores checkpoints as JSON file
+
+        The file is written to a temporary file first and then renamed,
+        so that a crash does not leave a broken file behind.
+
+        :param str path: path of the JSON file
+
+        .. code-block:: python
+
+            from steemengine.checkpoint import FileCheckpointStore
+            store = FileCheckpointStore("checkpoints.json")
+            store.set("holger80:ENG", {"block": 1})
+            print(store.get("holger80:ENG"))
+
+    """
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self._checkpoints = None
+
+    def _load(self):
+        if self._checkpoints is None:
+            if os.path.exists(self.path):
+                with io.open(self.path, "r", encoding="utf-8") as f:
+                    self._checkpoints = json.load(f)
+            else:
+                self._checkpoints = {}
+        return self._checkpoints
+
+    def get(self, key, default=None):
+        """Returns the checkpoint stored under key"""
+        with self.lock:
+            return self._load().get(key, default)
+
+    def _write(self):
+        tmp_path = self.path + ".tmp"
+        with io.open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self._checkpoints, ensure_ascii=False))
+        if os.path.exists(self.path) and os.name == "nt":
+            os.remove(self.path)
+        os.rename(tmp_path, self.path)
+
+    def set(self, key, value):
+        """Stores a JSON serializable checkpoint under key"""
+        with self.lock:
+            self._load()[key] = value
+            self._write()
+
+    def delete(self, key):
+        """Removes the checkpoint stored under key"""
+        with self.lock:
+            if self._load().pop(key, None) is not None:
+                self._write()
+
+
+class SQLiteCheckpointStore(object):
+    """ Stores checkpoints in a SQLite database
+
+        :param str path: path of the database file
+
+        .. code-block:: python
+
+            from steemengine.checkpoint import SQLiteCheckpointStore
+            store = SQLiteCheckpointStore("checkpoints.db")
+            store.set("holger80:ENG", {"block": 1})
+            print(store.get("holger80:ENG"))
+
+    """
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS checkpoints (key TEXT PRIMARY KEY, value TEXT)")
+
+    def get(self, key, default=None):
+        """Returns the checkpoint stored under key"""
+        with self.lock:
+            row = self.db.execute("SELECT value FROM checkpoints WHERE key = ?", (key, )).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Stores a JSON serializable checkpoint under key"""
+        with self.lock:
+            with self.db:
+                self.db.execute("INSERT OR REPLACE INTO checkpoints (key, value) VALUES (?, ?)",
+                                (key, json.dumps(value)))
+
+    def delete(self, key):
+        """Removes the checkpoint stored under key"""
+        with self.lock:
+            with self.db:
+                self.db.execute("DELETE FROM checkpoints WHERE key = ?", (key, ))
+
+    def close(self):
+        self.db.close()
+
+
+def get_checkpoint_store(checkpoint_store):
+    """Returns a checkpoint store. A path ending with ``.db`` or ``.sqlite``
+        is opened as :class:`SQLiteCheckpointStore`, other paths as
+        :class:`FileCheckpointStore`. Stores and None are returned unchanged.
+    """
+    if isinstance(checkpoint_store, str):
+        if checkpoint_store.endswith(".db") or checkpoint_store.endswith(".sqlite"):
+            return SQLiteCheckpointStore(checkpoint_store)
+        return FileCheckpointStore(checkpoint_store)
+    return checkpoint_store
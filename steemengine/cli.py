@@ -15,8 +15,10 @@ from steemengine.tokens import Tokens
 from steemengine.tokenobject import Token
 from steemengine.market import Market
 from steemengine.wallet import Wallet
+from steemengine.holders import HolderStats, NUMPY_AVAILABLE
+from steemengine.portfolio import Portfolio
+from steemengine.sweep import prefetch_sweep_data, plan_sweep, execute_sweep
 from prettytable import PrettyTable
-import time
 import json
 import click
 import logging
@@ -24,6 +26,7 @@ import sys
 import os
 import io
 import argparse
+import csv
 import re
 import six
 from beem.instance import set_shared_blockchain_instance, shared_blockchain_instance
@@ -115,6 +118,43 @@ def cli(node, no_broadcast, verbose):
     pass
 
 
+def sweep_wallet(action, account, stm, to=None, memo=""):
+    """Transfers, stakes, unstakes or sells all tokens of the account after one confirmation"""
+    wallet, tokens, metrics = prefetch_sweep_data(account, steem_instance=stm)
+    plan = plan_sweep(action, wallet, tokens, metrics)
+    if len(plan) == 0:
+        print("Nothing to %s" % action)
+        return
+    t = PrettyTable(["Action", "Amount", "Token", "Price", "Value [STEEM]"])
+    t.align = "l"
+    total_value = 0
+    for entry in plan:
+        if entry["value"] is None:
+            t.add_row([action, str(entry["amount"]), entry["symbol"], "-", "-"])
+        else:
+            total_value += entry["value"]
+            t.add_row([action, str(entry["amount"]), entry["symbol"], entry["price"], "%.3f" % entry["value"]])
+    t.add_row(["", "", "", "Sum", "%.3f" % total_value])
+    print(t.get_string())
+    if action == "transfer":
+        print("%s %d tokens to %s?" % (action, len(plan), to))
+    else:
+        print("%s %d tokens?" % (action, len(plan)))
+    ret = input("continue [y/n]?")
+    if ret not in ["y", "yes"]:
+        return
+    results = execute_sweep(action, plan, wallet, to=to, memo=memo)
+    for entry, tx in zip(plan, results):
+        if isinstance(tx, Exception):
+            print("%s %s failed: %s" % (action, entry["symbol"], str(tx)))
+    txs = []
+    for tx in results:
+        if not isinstance(tx, Exception) and tx not in txs:
+            txs.append(tx)
+    for tx in txs:
+        print(json.dumps(tx, indent=4))
+
+
 @cli.command()
 @click.argument('objects', nargs=-1)
 def info(objects):
@@ -148,8 +188,8 @@ def info(objects):
                 t.add_row(["trx_nr", str(trx_nr)])
                 t.add_row(["action", trx["action"]])
                 t.add_row(["contract", trx["contract"]])
-                t.add_row(["logs", json.dumps(json.loads(trx["logs"]), indent=4)])
-                t.add_row(["payload", json.dumps(json.loads(trx["payload"]), indent=4)])
+                t.add_row(["logs", json.dumps(trx.logs, indent=4)])
+                t.add_row(["payload", json.dumps(trx.payload, indent=4)])
                 t.add_row(["refSteemBlockNumber", trx["refSteemBlockNumber"]])
                 t.add_row(["timestamp", block_info["timestamp"]])
                 t.add_row(["sender", trx["sender"]])
@@ -208,8 +248,8 @@ def info(objects):
             if trx is None:
                 print("trx_id: %s is not a valid steem-engine trx_id!" % obj)
                 return
-            payload = json.loads(trx["payload"])
-            logs = json.loads(trx["logs"])
+            payload = trx.payload
+            logs = trx.logs
             t = PrettyTable(["Key", "Value"])
             t.align = "l"
             t.add_row(["blockNumber", str(trx["blockNumber"])])
@@ -226,22 +266,136 @@ def info(objects):
 @cli.command()
 @click.argument('symbol', nargs=1)
 @click.option('--top', '-t', help='Show only the top n accounts', default=50)
-def richlist(symbol, top):
+@click.option('--all', '-a', 'show_all', help='Show all accounts', is_flag=True, default=False)
+@click.option('--stats', '-s', help='Show holder statistics', is_flag=True, default=False)
+def richlist(symbol, top, show_all, stats):
     """ Shows the richlist of a token
 
     """
     token = Token(symbol)
-    holder = token.get_holder()
-    market_info = token.get_market_info()
-    last_price = float(market_info["lastPrice"])
-    sorted_holder = sorted(holder, key=lambda account: float(account["balance"]), reverse=True)
-    t = PrettyTable(["Balance", "Account", "Value [STEEM]"])
+    if show_all:
+        top = None
+    else:
+        top = int(top)
+    if not NUMPY_AVAILABLE:
+        if stats:
+            print("numpy is required for --stats")
+            return
+        holder = token.get_holder()
+        market_info = token.get_market_info()
+        last_price = float(market_info["lastPrice"])
+        sorted_holder = sorted(holder, key=lambda account: float(account["balance"]), reverse=True)
+        t = PrettyTable(["Balance", "Account", "Value [STEEM]"])
+        t.align = "l"
+        for balance in sorted_holder[:top]:
+            t.add_row([balance["balance"], balance["account"], "%.3f" % (float(balance["balance"]) * last_price)])
+        print(t.get_string())
+        return
+    holder_stats = HolderStats(token.symbol)
+    precision = token["precision"]
+    t = PrettyTable(["Balance", "Stake", "Account", "Value [STEEM]"])
+    t.align = "l"
+    for index in holder_stats.top_indices(top, field="balance"):
+        holder = holder_stats.get_holder_strings(index)
+        t.add_row([holder["balance"], holder["stake"], holder["account"],
+                   "%.3f" % (holder_stats.balance[index] * holder_stats.last_price)])
+    print(t.get_string())
+    if stats:
+        holder_info = holder_stats.get_stats()
+        t = PrettyTable(["Key", "Value"])
+        t.align = "l"
+        t.add_row(["Holders", holder_info["holders"]])
+        t.add_row(["Balance", "{0:.{1}f}".format(holder_stats.get_sum("balance"), precision)])
+        t.add_row(["Stake", "{0:.{1}f}".format(holder_stats.get_sum("stake"), precision)])
+        t.add_row(["Pending unstake", "{0:.{1}f}".format(holder_stats.get_sum("pendingUnstake"), precision)])
+        t.add_row(["Last price [STEEM]", holder_info["last_price"]])
+        t.add_row(["Value [STEEM]", "%.3f" % holder_info["value"]])
+        t.add_row(["Gini coefficient", "%.4f" % holder_info["gini"]])
+        t.add_row(["Top 10 share", "%.2f %%" % (holder_info["top10"] * 100)])
+        t.add_row(["Top 100 share", "%.2f %%" % (holder_info["top100"] * 100)])
+        print(t.get_string())
+
+
+@cli.command()
+@click.argument('accounts', nargs=-1)
+@click.option('--file', '-f', help='Read the account names from this file (one account per line)')
+def portfolio(accounts, file):
+    """ Shows the STEEM value of the token balances of accounts
+
+    """
+    accounts = list(accounts)
+    if file:
+        with io.open(file, encoding="utf-8") as f:
+            accounts += [line.strip() for line in f if len(line.strip()) > 0]
+    if len(accounts) == 0:
+        print("No accounts given")
+        return
+    if not NUMPY_AVAILABLE:
+        print("numpy is required for portfolio")
+        return
+    t = PrettyTable(["Account", "Tokens", "Value [STEEM]"])
     t.align = "l"
-    for balance in sorted_holder[:int(top)]:
-        t.add_row([balance["balance"], balance["account"], "%.3f" % (float(balance["balance"]) * last_price)])
+    total_value = 0
+    for result in Portfolio(accounts):
+        total_value += result["value"]
+        t.add_row([result["account"], len(result["balances"]), "%.3f" % result["value"]])
+    t.add_row(["Sum", "", "%.3f" % total_value])
     print(t.get_string())
 
 
+@cli.command()
+@click.argument('csv_file', nargs=1)
+@click.argument('token', nargs=1)
+@click.option('--memo', '-m', help='Memo for all transfers without a memo column', default='')
+@click.option('--account', '-a', help='Transfer from this account')
+@click.option('--journal', '-j', help='Journal file for resuming an interrupted airdrop (default is <csv_file>.journal)')
+def airdrop(csv_file, token, memo, account, journal):
+    """Transfers a token to all accounts from a CSV file
+
+        Each line of the CSV file contains an account name, an amount and an optional memo.
+    """
+    stm = shared_blockchain_instance()
+    if stm.rpc is not None:
+        stm.rpc.rpcconnect()
+    if not account:
+        account = stm.config["default_account"]
+    if not journal:
+        journal = csv_file + ".journal"
+    recipients = []
+    with io.open(csv_file, encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or len(row[0].strip()) == 0:
+                continue
+            try:
+                amount = float(row[1])
+            except ValueError:
+                # header line
+                continue
+            row_memo = None
+            if len(row) > 2 and len(row[2].strip()) > 0:
+                row_memo = row[2].strip()
+            recipients.append((row[0].strip(), row[1].strip(), row_memo))
+    if len(recipients) == 0:
+        print("No recipients found in %s" % csv_file)
+        return
+    total_amount = sum([float(r[1]) for r in recipients])
+    print("airdrop %.8f %s to %d accounts from %s?" % (total_amount, token.upper(), len(recipients), account))
+    ret = input("continue [y/n]?")
+    if ret not in ["y", "yes"]:
+        return
+    if not unlock_wallet(stm):
+        return
+    wallet = Wallet(account, steem_instance=stm)
+    results = wallet.bulk_transfer(recipients, token, memo=memo, journal=journal)
+    skipped = len([tx for tx in results if tx is None])
+    failed = [recipients[i][0] for i, tx in enumerate(results) if isinstance(tx, Exception)]
+    print("%d transfers broadcasted, %d skipped (already in journal), %d failed" %
+          (len(results) - skipped - len(failed), skipped, len(failed)))
+    if len(failed) > 0:
+        print("Failed transfers to: %s" % ", ".join(failed))
+        print("Start the airdrop again to retry them.")
+
+
 @cli.command()
 @click.argument('to', nargs=1)
 @click.argument('amount', nargs=1, required=False)
@@ -262,38 +416,11 @@ def transfer(to, amount, token, memo, memos, account):
         memos = ''    
     if not unlock_wallet(stm):
         return
-    wallet = Wallet(account, steem_instance=stm)
     if amount is None and token is None:
-        token = amount
-        amount = 0
-        tokens = Tokens()
-        
-        for t in wallet:
-            token = t["symbol"]
-            amount = float(t["balance"])
-            if amount == 0:
-                continue
-            token_obj = tokens.get_token(token)
-            market_info = token_obj.get_market_info()
-            if market_info is None:
-                print("transfer  %.8f %s to %s?" % (amount, token, to))
-            else:
-                last_price = float(market_info["lastPrice"])
-                highest_bid = float(market_info["highestBid"])
-                if highest_bid == 0:
-                    price = last_price
-                else:
-                    price = highest_bid
-                hive_amount = price*amount
-                print("transfer %.8f %s (value %.3f STEEM) to %s?" % (amount, token, hive_amount, to))
-            ret = input("continue [y/n]?")
-            if ret not in ["y", "yes"]:
-                continue
-            tx = wallet.transfer(to, amount, token, memos)
-            tx = json.dumps(tx, indent=4)
-            print(tx)
+        sweep_wallet("transfer", account, stm, to=to, memo=memos)
         return
-    elif token is None:
+    wallet = Wallet(account, steem_instance=stm)
+    if token is None:
         token = amount
         amount = 0
         for t in wallet:
@@ -361,39 +488,11 @@ def stake(amount, token, account):
         account = stm.config["default_account"]
     if not unlock_wallet(stm):
         return
-    wallet = Wallet(account, steem_instance=stm)
     if amount is None and token is None:
-        token = amount
-        amount = 0
-        tokens = Tokens()
-        for t in wallet:
-            token = t["symbol"]
-            amount = float(t["balance"])
-            if amount == 0:
-                continue
-            token_obj = tokens.get_token(token)
-            if not token_obj["stakingEnabled"]:
-                continue
-            market_info = token_obj.get_market_info()
-            if market_info is None:
-                print("stake %.8f %s?" % (amount, token))
-            else:
-                last_price = float(market_info["lastPrice"])
-                highest_bid = float(market_info["highestBid"])
-                if highest_bid == 0:
-                    price = last_price
-                else:
-                    price = highest_bid
-                steem_amount = price*amount
-                print("stake %.8f %s (value %.3f STEEM)?" % (amount, token, steem_amount))
-            ret = input("continue [y/n]?")
-            if ret not in ["y", "yes"]:
-                continue
-            tx = wallet.stake(amount, token)
-            tx = json.dumps(tx, indent=4)
-            print(tx)
+        sweep_wallet("stake", account, stm)
         return
-    elif token is None:
+    wallet = Wallet(account, steem_instance=stm)
+    if token is None:
         token = amount
         amount = 0
         for t in wallet:
@@ -440,41 +539,11 @@ def unstake(amount, token, account):
         account = stm.config["default_account"]
     if not unlock_wallet(stm):
         return
-    wallet = Wallet(account, steem_instance=stm)
     if amount is None and token is None:
-        token = amount
-        amount = 0
-        tokens = Tokens()
-        
-        for t in wallet:
-            token = t["symbol"]
-            amount = float(t["balance"])
-            stake = float(t["stake"])
-            if stake == 0:
-                continue
-            token_obj = tokens.get_token(token)
-            if not token_obj["stakingEnabled"]:
-                continue
-            market_info = token_obj.get_market_info()
-            if market_info is None:
-                print("unstake %.8f %s?" % (stake, token))
-            else:
-                last_price = float(market_info["lastPrice"])
-                highest_bid = float(market_info["highestBid"])
-                if highest_bid == 0:
-                    price = last_price
-                else:
-                    price = highest_bid
-                steem_amount = price*stake
-                print("unstake %.8f %s (value %.3f STEEM)?" % (stake, token, steem_amount))
-            ret = input("continue [y/n]?")
-            if ret not in ["y", "yes"]:
-                continue
-            tx = wallet.unstake(stake, token)
-            tx = json.dumps(tx, indent=4)
-            print(tx)
+        sweep_wallet("unstake", account, stm)
         return
-    elif token is None:
+    wallet = Wallet(account, steem_instance=stm)
+    if token is None:
         token = amount
         amount = 0
         for t in wallet:
@@ -613,38 +682,8 @@ def sell(amount, token, price, account):
     if amount is None and price is None and token is None:
         if not unlock_wallet(stm):
             return
-        token = amount
-        amount = 0
-        tokens = Tokens()
-        wallet = Wallet(account, steem_instance=stm)
-        market = Market(steem_instance=stm)
-        for t in wallet:
-            token = t["symbol"]
-            amount = float(t["balance"])
-            if amount == 0:
-                continue
-            token_obj = tokens.get_token(token)
-            market_info = token_obj.get_market_info()
-            if market_info is None:
-                continue
-            last_price = float(market_info["lastPrice"])
-            highest_bid = float(market_info["highestBid"])
-            if highest_bid == 0:
-                price = last_price
-            else:
-                price = highest_bid
-            steem_amount = price*amount
-            if steem_amount < 0.001:
-                continue
-            print("%s: using %.8f as price to sell %.8f %s for %.8f STEEM" % (token, price, amount, token, steem_amount))
-            ret = input("continue [y/n]?")
-            if ret not in ["y", "yes"]:
-                continue
-            tx = market.sell(account, amount, token, price)
-            tx = json.dumps(tx, indent=4)
-            print(tx)
+        sweep_wallet("sell", account, stm)
         return
-        
     elif price is None and token is None:
         token = amount
         amount = 0
@@ -699,42 +738,32 @@ def cancel(order_type, order_id, account, yes):
     market = Market(steem_instance=stm)
     if not unlock_wallet(stm):
         return
-    if order_id is None and order_type == "buy":
-        wallet = Wallet(account, steem_instance=stm)
-        for t in wallet:
-            token = t["symbol"]
-            buy_book = market.get_buy_book(token, account)
-            sorted_buy_book = sorted(buy_book, key=lambda account: float(account["price"]), reverse=True)    
-            for order in sorted_buy_book:
-                print("Cancel sell order with id: %s for %.8f %s at %s" % (order["_id"], float(order["quantity"]), token, float(order["price"])))
-                if not yes:
-                    ret = input("continue [y/n]?")
-                    if ret not in ["y", "yes"]:
-                        continue            
-                tx = market.cancel(account, order_type, int(order_id))
-                tx = json.dumps(tx, indent=4)
-                print(tx)
-                if yes:
-                    time.sleep(4)
+    if order_id is None:
+        orders = market.get_open_orders(account, order_type=order_type)
+        if len(orders) == 0:
+            print("No open %s orders" % order_type)
+            return
+        orders = sorted(orders, key=lambda order: (order["symbol"], -float(order["price"])))
+        t = PrettyTable(["order_id", "token", "quantity", "price"])
+        t.align = "l"
+        for order in orders:
+            t.add_row([order["_id"], order["symbol"], order["quantity"], order["price"]])
+        print(t.get_string())
+        if not yes:
+            print("Cancel %d %s orders?" % (len(orders), order_type))
+            ret = input("continue [y/n]?")
+            if ret not in ["y", "yes"]:
+                return
+        results = market.cancel_orders(account, orders)
+        txs = []
+        for order, tx in zip(orders, results):
+            if isinstance(tx, Exception):
+                print("Cancel of order %s failed: %s" % (order["_id"], str(tx)))
+            elif tx not in txs:
+                txs.append(tx)
+        for tx in txs:
+            print(json.dumps(tx, indent=4))
         return
-    elif order_id is None and order_type == "sell":
-        wallet = Wallet(account, steem_instance=stm)
-        for t in wallet:
-            token = t["symbol"]
-            sell_book = market.get_sell_book(token, account)
-            sorted_sell_book = sorted(sell_book, key=lambda account: float(account["price"]), reverse=True)    
-            for order in sorted_sell_book:
-                print("Cancel sell order with id: %s for %.8f %s at %s" % (order["_id"], float(order["quantity"]), token, float(order["price"])))
-                if not yes:
-                    ret = input("continue [y/n]?")
-                    if ret not in ["y", "yes"]:
-                        continue            
-                tx = market.cancel(account, order_type, int(order_id))
-                tx = json.dumps(tx, indent=4)
-                print(tx)
-                if yes:
-                    time.sleep(4)                
-        return        
     tx = market.cancel(account, order_type, int(order_id))
     tx = json.dumps(tx, indent=4)
     print(tx)
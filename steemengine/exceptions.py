@@ -39,3 +39,15 @@ class MaxSupplyReached(Exception):
     """ Only the token issuer is allowed to permit new tokens
     """
     pass
+
+
+class CustomJsonTooLarge(Exception):
+    """ The contract action does not fit into one custom_json operation
+    """
+    pass
+
+
+class SnapshotNotConsistent(Exception):
+    """ The head block changed while a snapshot was fetched
+    """
+    pass
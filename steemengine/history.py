@@ -0,0 +1,119 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import logging
+from steemengine.api import Api
+from steemengine.checkpoint import get_checkpoint_store
+
+log = logging.getLogger(__name__)
+
+
+class AccountHistory(object):
+    """ Iterates over new operations of the token history of an account
+
+        The history is requested page by page (newest operations first) until
+        the stored checkpoint is reached. The new operations are returned
+        oldest first and the checkpoint is stored after each returned
+        operation, so that each poll only downloads new operations and
+        a restart continues after the last returned operation.
+
+        :param str account: account name
+        :param str symbol: token symbol
+        :param Api api: Api instance
+        :param checkpoint_store: :class:`steemengine.checkpoint.FileCheckpointStore`,
+            :class:`steemengine.checkpoint.SQLiteCheckpointStore` or path
+            to a JSON file (a path ending with ``.db`` or ``.sqlite`` is stored
+            as SQLite database). The checkpoint is only kept in memory when not set.
+        :param int page_size: number of operations per request
+        :param str histtype: history type (default is user)
+
+        .. code-block:: python
+
+            import time
+            from steemengine.history import AccountHistory
+            history = AccountHistory("holger80", "ENG", checkpoint_store="history.json")
+            while True:
+                for op in history:
+                    print(op)
+                time.sleep(60)
+
+    """
+    def __init__(self, account, symbol, api=None, checkpoint_store=None, page_size=500, histtype="user"):
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        self.account = account
+        self.symbol = symbol.upper()
+        self.page_size = page_size
+        self.histtype = histtype
+        self.checkpoint_store = get_checkpoint_store(checkpoint_store)
+        self.checkpoint_key = "%s:%s:%s" % (self.account, self.symbol, self.histtype)
+        self.checkpoint = None
+        if self.checkpoint_store is not None:
+            self.checkpoint = self.checkpoint_store.get(self.checkpoint_key)
+
+    def get_op_id(self, op):
+        """Returns a unique id for an operation"""
+        if "_id" in op:
+            return op["_id"]
+        return "%s:%s:%s:%s" % (op.get("txid"), op.get("from"), op.get("to"), op.get("quantity"))
+
+    def is_new(self, op):
+        """Returns True when the operation is newer than the checkpoint"""
+        if self.checkpoint is None:
+            return True
+        block = int(op["block"])
+        if block != self.checkpoint["block"]:
+            return block > self.checkpoint["block"]
+        return self.get_op_id(op) not in self.checkpoint["ids"]
+
+    def get_new_operations(self):
+        """Returns all operations after the checkpoint, oldest first.
+            The checkpoint is not changed.
+        """
+        new_ops = []
+        seen = set()
+        offset = 0
+        while True:
+            page = self.api.get_history(self.account, self.symbol, limit=self.page_size, offset=offset,
+                                        histtype=self.histtype)
+            if page is None or len(page) == 0:
+                break
+            reached_checkpoint = False
+            for op in page:
+                if not self.is_new(op):
+                    reached_checkpoint = True
+                    break
+                op_id = self.get_op_id(op)
+                if op_id in seen:
+                    continue
+                seen.add(op_id)
+                new_ops.append(op)
+            if reached_checkpoint or len(page) < self.page_size:
+                break
+            offset += len(page)
+        new_ops.reverse()
+        new_ops.sort(key=lambda op: int(op["block"]))
+        return new_ops
+
+    def set_checkpoint(self, op):
+        """Moves the checkpoint to the given operation and stores it"""
+        block = int(op["block"])
+        if self.checkpoint is None or block > self.checkpoint["block"]:
+            self.checkpoint = {"block": block, "ids": []}
+        self.checkpoint["ids"].append(self.get_op_id(op))
+        if self.checkpoint_store is not None:
+            self.checkpoint_store.set(self.checkpoint_key, self.checkpoint)
+
+    def reset(self):
+        """Removes the checkpoint, so that the whole history is returned again"""
+        self.checkpoint = None
+        if self.checkpoint_store is not None:
+            self.checkpoint_store.delete(self.checkpoint_key)
+
+    def __iter__(self):
+        for op in self.get_new_operations():
+            yield op
+            self.set_checkpoint(op)
@@ -0,0 +1,186 @@
+"""Holder statistics of a token (requires numpy)."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import decimal
+from array import array
+from steemengine.api import Api
+from steemengine.tokenobject import Token
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Fields of the balances table which are stored
+HOLDER_FIELDS = ["balance", "stake", "pendingUnstake"]
+
+
+class HolderStats(object):
+    """ Loads all holders of a token into numpy arrays
+
+        ``balance``, ``stake`` and ``pendingUnstake`` are stored as float
+        arrays, ``accounts`` is the list of account names with the same
+        index. ``total`` is the sum of all three fields. The float arrays are
+        only exact up to about 15 digits, so they are used for ranking and
+        statistics. The amounts as returned by the chain are kept in
+        ``amount_strings`` for displaying them (:func:`get_holder_strings`).
+
+        :param str symbol: token symbol
+        :param Api api: Api instance
+        :param float last_price: price in STEEM, the last price from the market
+            metrics is used when not set
+        :param int page_size: number of holders per request
+
+        .. code-block:: python
+
+            from steemengine.holders import HolderStats
+            stats = HolderStats("ENG")
+            for holder in stats.top(10):
+                print(holder["account"], holder["balance"])
+            print(stats.gini())
+
+    """
+    def __init__(self, symbol, api=None, last_price=None, page_size=1000):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for steemengine.holders")
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        self.symbol = symbol.upper()
+        self.page_size = page_size
+        self.last_price = last_price
+        self.refresh()
+
+    def refresh(self):
+        """Fetches all holders and the last price"""
+        accounts = []
+        columns = [array("d") for field in HOLDER_FIELDS]
+        strings = [[] for field in HOLDER_FIELDS]
+        for holder in self.api.find_all("tokens", "balances", query={"symbol": self.symbol},
+                                        page_size=self.page_size):
+            accounts.append(holder["account"])
+            for field, column, column_strings in zip(HOLDER_FIELDS, columns, strings):
+                amount = holder.get(field) or "0"
+                column.append(float(amount))
+                column_strings.append(amount)
+        self.accounts = accounts
+        self.amount_strings = dict(zip(HOLDER_FIELDS, strings))
+        self.balance, self.stake, self.pendingUnstake = [np.frombuffer(column, dtype=np.float64)
+                                                         if len(column) > 0 else np.zeros(0)
+                                                         for column in columns]
+        self.total = self.balance + self.stake + self.pendingUnstake
+        if self.last_price is None:
+            self.last_price = self.get_last_price()
+
+    def get_last_price(self):
+        """Returns the last price in STEEM from the market metrics"""
+        if self.symbol == "STEEMP":
+            return 1.
+        metrics = Token(self.symbol, api=self.api).get_market_info()
+        if not metrics:
+            return 0.
+        return float(metrics.get("lastPrice") or 0)
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def get_amounts(self, field="total"):
+        """Returns the amounts of all holders
+
+            :param str field: ``balance``, ``stake``, ``pendingUnstake`` or ``total``
+        """
+        if field not in HOLDER_FIELDS and field != "total":
+            raise ValueError("field must be one of %s or total" % ", ".join(HOLDER_FIELDS))
+        return getattr(self, field)
+
+    def get_holder(self, index):
+        """Returns the holder with the given index as dict"""
+        return {"account": self.accounts[index], "balance": float(self.balance[index]),
+                "stake": float(self.stake[index]), "pendingUnstake": float(self.pendingUnstake[index]),
+                "total": float(self.total[index]), "value": float(self.total[index] * self.last_price)}
+
+    def get_holder_strings(self, index):
+        """Returns the holder with the given index as dict with the
+            ``balance``, ``stake`` and ``pendingUnstake`` strings as
+            returned by the chain
+        """
+        holder = {"account": self.accounts[index]}
+        for field in HOLDER_FIELDS:
+            holder[field] = self.amount_strings[field][index]
+        return holder
+
+    def get_sum(self, field="total"):
+        """Returns the exact sum of all holder amounts as decimal.Decimal
+
+            :param str field: ``balance``, ``stake``, ``pendingUnstake`` or ``total``
+        """
+        if field not in HOLDER_FIELDS and field != "total":
+            raise ValueError("field must be one of %s or total" % ", ".join(HOLDER_FIELDS))
+        fields = HOLDER_FIELDS if field == "total" else [field]
+        amount_sum = decimal.Decimal(0)
+        for f in fields:
+            for amount in self.amount_strings[f]:
+                amount_sum += decimal.Decimal(amount)
+        return amount_sum
+
+    def top_indices(self, n=50, field="total"):
+        """Returns the indices of the n largest holders, sorted by amount"""
+        amounts = self.get_amounts(field)
+        if n is None or n >= len(amounts):
+            return np.argsort(-amounts, kind="mergesort")
+        if n <= 0:
+            return np.zeros(0, dtype=np.intp)
+        indices = np.argpartition(-amounts, n - 1)[:n]
+        return indices[np.argsort(-amounts[indices], kind="mergesort")]
+
+    def top(self, n=50, field="total"):
+        """Returns the n largest holders as list of dicts. All holders are
+            returned when n is None.
+
+            :param int n: number of holders
+            :param str field: amount which is used for sorting
+        """
+        return [self.get_holder(index) for index in self.top_indices(n, field)]
+
+    def gini(self, field="total"):
+        """Returns the gini coefficient of the holder amounts
+            (0 is an equal distribution, 1 means one holder has everything)
+        """
+        amounts = np.sort(self.get_amounts(field))
+        n = len(amounts)
+        amount_sum = amounts.sum()
+        if n == 0 or amount_sum == 0:
+            return 0.
+        ranks = np.arange(1, n + 1)
+        return float(2. * np.dot(ranks, amounts) / (n * amount_sum) - (n + 1.) / n)
+
+    def concentration(self, n=10, field="total"):
+        """Returns the share of the n largest holders of the sum of all amounts"""
+        amounts = self.get_amounts(field)
+        amount_sum = amounts.sum()
+        if amount_sum == 0:
+            return 0.
+        return float(amounts[self.top_indices(n, field)].sum() / amount_sum)
+
+    def get_value(self, field="total"):
+        """Returns the STEEM value of all holders as array"""
+        return self.get_amounts(field) * self.last_price
+
+    def get_stats(self):
+        """Returns a dict with holder statistics"""
+        return {"symbol": self.symbol,
+                "holders": int(np.count_nonzero(self.total)),
+                "accounts": len(self),
+                "balance": float(self.balance.sum()),
+                "stake": float(self.stake.sum()),
+                "pendingUnstake": float(self.pendingUnstake.sum()),
+                "total": float(self.total.sum()),
+                "last_price": self.last_price,
+                "value": float(self.get_value().sum()),
+                "gini": self.gini(),
+                "top10": self.concentration(10),
+                "top100": self.concentration(100)}
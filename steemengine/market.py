@@ -13,6 +13,8 @@ from steemengine.api import Api
 from steemengine.tokens import Tokens
 from steemengine.tokenobject import Token
 from steemengine.wallet import Wallet
+from steemengine.orderbook import OrderBook
+from steemengine.actionbatch import ActionBatch, get_order_action
 from steemengine.exceptions import (TokenDoesNotExists, TokenNotInWallet, InsufficientTokenAmount, InvalidTokenAmount)
 from beem.instance import shared_steem_instance
 from beem.account import Account
@@ -41,9 +43,25 @@ class Market(list):
         """Sets the ssc id (default is ssc-mainnet1)"""
         self.ssc_id = ssc_id
 
+    def batch(self, account):
+        """Returns an :class:`steemengine.actionbatch.ActionBatch` for the given account.
+            Actions which are added to the batch are broadcasted together by ``flush()``.
+        """
+        return ActionBatch(account, steem_instance=self.steem, ssc_id=self.ssc_id)
+
+    def _broadcast(self, account, json_data, batch=None):
+        """Broadcasts the action or adds it to the batch, which has to be
+            signed by the account
+        """
+        if batch is not None:
+            if batch.account != account:
+                raise ValueError("The batch is signed by %s and not by %s" % (batch.account, account))
+            return batch.append(json_data)
+        return self.steem.custom_json(self.ssc_id, json_data, required_auths=[account])
+
     def get_metrics(self):
-        """Returns all token within the wallet as list"""
-        metrics = self.api.find("market", "metrics", query={})
+        """Returns the market metrics of all token as list"""
+        metrics = list(self.api.find_all("market", "metrics", query={}))
         return metrics
 
     def get_buy_book(self, symbol, account=None, limit=100, offset=0):
@@ -70,6 +88,14 @@ class Market(list):
             sell_book = self.api.find("market", "sellBook", query={"symbol": symbol.upper(), "account": account}, limit=limit, offset=offset)
         return sell_book
 
+    def get_order_book(self, symbol):
+        """Returns the full OrderBook for a given symbol, which can be updated
+            from streamed blocks.
+        """
+        if self.tokens.get_token(symbol) is None:
+            raise TokenDoesNotExists("%s does not exists" % symbol)
+        return OrderBook(symbol, api=self.api)
+
     def get_trades_history(self, symbol, account=None, limit=30, offset=0):
         """Returns the trade history for a given symbol. When account is set,
             the trade history from the given account is shown.
@@ -140,13 +166,15 @@ class Market(list):
         tx = acc.transfer("steem-peg", amount, "STEEM", memo=json_data)
         return tx
 
-    def buy(self, account, amount, symbol, price):
+    def buy(self, account, amount, symbol, price, batch=None):
         """Buy token for given price.
 
             :param str account: account name
             :param float amount: Amount to withdraw
             :param str symbol: symbol
             :param float price: price
+            :param ActionBatch batch: (optional) the action is added to the batch and
+                its index is returned instead of broadcasting it
 
             Buy example:
 
@@ -170,19 +198,17 @@ class Market(list):
         quant_amount = token.quantize(amount)
         if quant_amount <= decimal.Decimal("0"):
             raise InvalidTokenAmount("Amount to transfer is below token precision of %d" % token["precision"])           
-        contract_payload = {"symbol": symbol.upper(), "quantity":str(quant_amount), "price": str(price)}
-        json_data = {"contractName":"market","contractAction":"buy",
-                     "contractPayload":contract_payload}
-        tx = self.steem.custom_json(self.ssc_id, json_data, required_auths=[account])
-        return tx
+        return self._broadcast(account, get_order_action("buy", quant_amount, symbol, price), batch=batch)
 
-    def sell(self, account, amount, symbol, price):
+    def sell(self, account, amount, symbol, price, batch=None):
         """Sell token for given price.
 
             :param str account: account name
             :param float amount: Amount to withdraw
             :param str symbol: symbol
             :param float price: price
+            :param ActionBatch batch: (optional) the action is added to the batch and
+                its index is returned instead of broadcasting it
 
             Sell example:
 
@@ -206,18 +232,83 @@ class Market(list):
         quant_amount = token.quantize(amount)
         if quant_amount <= decimal.Decimal("0"):
             raise InvalidTokenAmount("Amount to transfer is below token precision of %d" % token["precision"])        
-        contract_payload = {"symbol": symbol.upper(), "quantity":str(quant_amount), "price": str(price)}
-        json_data = {"contractName":"market","contractAction":"sell",
-                     "contractPayload":contract_payload}
-        tx = self.steem.custom_json(self.ssc_id, json_data, required_auths=[account])
-        return tx
+        return self._broadcast(account, get_order_action("sell", quant_amount, symbol, price), batch=batch)
+
+    def get_open_orders(self, account, order_type=None, symbols=None):
+        """Returns all open orders of an account. The orders of all tokens are
+            requested with one paged query per order book. A ``type`` field
+            (buy or sell) is added to each order.
+
+            :param str account: account name
+            :param str order_type: buy, sell or None for both
+            :param list symbols: (optional) only orders of these tokens are returned
+        """
+        if order_type is None:
+            order_types = ["buy", "sell"]
+        elif order_type in ["buy", "sell"]:
+            order_types = [order_type]
+        else:
+            raise ValueError("order_type must be buy, sell or None")
+        query = {"account": account}
+        if symbols is not None:
+            query["symbol"] = {"$in": [symbol.upper() for symbol in symbols]}
+        orders = []
+        for book_type in order_types:
+            for order in self.api.find_all("market", book_type + "Book", query=query):
+                order = dict(order)
+                order["type"] = book_type
+                orders.append(order)
+        return orders
+
+    def cancel_orders(self, account, orders, batch=None):
+        """Cancels the given orders (from :meth:`get_open_orders`) with as few
+            broadcasts as possible.
 
-    def cancel(self, account, order_type, order_id):
+            :param str account: account name
+            :param list orders: orders with ``type`` and ``_id``
+            :param ActionBatch batch: (optional) the cancel actions are added to
+                the batch and the batch is not flushed
+            :return: list with the broadcast result of each order
+        """
+        if batch is not None:
+            return [self.cancel(account, order["type"], order["_id"], batch=batch) for order in orders]
+        batch = self.batch(account)
+        for order in orders:
+            self.cancel(account, order["type"], order["_id"], batch=batch)
+        return batch.flush()
+
+    def cancel_all(self, account, order_type=None, symbols=None, batch=None):
+        """Cancels all open orders of an account
+
+            :param str account: account name
+            :param str order_type: buy, sell or None for both
+            :param list symbols: (optional) only orders of these tokens are cancelled
+            :param ActionBatch batch: (optional) the cancel actions are added to
+                the batch and the batch is not flushed
+            :return: list of (order, result) tuples
+
+            Cancel all example:
+
+            .. code-block:: python
+
+                from steemengine.market import Market
+                from beem import Steem
+                active_wif = "5xxxx"
+                stm = Steem(keys=[active_wif])
+                market = Market(steem_instance=stm)
+                market.cancel_all("test", "buy")
+        """
+        orders = self.get_open_orders(account, order_type=order_type, symbols=symbols)
+        return list(zip(orders, self.cancel_orders(account, orders, batch=batch)))
+
+    def cancel(self, account, order_type, order_id, batch=None):
         """Cancel buy/sell order.
 
             :param str account: account name
             :param str order_type: sell or buy
             :param int order_id: order id
+            :param ActionBatch batch: (optional) the action is added to the batch and
+                its index is returned instead of broadcasting it
 
             Cancel example:
 
@@ -234,5 +325,4 @@ class Market(list):
         contract_payload = {"type": order_type, "id": order_id}
         json_data = {"contractName":"market","contractAction":"cancel",
                      "contractPayload":contract_payload}
-        tx = self.steem.custom_json(self.ssc_id, json_data, required_auths=[account])
-        return tx
+        return self._broadcast(account, json_data, batch=batch)
@@ -0,0 +1,433 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import str
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from steemengine.api import Api
+from steemengine.blockchain import Blockchain
+from steemengine.transaction import Transaction
+
+log = logging.getLogger(__name__)
+
+# Tables which are mirrored by default
+MIRROR_TABLES = [("tokens", "tokens"), ("tokens", "balances"), ("market", "metrics"),
+                 ("market", "buyBook"), ("market", "sellBook"), ("market", "tradesHistory")]
+
+# Object fields which are stored in an indexed column
+INDEXED_FIELDS = OrderedDict([("_id", "doc_id"), ("symbol", "symbol"), ("account", "account")])
+
+# tokens actions which do not change the tokens table
+BALANCE_ACTIONS = frozenset(["transfer", "transferToContract", "stake", "unstake", "cancelUnstake",
+                             "delegate", "undelegate"])
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _compare(value, op, operand):
+    if op == "$in":
+        return value in operand
+    elif op == "$nin":
+        return value not in operand
+    elif op == "$ne":
+        return value != operand
+    elif op == "$eq":
+        return value == operand
+    if value is None:
+        return False
+    value = _to_number(value)
+    operand = _to_number(operand)
+    if isinstance(value, float) != isinstance(operand, float):
+        return False
+    if op == "$gt":
+        return value > operand
+    elif op == "$gte":
+        return value >= operand
+    elif op == "$lt":
+        return value < operand
+    elif op == "$lte":
+        return value <= operand
+    raise ValueError("Query operator %s is not supported" % op)
+
+
+def match_query(obj, query):
+    """Returns True when the object matches the query. Equality and the
+        operators ``$in``, ``$nin``, ``$ne``, ``$eq``, ``$gt``, ``$gte``,
+        ``$lt`` and ``$lte`` are supported.
+    """
+    for field, condition in query.items():
+        value = obj.get(field)
+        if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+            for op, operand in condition.items():
+                if not _compare(value, op, operand):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+def sort_objects(objs, indexes):
+    """Sorts the objects by the given indexes (e.g. ``[{"index": "price", "descending": True}]``)"""
+    for index in reversed(indexes):
+        field = index["index"]
+        objs.sort(key=lambda obj: (0, 0) if obj.get(field) is None else (1, _to_number(obj.get(field))),
+                  reverse=index.get("descending", False))
+    return objs
+
+
+class Mirror(object):
+    """ Local SQLite copy of sidechain tables
+
+        :meth:`load` copies the tables into the database. The tables are
+        kept current with :meth:`stream`: for each streamed transaction, the
+        objects which may be changed by it (e.g. the balances of sender and
+        receiver) are requested again. Only new trades are requested for
+        ``market.tradesHistory``. The symbol and account fields are
+        stored in indexed columns, other query fields are matched after reading.
+
+        :param str path: path of the database file
+        :param Api api: Api instance
+        :param list tables: list of (contract, table) tuples which are mirrored
+
+        .. code-block:: python
+
+            from steemengine.mirror import Mirror, MirrorApi
+            from steemengine.tokens import Tokens
+            mirror = Mirror("steemengine.db")
+            mirror.load()
+            tokens = Tokens(api=MirrorApi(mirror))
+            for trx in mirror.stream():
+                print(trx["blockNumber"])
+
+    """
+    def __init__(self, path, api=None, tables=None):
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        if tables is None:
+            tables = MIRROR_TABLES
+        self.tables = [tuple(table) for table in tables]
+        self.path = path
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS objects (id INTEGER PRIMARY KEY, contract TEXT NOT NULL, "
+                            "tbl TEXT NOT NULL, doc_id INTEGER, symbol TEXT, account TEXT, doc TEXT NOT NULL)")
+            for column in INDEXED_FIELDS.values():
+                self.db.execute("CREATE INDEX IF NOT EXISTS objects_%s ON objects (contract, tbl, %s)" %
+                                (column, column))
+            self.db.execute("CREATE TABLE IF NOT EXISTS mirror_state (key TEXT PRIMARY KEY, value TEXT)")
+        self.block_num = self._get_state("block_num")
+        self.loaded_tables = set(tuple(table) for table in self._get_state("loaded_tables", []))
+
+    def _get_state(self, key, default=None):
+        with self.lock:
+            row = self.db.execute("SELECT value FROM mirror_state WHERE key = ?", (key, )).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def _set_state(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO mirror_state (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def close(self):
+        self.db.close()
+
+    def is_loaded(self, contract_name, table_name):
+        """Returns True when the table was loaded into the mirror"""
+        return (contract_name, table_name) in self.loaded_tables
+
+    def load(self, tables=None, page_size=1000):
+        """Copies the tables into the database. Existing objects of these tables
+            are replaced. ``block_num`` is set to the head block number before
+            the objects are fetched.
+
+            :param list tables: list of (contract, table) tuples (default are all mirrored tables)
+            :param int page_size: number of objects per request
+        """
+        if tables is None:
+            tables = self.tables
+        block_num = self.api.get_latest_block_info()["blockNumber"]
+        with self.lock:
+            for contract_name, table_name in tables:
+                objs = self.api.find_all(contract_name, table_name, query={}, page_size=page_size)
+                with self.db:
+                    self._delete(contract_name, table_name, {})
+                    self._insert(contract_name, table_name, objs)
+                    self.loaded_tables.add((contract_name, table_name))
+                    self._set_state("loaded_tables", sorted(self.loaded_tables))
+            if self.block_num is None or block_num < self.block_num:
+                self.block_num = block_num
+            with self.db:
+                self._set_state("block_num", self.block_num)
+
+    def _insert(self, contract_name, table_name, objs):
+        rows = ((contract_name, table_name, obj.get("_id"), obj.get("symbol"), obj.get("account"), json.dumps(obj))
+                for obj in objs)
+        self.db.executemany("INSERT INTO objects (contract, tbl, doc_id, symbol, account, doc) "
+                            "VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def _build_where(self, contract_name, table_name, query):
+        """Returns the SQL condition for the indexed query fields and
+            the query which has to be matched after reading.
+        """
+        where = ["contract = ?", "tbl = ?"]
+        args = [contract_name, table_name]
+        remaining = {}
+        for field, condition in query.items():
+            column = INDEXED_FIELDS.get(field)
+            if column is None:
+                remaining[field] = condition
+            elif isinstance(condition, dict) and list(condition.keys()) == ["$in"]:
+                where.append("%s IN (%s)" % (column, ", ".join(["?"] * len(condition["$in"]))))
+                args.extend(condition["$in"])
+            elif isinstance(condition, (str, int)):
+                where.append("%s = ?" % column)
+                args.append(condition)
+            else:
+                remaining[field] = condition
+        return " AND ".join(where), args, remaining
+
+    def _select(self, contract_name, table_name, query, limit=None, offset=0):
+        """Yields (id, object) for all objects which match the query. limit and
+            offset are only used, when all query fields are indexed.
+        """
+        where, args, remaining = self._build_where(contract_name, table_name, query)
+        sql = "SELECT id, doc FROM objects WHERE %s ORDER BY doc_id, id" % where
+        if len(remaining) == 0 and (limit is not None or offset > 0):
+            sql += " LIMIT ? OFFSET ?"
+            args += [-1 if limit is None else limit, offset]
+        for row_id, doc in self.db.execute(sql, args).fetchall():
+            obj = json.loads(doc)
+            if len(remaining) == 0 or match_query(obj, remaining):
+                yield row_id, obj
+
+    def _delete(self, contract_name, table_name, query):
+        where, args, remaining = self._build_where(contract_name, table_name, query)
+        if len(remaining) == 0:
+            self.db.execute("DELETE FROM objects WHERE %s" % where, args)
+        else:
+            ids = [(row_id, ) for row_id, obj in self._select(contract_name, table_name, query)]
+            self.db.executemany("DELETE FROM objects WHERE id = ?", ids)
+
+    def find(self, contract_name, table_name, query={}, limit=1000, offset=0, indexes=[]):
+        """Returns the objects that match the query from the mirrored table.
+            All objects are returned when limit is None.
+        """
+        with self.lock:
+            where, args, remaining = self._build_where(contract_name, table_name, query)
+            if len(remaining) == 0 and len(indexes) == 0:
+                return [obj for row_id, obj in self._select(contract_name, table_name, query, limit, offset)]
+            objs = [obj for row_id, obj in self._select(contract_name, table_name, query)]
+        if len(indexes) > 0:
+            sort_objects(objs, indexes)
+        if limit is None:
+            return objs[offset:]
+        return objs[offset:offset + limit]
+
+    def find_one(self, contract_name, table_name, query={}):
+        """Returns the first object that matches the query or None"""
+        objs = self.find(contract_name, table_name, query=query, limit=1)
+        if len(objs) == 0:
+            return None
+        return objs[0]
+
+    def find_all(self, contract_name, table_name, query={}, page_size=1000, offset=0, indexes=[], prefetch=False):
+        """Yields all objects that match the query from the mirrored table"""
+        for obj in self.find(contract_name, table_name, query=query, limit=None, offset=offset, indexes=indexes):
+            yield obj
+
+    def refresh(self, contract_name, table_name, query):
+        """Requests all objects that match the query again and replaces them in the mirror"""
+        objs = list(self.api.find_all(contract_name, table_name, query=query))
+        with self.lock:
+            with self.db:
+                self._delete(contract_name, table_name, query)
+                self._insert(contract_name, table_name, objs)
+
+    def refresh_trades(self, symbol):
+        """Requests the trades of a symbol newest first until the newest
+            mirrored trade is reached and adds them to the mirror
+        """
+        with self.lock:
+            row = self.db.execute("SELECT MAX(doc_id) FROM objects WHERE contract = ? AND tbl = ? AND symbol = ?",
+                                  ("market", "tradesHistory", symbol)).fetchone()
+        last_id = row[0]
+        objs = []
+        for obj in self.api.find_all("market", "tradesHistory", query={"symbol": symbol},
+                                     indexes=[{"index": "_id", "descending": True}]):
+            if last_id is not None and obj["_id"] <= last_id:
+                break
+            objs.append(obj)
+        with self.lock:
+            with self.db:
+                self._insert("market", "tradesHistory", reversed(objs))
+
+    def _update(self, contract_name, table_name, query):
+        if (contract_name, table_name) == ("market", "tradesHistory") and list(query.keys()) == ["symbol"]:
+            self.refresh_trades(query["symbol"])
+        else:
+            self.refresh(contract_name, table_name, query)
+
+    def get_affected_queries(self, trx):
+        """Returns a list of (contract, table, query) with the objects of the
+            mirrored tables which may be changed by the transaction.
+        """
+        if not isinstance(trx, Transaction):
+            trx = Transaction(trx)
+        logs = trx.logs
+        if not isinstance(logs, dict) or "errors" in logs:
+            return []
+        payload = trx.payload
+        if not isinstance(payload, dict):
+            payload = {}
+        sender = trx.get("sender")
+        symbol = payload.get("symbol")
+        affected = []
+        balances = OrderedDict()
+        symbols = OrderedDict()
+        if symbol is not None:
+            symbols[symbol] = True
+            balances[(sender, symbol)] = True
+            if "to" in payload:
+                balances[(payload["to"], symbol)] = True
+        for event in logs.get("events", []):
+            data = event.get("data", {})
+            if "symbol" not in data:
+                continue
+            symbols[data["symbol"]] = True
+            for field in ["from", "to"]:
+                account = data.get(field)
+                if account is None or event.get("event") == "transferToContract" and field == "to":
+                    continue
+                if event.get("event") == "transferFromContract" and field == "from":
+                    continue
+                balances[(account, data["symbol"])] = True
+        for account, balance_symbol in balances:
+            affected.append(("tokens", "balances", {"account": account, "symbol": balance_symbol}))
+        if trx["contract"] == "tokens" and trx["action"] not in BALANCE_ACTIONS and symbol is not None:
+            affected.append(("tokens", "tokens", {"symbol": symbol}))
+        elif trx["contract"] == "market":
+            if trx["action"] == "cancel" and payload.get("type") in ["buy", "sell"]:
+                affected.append(("market", payload["type"] + "Book", {"account": sender}))
+            elif trx["action"] in ["buy", "sell"] and symbol is not None:
+                # only the orders of the sender and of the filled counterparties can change
+                accounts = [sender]
+                for account, balance_symbol in balances:
+                    if account not in accounts:
+                        accounts.append(account)
+                affected.append(("market", "buyBook", {"symbol": symbol, "account": {"$in": accounts}}))
+                affected.append(("market", "sellBook", {"symbol": symbol, "account": {"$in": accounts}}))
+                affected.append(("market", "tradesHistory", {"symbol": symbol}))
+            for metrics_symbol in symbols:
+                if metrics_symbol != "STEEMP":
+                    affected.append(("market", "metrics", {"symbol": metrics_symbol}))
+        return [q for q in affected if self.is_loaded(q[0], q[1])]
+
+    def apply_transaction(self, trx):
+        """Updates all objects which may be changed by the transaction
+
+            :return: True, when objects were requested again
+        """
+        affected = self.get_affected_queries(trx)
+        for contract_name, table_name, query in affected:
+            self._update(contract_name, table_name, query)
+        return len(affected) > 0
+
+    def stream(self, blockchain=None, stop=None):
+        """Updates the mirror from all transactions after ``block_num`` and
+            yields each transaction which changed the mirror. The objects
+            which are changed by the transactions of a block are requested
+            once after the block.
+
+            :param Blockchain blockchain: Blockchain instance which is used
+                for streaming
+            :param int stop: last block number, blocks are streamed
+                forever when not set
+        """
+        if self.block_num is None:
+            raise ValueError("The mirror has to be loaded first")
+        if blockchain is None:
+            blockchain = Blockchain(api=self.api)
+        for block in blockchain.blocks(start=self.block_num + 1, stop=stop):
+            affected = OrderedDict()
+            changed = []
+            for trx in block["transactions"]:
+                if not isinstance(trx, Transaction):
+                    trx = Transaction(trx)
+                queries = self.get_affected_queries(trx)
+                if len(queries) == 0:
+                    continue
+                trx["blockNumber"] = block["blockNumber"]
+                trx["timestamp"] = block["timestamp"]
+                changed.append(trx)
+                for contract_name, table_name, query in queries:
+                    affected[(contract_name, table_name, json.dumps(query, sort_keys=True))] = query
+            for (contract_name, table_name, key), query in affected.items():
+                self._update(contract_name, table_name, query)
+            with self.lock:
+                self.block_num = block["blockNumber"]
+                with self.db:
+                    self._set_state("block_num", self.block_num)
+            for trx in changed:
+                yield trx
+
+
+class MirrorApi(object):
+    """ Api which reads loaded tables from a :class:`Mirror`.
+        All other requests are sent to the network.
+
+        :param Mirror mirror: Mirror instance
+        :param Api api: Api instance which is used for all other requests
+
+        .. code-block:: python
+
+            from steemengine.mirror import Mirror, MirrorApi
+            from steemengine.wallet import Wallet
+            api = MirrorApi(Mirror("steemengine.db"))
+            wallet = Wallet("holger80", api=api)
+            print(wallet.get_balances())
+
+    """
+    def __init__(self, mirror, api=None):
+        self.mirror = mirror
+        if api is None:
+            self.api = mirror.api
+        else:
+            self.api = api
+
+    def __getattr__(self, name):
+        return getattr(self.api, name)
+
+    def find_one(self, contract_name, table_name, query={}):
+        """Get the object that matches the query from the table of the specified contract.
+            As for :meth:`steemengine.api.Api.find_one`, the object is returned
+            in a list (``[None]`` when no object matches).
+        """
+        if self.mirror.is_loaded(contract_name, table_name):
+            return [self.mirror.find_one(contract_name, table_name, query=query)]
+        return self.api.find_one(contract_name, table_name, query=query)
+
+    def find(self, contract_name, table_name, query={}, limit=1000, offset=0, indexes=[]):
+        """Get an array of objects that match the query from the table of the specified contract"""
+        if self.mirror.is_loaded(contract_name, table_name):
+            return self.mirror.find(contract_name, table_name, query=query, limit=limit, offset=offset,
+                                    indexes=indexes)
+        return self.api.find(contract_name, table_name, query=query, limit=limit, offset=offset, indexes=indexes)
+
+    def find_all(self, contract_name, table_name, query={}, page_size=1000, offset=0, indexes=[], prefetch=False):
+        """Yields all objects that match the query from the table of the specified contract"""
+        if self.mirror.is_loaded(contract_name, table_name):
+            return self.mirror.find_all(contract_name, table_name, query=query, offset=offset, indexes=indexes)
+        return self.api.find_all(contract_name, table_name, query=query, page_size=page_size, offset=offset,
+                                 indexes=indexes, prefetch=prefetch)
@@ -0,0 +1,109 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import str
+import threading
+import time
+
+
+class Node(object):
+    """ Stores the health and latency of a RPC node
+
+        :param str url: RPC url of the node
+    """
+    def __init__(self, url):
+        self.url = url
+        self.error_cnt = 0
+        self.error_cnt_call = 0
+        self.latency = None
+        self.last_error = None
+
+    def __repr__(self):
+        if self.latency is None:
+            return "<Node %s errors=%d>" % (self.url, self.error_cnt)
+        return "<Node %s latency=%.3fs errors=%d>" % (self.url, self.latency, self.error_cnt)
+
+
+class Nodes(list):
+    """ List of RPC nodes. Each request is sent to the fastest healthy node.
+
+        The latency of each node is measured as exponentially weighted moving
+        average of the request times. A node is unhealthy after an error until
+        ``cooldown`` seconds have passed. Nodes without a measured latency
+        are used before measured nodes, so that all nodes are measured.
+
+        :param list urls: list of node urls (a single url is also accepted)
+        :param float cooldown: seconds in which a node is not used after an error
+        :param float alpha: weight of a new latency measurement (between 0 and 1)
+
+        .. code-block:: python
+
+            from steemengine.node import Nodes
+            nodes = Nodes(["https://api.steem-engine.com/rpc/", "https://api2.steem-engine.com/rpc/"])
+            print(nodes.url)
+
+    """
+    def __init__(self, urls, cooldown=30, alpha=0.3):
+        if isinstance(urls, str):
+            urls = [urls]
+        super(Nodes, self).__init__([Node(url) for url in urls])
+        if len(self) == 0:
+            raise ValueError("At least one node url is needed")
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        """Returns the url of the node which is used for the next request"""
+        return self.get_node().url
+
+    def get_urls(self):
+        """Returns the urls of all nodes"""
+        return [node.url for node in self]
+
+    def is_healthy(self, node, now=None):
+        """Returns True when the node had no error within the cooldown time"""
+        if node.error_cnt_call == 0 or node.last_error is None:
+            return True
+        if now is None:
+            now = time.time()
+        return now - node.last_error > self.cooldown
+
+    def get_node(self):
+        """Returns the fastest healthy node. When no node is healthy,
+            the node with the oldest error is returned.
+        """
+        if len(self) == 1:
+            return self[0]
+        now = time.time()
+        with self.lock:
+            healthy = [node for node in self if self.is_healthy(node, now)]
+            if len(healthy) == 0:
+                return min(self, key=lambda node: node.last_error)
+            return min(healthy, key=lambda node: -1 if node.latency is None else node.latency)
+
+    def has_healthy_node(self, exclude=None):
+        """Returns True when a healthy node (other than exclude) exists"""
+        now = time.time()
+        for node in self:
+            if node is not exclude and self.is_healthy(node, now):
+                return True
+        return False
+
+    def record_success(self, node, latency):
+        """Updates the latency of a node after a successful request"""
+        with self.lock:
+            if node.latency is None:
+                node.latency = latency
+            else:
+                node.latency = self.alpha * latency + (1 - self.alpha) * node.latency
+            node.error_cnt_call = 0
+
+    def record_error(self, node):
+        """Marks a node as unhealthy after a failed request"""
+        with self.lock:
+            node.error_cnt += 1
+            node.error_cnt_call += 1
+            node.last_error = time.time()
@@ -0,0 +1,296 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import bisect
+import decimal
+import logging
+from collections import OrderedDict
+from steemengine.api import Api
+from steemengine.blockchain import Blockchain
+from steemengine.exceptions import SnapshotNotConsistent
+from steemengine.transaction import Transaction
+
+log = logging.getLogger(__name__)
+
+
+class OrderBookSide(object):
+    """ One side (buy or sell) of an order book.
+
+        The prices are kept in a sorted list. The orders of each price level
+        are kept in the order in which they were placed.
+    """
+    def __init__(self):
+        self.prices = []
+        self.levels = {}
+        self.quantities = {}
+
+    def __len__(self):
+        return len(self.prices)
+
+    def add(self, key, order):
+        """Adds an order at the end of its price level. An order with the
+            same key at this price is replaced.
+        """
+        price = order["price"]
+        if price not in self.levels:
+            bisect.insort(self.prices, price)
+            self.levels[price] = OrderedDict()
+            self.quantities[price] = decimal.Decimal(0)
+        level = self.levels[price]
+        if key in level:
+            self.quantities[price] -= level[key]["quantity"]
+        level[key] = order
+        self.quantities[price] += order["quantity"]
+
+    def remove(self, key, order):
+        """Removes an order from its price level"""
+        price = order["price"]
+        level = self.levels[price]
+        del level[key]
+        self.quantities[price] -= order["quantity"]
+        if len(level) == 0:
+            del self.levels[price]
+            del self.quantities[price]
+            del self.prices[bisect.bisect_left(self.prices, price)]
+
+    def reduce(self, order, quantity):
+        """Reduces the quantity of an order"""
+        order["quantity"] -= quantity
+        self.quantities[order["price"]] -= quantity
+
+    def iter_prices(self, descending=False):
+        if descending:
+            return reversed(self.prices)
+        return iter(self.prices)
+
+
+class OrderBook(object):
+    """ Full order book of a token
+
+        All open orders of ``market.buyBook`` and ``market.sellBook`` are
+        fetched once. Afterwards the order book can be updated from
+        ``market`` buy, sell and cancel transactions of streamed blocks
+        by :func:`apply_transaction` or :func:`stream`. Prices and
+        quantities are stored as ``decimal.Decimal``.
+
+        :param str symbol: token symbol
+        :param Api api: Api instance
+        :param int snapshot_tries: number of fetches of the open orders
+            until the head block has to be unchanged
+
+        .. code-block:: python
+
+            from steemengine.orderbook import OrderBook
+            book = OrderBook("ENG")
+            print(book.best_bid(), book.best_ask())
+            for trx in book.stream():
+                print(book.best_bid(), book.best_ask())
+
+    """
+    def __init__(self, symbol, api=None, snapshot_tries=5):
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        self.symbol = symbol.upper()
+        self.snapshot_tries = snapshot_tries
+        self.refresh()
+
+    def refresh(self):
+        """Fetches all open orders. The head block number is read before
+            and after both books are fetched and the books are fetched again
+            until it did not change, so that ``block_num`` is the block of
+            the snapshot and no transaction up to it is applied twice.
+
+            :raises SnapshotNotConsistent: when the head block changed
+                during each of the ``snapshot_tries`` fetches
+        """
+        block_num = self.api.get_latest_block_info()["blockNumber"]
+        for i in range(self.snapshot_tries):
+            books = []
+            for order_type in ("buy", "sell"):
+                books.append(list(self.api.find_all("market", order_type + "Book", query={"symbol": self.symbol})))
+            head_block_num = self.api.get_latest_block_info()["blockNumber"]
+            if head_block_num == block_num:
+                break
+            log.debug("Head block changed from %d to %d while the order book was fetched" % (block_num, head_block_num))
+            block_num = head_block_num
+        else:
+            raise SnapshotNotConsistent("The head block changed during each of %d order book fetches" %
+                                        self.snapshot_tries)
+        self.block_num = block_num
+        self.bids = OrderBookSide()
+        self.asks = OrderBookSide()
+        self._orders = {}
+        self._order_keys = {}
+        for order_type, side, orders in (("buy", self.bids, books[0]), ("sell", self.asks, books[1])):
+            orders = sorted(orders, key=lambda o: (o.get("timestamp", 0), o.get("_id", 0)))
+            for order in orders:
+                self._add_order(order_type, side, order)
+
+    def _add_order(self, order_type, side, order):
+        order = dict(order)
+        order["price"] = decimal.Decimal(order["price"])
+        order["quantity"] = decimal.Decimal(order["quantity"])
+        key = order.get("txId", order.get("_id"))
+        if key in self._orders:
+            old_side, old_order = self._orders[key][1:]
+            if old_side is not side or old_order["price"] != order["price"]:
+                self._remove_order(key)
+        side.add(key, order)
+        self._orders[key] = (order_type, side, order)
+        if "_id" in order:
+            self._order_keys[order["_id"]] = key
+
+    def _remove_order(self, key):
+        order_type, side, order = self._orders.pop(key)
+        side.remove(key, order)
+        if "_id" in order:
+            self._order_keys.pop(order["_id"], None)
+
+    def best_bid(self):
+        """Returns the highest buy price and its quantity as tuple. Is None
+            when there are no buy orders.
+        """
+        if len(self.bids) == 0:
+            return None
+        price = self.bids.prices[-1]
+        return (price, self.bids.quantities[price])
+
+    def best_ask(self):
+        """Returns the lowest sell price and its quantity as tuple. Is None
+            when there are no sell orders.
+        """
+        if len(self.asks) == 0:
+            return None
+        price = self.asks.prices[0]
+        return (price, self.asks.quantities[price])
+
+    def spread(self):
+        """Returns the difference between lowest sell and highest buy price"""
+        bid = self.best_bid()
+        ask = self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def get_bids(self, depth=None):
+        """Returns the buy price levels as list of (price, quantity) tuples,
+            highest price first.
+        """
+        return self._get_levels(self.bids, True, depth)
+
+    def get_asks(self, depth=None):
+        """Returns the sell price levels as list of (price, quantity) tuples,
+            lowest price first.
+        """
+        return self._get_levels(self.asks, False, depth)
+
+    def _get_levels(self, side, descending, depth):
+        levels = []
+        for price in side.iter_prices(descending=descending):
+            if depth is not None and len(levels) >= depth:
+                break
+            levels.append((price, side.quantities[price]))
+        return levels
+
+    def get_orders(self, order_type, price=None):
+        """Returns all buy or sell orders, best price first.
+
+            :param str order_type: buy or sell
+            :param price: When set, only orders with this price are returned
+        """
+        side = self.bids if order_type == "buy" else self.asks
+        if price is not None:
+            prices = [decimal.Decimal(price)] if decimal.Decimal(price) in side.levels else []
+        else:
+            prices = side.iter_prices(descending=order_type == "buy")
+        orders = []
+        for p in prices:
+            orders.extend(side.levels[p].values())
+        return orders
+
+    def apply_transaction(self, trx):
+        """Updates the order book from a market transaction.
+
+            :param dict trx: sidechain transaction
+            :return: True, when the order book was changed
+        """
+        if trx["contract"] != "market" or trx["action"] not in ["buy", "sell", "cancel"]:
+            return False
+        if not isinstance(trx, Transaction):
+            trx = Transaction(trx)
+        logs = trx.logs
+        if isinstance(logs, dict) and "errors" in logs:
+            return False
+        payload = trx.payload
+        if payload is None:
+            return False
+        if trx["action"] == "cancel":
+            key = payload.get("id")
+            if key not in self._orders:
+                key = self._order_keys.get(key)
+            if key is None or key not in self._orders:
+                return False
+            if self._orders[key][2].get("account") != trx.get("sender"):
+                return False
+            self._remove_order(key)
+            return True
+        if payload.get("symbol", "").upper() != self.symbol:
+            return False
+        if trx.get("transactionId") in self._orders:
+            # The order was placed while the snapshot was fetched and is already in the book
+            return False
+        price = decimal.Decimal(payload["price"])
+        quantity = decimal.Decimal(payload["quantity"])
+        if trx["action"] == "buy":
+            quantity = self._match(self.asks, quantity, lambda p: p <= price, False)
+            side = self.bids
+        else:
+            quantity = self._match(self.bids, quantity, lambda p: p >= price, True)
+            side = self.asks
+        if quantity > 0:
+            order = {"txId": trx.get("transactionId"), "account": trx.get("sender"),
+                     "symbol": self.symbol, "quantity": quantity, "price": price}
+            if "timestamp" in trx:
+                order["timestamp"] = trx["timestamp"]
+            self._add_order(trx["action"], side, order)
+        return True
+
+    def _match(self, side, quantity, price_matches, descending):
+        """Fills the given quantity from the orders of one side
+            and returns the remaining quantity
+        """
+        for price in list(side.iter_prices(descending=descending)):
+            if quantity <= 0 or not price_matches(price):
+                break
+            for key, order in list(side.levels[price].items()):
+                if quantity <= 0:
+                    break
+                if order["quantity"] <= quantity:
+                    quantity -= order["quantity"]
+                    self._remove_order(key)
+                else:
+                    side.reduce(order, quantity)
+                    quantity = decimal.Decimal(0)
+        return quantity
+
+    def stream(self, blockchain=None, stop=None):
+        """Updates the order book from all market transactions after
+            ``block_num`` and yields each applied transaction.
+
+            :param Blockchain blockchain: Blockchain instance which is used
+                for streaming
+            :param int stop: last block number, transactions are streamed
+                forever when not set
+        """
+        if blockchain is None:
+            blockchain = Blockchain(api=self.api)
+        for trx in blockchain.stream(start=self.block_num + 1, stop=stop, only_contracts=["market"],
+                                     only_actions=["buy", "sell", "cancel"]):
+            self.block_num = trx["blockNumber"]
+            if self.apply_transaction(trx):
+                yield trx
+        if stop is not None:
+            self.block_num = max(self.block_num, stop)
@@ -0,0 +1,101 @@
+"""STEEM valuation of the token balances of many accounts (requires numpy)."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from steemengine.api import Api
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class Portfolio(object):
+    """ Values the token balances of a list of accounts in STEEM
+
+        The balances of ``chunk_size`` accounts are requested with one
+        ``{"account": {"$in": [...]}}`` query and the market metrics are
+        requested only once. Each token is valued with its highest bid
+        (the last price is used when there is no bid), STEEMP has a value
+        of 1 STEEM. Balance, stake and pending unstake are valued.
+
+        :param list accounts: list of account names
+        :param Api api: Api instance
+        :param int chunk_size: number of accounts per query
+        :param int page_size: number of balances per request
+
+        .. code-block:: python
+
+            from steemengine.portfolio import Portfolio
+            portfolio = Portfolio(["holger80", "beembot"])
+            for account in portfolio:
+                print(account["account"], account["value"])
+
+    """
+    def __init__(self, accounts, api=None, chunk_size=100, page_size=1000):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for steemengine.portfolio")
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        self.accounts = list(accounts)
+        self.chunk_size = chunk_size
+        self.page_size = page_size
+        self.prices = None
+
+    def get_prices(self):
+        """Returns a dict with the STEEM price of each token. The market
+            metrics are only requested on the first call.
+        """
+        if self.prices is None:
+            prices = {"STEEMP": 1.}
+            for metrics in self.api.find_all("market", "metrics", query={}, page_size=self.page_size):
+                price = float(metrics.get("highestBid") or 0)
+                if price <= 0:
+                    price = float(metrics.get("lastPrice") or 0)
+                prices[metrics["symbol"]] = price
+            self.prices = prices
+        return self.prices
+
+    def get_balances(self, accounts):
+        """Returns the balances of all given accounts"""
+        return list(self.api.find_all("tokens", "balances", query={"account": {"$in": list(accounts)}},
+                                      page_size=self.page_size))
+
+    def value_chunk(self, accounts):
+        """Returns a list with one dict per account, which contains the balances
+            (with an added ``value`` field) and the total STEEM value.
+        """
+        prices = self.get_prices()
+        account_index = dict((account, i) for i, account in enumerate(accounts))
+        balances = [balance for balance in self.get_balances(accounts) if balance["account"] in account_index]
+        amounts = np.array([float(balance.get("balance") or 0) + float(balance.get("stake") or 0) +
+                            float(balance.get("pendingUnstake") or 0) for balance in balances])
+        price_vector = np.array([prices.get(balance["symbol"], 0.) for balance in balances])
+        indices = np.array([account_index[balance["account"]] for balance in balances], dtype=np.intp)
+        values = amounts * price_vector
+        account_values = np.bincount(indices, weights=values, minlength=len(accounts))
+        results = [{"account": account, "value": float(account_values[i]), "balances": []}
+                   for i, account in enumerate(accounts)]
+        for balance, value, index in zip(balances, values.tolist(), indices.tolist()):
+            balance = dict(balance)
+            balance["value"] = value
+            results[index]["balances"].append(balance)
+        return results
+
+    def __iter__(self):
+        """Yields the valuation of each account, chunk by chunk"""
+        for i in range(0, len(self.accounts), self.chunk_size):
+            for result in self.value_chunk(self.accounts[i:i + self.chunk_size]):
+                yield result
+
+    def get_values(self):
+        """Returns a dict with the STEEM value of each account"""
+        return dict((result["account"], result["value"]) for result in self)
+
+    def get_total_value(self):
+        """Returns the STEEM value of all accounts"""
+        return sum(result["value"] for result in self)
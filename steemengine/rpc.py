@@ -4,14 +4,19 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 from builtins import next
-from builtins import str
+from builtins import bytes, str
 from builtins import object
 import sys
-import json
 import logging
+import random
 import re
+import threading
+import time
+from email.utils import parsedate_tz, mktime_tz
 
 from .version import version as steemengine_version
+from .node import Nodes
+from .serializer import get_serializer
 if sys.version_info[0] < 3:
     from thread import interrupt_main
 else:
@@ -23,7 +28,7 @@ if not REQUEST_MODULE:
         import requests
         from requests.adapters import HTTPAdapter
         from requests.packages.urllib3.util.retry import Retry
-        from requests.exceptions import ConnectionError
+        from requests.exceptions import ConnectionError, Timeout
         REQUEST_MODULE = "requests"
     except ImportError:
         REQUEST_MODULE = None
@@ -33,15 +38,26 @@ log = logging.getLogger(__name__)
 
 
 class RPCError(Exception):
-    """RPCError Exception."""
+    """RPCError Exception.
 
-    pass
+    :param str message: error message
+    :param int status_code: HTTP status code of the reply
+    :param str node: url of the node which replied
+    :param float latency: duration of the request in seconds
+    """
+    retryable = False
+
+    def __init__(self, message="", status_code=None, node=None, latency=None):
+        super(RPCError, self).__init__(message)
+        self.status_code = status_code
+        self.node = node
+        self.latency = latency
 
 
-class RPCErrorDoRetry(Exception):
+class RPCErrorDoRetry(RPCError):
     """RPCErrorDoRetry Exception."""
 
-    pass
+    retryable = True
 
 
 class UnauthorizedError(Exception):
@@ -50,9 +66,54 @@ class UnauthorizedError(Exception):
     pass
 
 
+# HTTP status codes which are retried by the transport adapter
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+# HTTP status code: (error message, retryable)
+HTTP_ERRORS = {
+    429: ("Too Many Requests", True),
+    500: ("Internal Server Error", True),
+    501: ("Not Implemented", False),
+    502: ("Bad Gateway", True),
+    503: ("Service Temporarily Unavailable", True),
+    504: ("Gateway Time-out", True),
+    505: ("HTTP Version not supported", False),
+    506: ("Variant Also Negotiates", False),
+    507: ("Insufficient Storage", False),
+    508: ("Loop Detected", False),
+    509: ("Bandwidth Limit Exceeded", False),
+    510: ("Not Extended", False),
+    511: ("Network Authentication Required", False),
+}
+
+# Error phrases in replies without an error status code
+SERVER_ERROR_PHRASES = {
+    "Too Many Requests": 429,
+    "Internal Server Error": 500,
+    "Not Implemented": 501,
+    "Bad Gateway": 502,
+    "Service Temporarily Unavailable": 503,
+    "Service Unavailable": 503,
+    "Gateway Time-out": 504,
+    "Gateway Timeout": 504,
+    "HTTP Version not supported": 505,
+    "Variant Also Negotiates": 506,
+    "Insufficient Storage": 507,
+    "Loop Detected": 508,
+    "Bandwidth Limit Exceeded": 509,
+    "Not Extended": 510,
+    "Network Authentication Required": 511,
+}
+SERVER_ERROR_PATTERN = re.compile("|".join(re.escape(phrase) for phrase in SERVER_ERROR_PHRASES))
+
+# Only the beginning of an error page is searched for an error phrase
+SERVER_ERROR_SEARCH_LENGTH = 4096
+
+
 class SessionInstance(object):
     """Singelton for the Session Instance"""
     instance = None
+    lock = threading.Lock()
 
 
 def set_session_instance(instance):
@@ -60,15 +121,74 @@ def set_session_instance(instance):
     SessionInstance.instance = instance
 
 
+def create_session(pool_connections=10, pool_maxsize=32, num_retries=3, backoff_factor=0.3):
+    """Returns a new session with mounted HTTPAdapters. Connections are kept
+        alive and reused. Failed connections and replies with a status
+        code from ``RETRY_STATUS_CODES`` are retried with an exponential backoff.
+
+        :param int pool_connections: number of hosts for which a connection
+            pool is kept
+        :param int pool_maxsize: maximum number of connections per host, should
+            be at least the number of threads which share the session
+        :param int num_retries: number of retries of a request
+        :param float backoff_factor: the n-th retry waits
+            ``backoff_factor * 2 ** (n - 1)`` seconds
+    """
+    if REQUEST_MODULE is None:
+        raise Exception()
+    retry_kwargs = {"total": num_retries, "backoff_factor": backoff_factor,
+                    "status_forcelist": RETRY_STATUS_CODES, "raise_on_status": False}
+    methods = frozenset(["GET", "POST"])
+    try:
+        retry = Retry(allowed_methods=methods, **retry_kwargs)
+    except TypeError:
+        retry = Retry(method_whitelist=methods, **retry_kwargs)
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def shared_session_instance():
     """Get session instance"""
     if REQUEST_MODULE is None:
         raise Exception()
     if not SessionInstance.instance:
-        SessionInstance.instance = requests.Session()
+        with SessionInstance.lock:
+            if not SessionInstance.instance:
+                # RPC retries failed calls itself, the session must not retry them again
+                SessionInstance.instance = create_session(num_retries=0)
     return SessionInstance.instance
 
 
+def get_backoff_time(cnt, backoff_factor=0.3, max_backoff=10):
+    """Returns the wait time before the cnt-th retry. The time is chosen
+        randomly between 0 and ``backoff_factor * 2 ** cnt`` seconds (exponential
+        backoff with jitter), so that clients which failed at the same time
+        do not retry at the same time.
+    """
+    return random.uniform(0, min(backoff_factor * 2 ** cnt, max_backoff))
+
+
+def get_retry_after(response):
+    """Returns the seconds from the Retry-After header of a response
+        or None, when the header is missing or invalid.
+    """
+    if response is None:
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is None:
+        return None
+    retry_after = retry_after.strip()
+    if retry_after.isdigit():
+        return int(retry_after)
+    date_tuple = parsedate_tz(retry_after)
+    if date_tuple is None:
+        return None
+    return max(0, mktime_tz(date_tuple) - time.time())
+
+
 def get_endpoint_name(*args, **kwargs):
         # Sepcify the endpoint to talk to
     endpoint = "contracts"
@@ -91,81 +211,191 @@ class RPC(object):
             rpc = RPC()
             print(rpc.getLatestBlockInfo(endpoint="blockchain"))
 
+    Several calls can be send in one request by using a batch:
+
+        .. code-block:: python
+
+            from steemengine.rpc import RPC
+            rpc = RPC()
+            with rpc.batch(endpoint="blockchain") as batch:
+                for block_num in range(1, 11):
+                    batch.getBlockInfo({"blockNumber": block_num})
+            print(batch.results)
+
+    :param url: RPC url or list of RPC urls. With several urls, each call is sent
+        to the fastest healthy node and failed calls are retried on another node.
+    :param int timeout: request timeout in seconds (default is 60)
+    :param int num_retries: number of retries of a request by the transport
+        adapter. Failed requests are only retried by one layer: the default is 0
+        when calls are retried (``num_retries_call`` is not 0) or several urls
+        are set, and 3 otherwise. With a value other than 0 (or with
+        pool_connections, pool_maxsize), the RPC uses its own session instead
+        of the shared session.
+    :param int pool_connections: number of hosts for which a connection pool is kept
+    :param int pool_maxsize: maximum number of connections per host
+    :param int num_retries_call: number of retries of a call which failed with
+        :class:`RPCErrorDoRetry` or a connection error (default is 5, -1 for
+        retrying forever)
+
     """
 
     def __init__(self, url=None, user=None, password=None, **kwargs):
         """Init."""
         self._request_id = 0
+        self._request_id_lock = threading.Lock()
         self.timeout = kwargs.get('timeout', 60)
-        num_retries = kwargs.get("num_retries", -1)
-        num_retries_call = kwargs.get("num_retries_call", 5)
+        self.num_retries = kwargs.get("num_retries", None)
+        self.num_retries_call = kwargs.get("num_retries_call", 5)
+        self.backoff_factor = kwargs.get("backoff_factor", 0.3)
 
         self.user = user
         self.password = password
         if url is None:
-            self.url = 'https://api.steem-engine.com/rpc/'
+            url = 'https://api.steem-engine.com/rpc/'
+        self.nodes = Nodes(url, cooldown=kwargs.get("node_cooldown", 30))
+        if self.num_retries is None:
+            if len(self.nodes) > 1 or self.num_retries_call != 0:
+                # failed calls are retried by _send_with_retry
+                self.num_retries = 0
+            else:
+                self.num_retries = 3
+        if self.num_retries != 0 or "pool_connections" in kwargs or "pool_maxsize" in kwargs:
+            num_retries = self.num_retries
+            if num_retries < 0:
+                num_retries = 3
+            self.session = create_session(pool_connections=kwargs.get("pool_connections", 10),
+                                          pool_maxsize=kwargs.get("pool_maxsize", 32),
+                                          num_retries=num_retries,
+                                          backoff_factor=self.backoff_factor)
         else:
-            self.url = url
-        self.session = shared_session_instance()
+            self.session = shared_session_instance()
         self.headers = {'User-Agent': 'steemengine v%s' % (steemengine_version),
                         'content-type': 'application/json'}        
         self.rpc_queue = []
 
+    @property
+    def url(self):
+        """Returns the url of the node which is used for the next call"""
+        return self.nodes.url
+
+    @url.setter
+    def url(self, url):
+        self.nodes = Nodes(url, cooldown=self.nodes.cooldown)
+
     def get_request_id(self):
         """Get request id."""
-        self._request_id += 1
-        return self._request_id
+        with self._request_id_lock:
+            self._request_id += 1
+            return self._request_id
 
-    def request_send(self, endpoint, payload):
+    def request_send(self, endpoint, payload, node=None):
+        if node is None:
+            url = self.url
+        else:
+            url = node.url
         if self.user is not None and self.password is not None:
-            response = self.session.post(self.url + endpoint,
+            response = self.session.post(url + endpoint,
                                          data=payload,
                                          headers=self.headers,
                                          timeout=self.timeout,
                                          auth=(self.user, self.password))
         else:
-            response = self.session.post(self.url + endpoint,
+            response = self.session.post(url + endpoint,
                                          data=payload,
                                          headers=self.headers,
                                          timeout=self.timeout)
         if response.status_code == 401:
             raise UnauthorizedError
-        return response.text
+        return response
+
+    def request_get(self, url, params=None):
+        """Sends a GET request over the session and returns the decoded JSON reply.
+
+            Failed requests are retried up to ``num_retries_call`` times with
+            an exponential backoff with jitter. When the server replies with
+            a Retry-After header (e.g. status 429), the retry waits the given time.
+
+            :param str url: url
+            :param dict params: query parameters, which are url encoded
+        """
+        cnt = 0
+        while True:
+            response = None
+            start = time.time()
+            try:
+                if self.user is not None and self.password is not None:
+                    response = self.session.get(url, params=params, headers=self.headers,
+                                                timeout=self.timeout, auth=(self.user, self.password))
+                else:
+                    response = self.session.get(url, params=params, headers=self.headers,
+                                                timeout=self.timeout)
+                if response.status_code == 401:
+                    raise UnauthorizedError
+                latency = time.time() - start
+                if response.status_code in RETRY_STATUS_CODES:
+                    self._check_for_server_error(response.text, status_code=response.status_code,
+                                                 node=url, latency=latency)
+                return self._decode_reply(response.content, status_code=response.status_code, node=url,
+                                          latency=latency)
+            except (RPCErrorDoRetry, ConnectionError, Timeout) as e:
+                cnt += 1
+                if self.num_retries_call >= 0 and cnt > self.num_retries_call:
+                    raise
+                sleeptime = get_retry_after(response)
+                if sleeptime is None:
+                    sleeptime = get_backoff_time(cnt, self.backoff_factor)
+                log.warning("Retry %d for %s in %.1f s: %s" % (cnt, url, sleeptime, str(e)))
+                time.sleep(sleeptime)
 
     def version_string_to_int(self, network_version):
         version_list = network_version.split('.')
         return int(int(version_list[0]) * 1e8 + int(version_list[1]) * 1e4 + int(version_list[2]))
 
-    def _check_for_server_error(self, reply):
-        """Checks for server error message in reply"""
-        if re.search("Internal Server Error", reply) or re.search("500", reply):
-            raise RPCErrorDoRetry("Internal Server Error")
-        elif re.search("Not Implemented", reply) or re.search("501", reply):
-            raise RPCError("Not Implemented")
-        elif re.search("Bad Gateway", reply) or re.search("502", reply):
-            raise RPCErrorDoRetry("Bad Gateway")
-        elif re.search("Too Many Requests", reply) or re.search("429", reply):
-            raise RPCErrorDoRetry("Too Many Requests")
-        elif re.search("Service Temporarily Unavailable", reply) or re.search("Service Unavailable", reply) or re.search("503", reply):
-            raise RPCErrorDoRetry("Service Temporarily Unavailable")
-        elif re.search("Gateway Time-out", reply) or re.search("Gateway Timeout", reply) or re.search("504", reply):
-            raise RPCErrorDoRetry("Gateway Time-out")
-        elif re.search("HTTP Version not supported", reply) or re.search("505", reply):
-            raise RPCError("HTTP Version not supported")
-        elif re.search("Variant Also Negotiates", reply) or re.search("506", reply):
-            raise RPCError("Variant Also Negotiates")
-        elif re.search("Insufficient Storage", reply) or re.search("507", reply):
-            raise RPCError("Insufficient Storage")
-        elif re.search("Loop Detected", reply) or re.search("508", reply):
-            raise RPCError("Loop Detected")
-        elif re.search("Bandwidth Limit Exceeded", reply) or re.search("509", reply):
-            raise RPCError("Bandwidth Limit Exceeded")
-        elif re.search("Not Extended", reply) or re.search("510", reply):
-            raise RPCError("Not Extended")
-        elif re.search("Network Authentication Required", reply) or re.search("511", reply):
-            raise RPCError("Network Authentication Required")
+    def batch(self, endpoint="contracts"):
+        """Returns a :class:`RPCBatch` which collects calls to the given
+            endpoint and sends them as one JSON-RPC array.
+        """
+        return RPCBatch(self, endpoint=endpoint)
+
+    def _build_query(self, name, args):
+        """Returns the JSON-RPC query for the method name and its arguments"""
+        if len(args) > 0:
+            params = args[0]
         else:
-            raise RPCError("Client returned invalid format. Expected JSON!")
+            params = []
+        return {"method": name,
+                "jsonrpc": "2.0",
+                "params": params,
+                "id": self.get_request_id()}
+
+    def _get_error_message(self, error):
+        """Returns the message of a JSON-RPC error object"""
+        if isinstance(error, dict):
+            if 'detail' in error:
+                return error['detail']
+            elif 'message' in error:
+                return error['message']
+        return str(error)
+
+    def _check_for_server_error(self, reply, status_code=None, node=None, latency=None):
+        """Raises an error for a reply which is not valid JSON. The error
+            is classified by the HTTP status code. When the status code does
+            not indicate an error, the beginning of the reply is searched
+            for an error phrase.
+        """
+        if status_code is None or status_code < 400:
+            match = SERVER_ERROR_PATTERN.search(reply, 0, SERVER_ERROR_SEARCH_LENGTH)
+            if match is not None:
+                status_code = SERVER_ERROR_PHRASES[match.group(0)]
+        if status_code in HTTP_ERRORS:
+            message, retryable = HTTP_ERRORS[status_code]
+        elif status_code is not None and status_code >= 400:
+            message, retryable = "HTTP error %d" % status_code, status_code >= 500
+        else:
+            message, retryable = "Client returned invalid format. Expected JSON!", False
+        if retryable:
+            raise RPCErrorDoRetry(message, status_code=status_code, node=node, latency=latency)
+        raise RPCError(message, status_code=status_code, node=node, latency=latency)
 
     def rpcexec(self, endpoint, payload):
         """
@@ -175,18 +405,62 @@ class RPC(object):
         :raises ValueError: if the server does not respond in proper JSON format
         :raises RPCError: if the server returns an error
         """
-        log.debug(json.dumps(payload))
+        data = get_serializer().dumps(payload)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(data)
 
-        reply = self.request_send(endpoint, json.dumps(payload, ensure_ascii=False).encode('utf8'))
+        ret = self._send_with_retry(endpoint, data)
 
+        return self._parse_reply(ret)
+
+    def _send_with_retry(self, endpoint, data):
+        """Sends the data to the fastest healthy node and returns the
+            decoded reply. Calls which fail with :class:`RPCErrorDoRetry`
+            or a connection error are retried up to ``num_retries_call`` times.
+            The call is retried immediately on the next healthy node. When no
+            healthy node is left, the retry waits with an exponential backoff
+            with jitter.
+        """
+        cnt = 0
+        while True:
+            node = self.nodes.get_node()
+            start = time.time()
+            try:
+                response = self.request_send(endpoint, data, node=node)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(response.text)
+                ret = self._decode_reply(response.content, status_code=response.status_code, node=node.url,
+                                         latency=time.time() - start)
+                self.nodes.record_success(node, time.time() - start)
+                return ret
+            except (RPCErrorDoRetry, ConnectionError, Timeout) as e:
+                self.nodes.record_error(node)
+                cnt += 1
+                if self.num_retries_call >= 0 and cnt > self.num_retries_call:
+                    raise
+                if self.nodes.has_healthy_node(exclude=node):
+                    log.warning("Retry %d for %s on the next node: %s" % (cnt, endpoint, str(e)))
+                    continue
+                sleeptime = get_backoff_time(cnt, self.backoff_factor)
+                log.warning("Retry %d for %s in %.1f s: %s" % (cnt, endpoint, sleeptime, str(e)))
+                time.sleep(sleeptime)
+
+    def _decode_reply(self, reply, status_code=None, node=None, latency=None):
+        """Decodes the JSON reply (bytes or str) and checks for server errors"""
         ret = {}
         try:
-            ret = json.loads(reply, strict=False)
+            ret = get_serializer().loads(reply)
         except ValueError:
-            self._check_for_server_error(reply)
+            if isinstance(reply, bytes):
+                reply = reply.decode('utf8', 'replace')
+            self._check_for_server_error(reply, status_code=status_code, node=node, latency=latency)
+        return ret
 
-        log.debug(json.dumps(reply))
+    def _parse_reply(self, ret):
+        """Returns the result of a decoded reply
 
+        :raises RPCError: if the server returns an error
+        """
         if isinstance(ret, dict) and 'error' in ret:
             if 'detail' in ret['error']:
                 raise RPCError(ret['error']['detail'])
@@ -207,7 +481,6 @@ class RPC(object):
                         ret_list.append(r)
                 return ret_list
             elif isinstance(ret, dict) and "result" in ret:
-                self.nodes.reset_error_cnt_call()
                 return ret["result"]
             elif isinstance(ret, int):
                 raise RPCError("Client returned invalid format. Expected JSON! Output: %s" % (str(ret)))
@@ -215,23 +488,127 @@ class RPC(object):
                 return ret
         return ret
 
+    def rpcexec_batch(self, endpoint, queries):
+        """
+        Execute several calls by sending them as one JSON-RPC array.
+
+        :param str endpoint: endpoint which is used for all queries
+        :param list queries: list of JSON-RPC queries
+        :return: list with one entry per query in call order. The entry is
+            the result of the call or an :class:`RPCError` when this call failed.
+        :raises RPCError: if the server does not reply with a JSON array
+        """
+        data = get_serializer().dumps(queries)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(data)
+
+        ret = self._send_with_retry(endpoint, data)
+
+        return self._parse_batch_reply(queries, ret)
+
+    def _parse_batch_reply(self, queries, ret):
+        """Returns the results of a decoded batch reply in query order"""
+        if isinstance(ret, dict) and 'error' in ret:
+            raise RPCError(self._get_error_message(ret['error']))
+        elif not isinstance(ret, list):
+            raise RPCError("Client returned invalid format. Expected JSON array! Output: %s" % (str(ret)))
+
+        replies = {}
+        for r in ret:
+            if isinstance(r, dict) and "id" in r:
+                replies[r["id"]] = r
+        results = []
+        for i, query in enumerate(queries):
+            if query["id"] in replies:
+                r = replies[query["id"]]
+            elif len(ret) == len(queries):
+                r = ret[i]
+            else:
+                results.append(RPCError("No reply for %s with id %s" % (query["method"], str(query["id"]))))
+                continue
+            if isinstance(r, dict) and 'error' in r:
+                results.append(RPCError(self._get_error_message(r['error'])))
+            elif isinstance(r, dict) and "result" in r:
+                results.append(r["result"])
+            else:
+                results.append(r)
+        return results
+
     # End of Deprecated methods
     ####################################################################
     def __getattr__(self, name):
         """Map all methods to RPC calls and pass through the arguments."""
         def method(*args, **kwargs):
             endpoint = get_endpoint_name(*args, **kwargs)
-            args = json.loads(json.dumps(args))
-            # let's be able to define the num_retries per query
-            if len(args) > 0:
-                args = args[0]
-            query = {"method": name,
-                     "jsonrpc": "2.0",
-                     "params": args,
-                     "id": self.get_request_id()}
+            query = self._build_query(name, args)
             self.rpc_queue.append(query)
             query = self.rpc_queue
             self.rpc_queue = []
             r = self.rpcexec(endpoint, query)
             return r
         return method
+
+
+class RPCBatch(object):
+    """
+    Collects RPC calls and sends them as one JSON-RPC array to a single endpoint.
+
+    Each call returns its position in the batch. The results are stored in
+    call order in ``results`` after :func:`execute` was called or the
+    ``with`` block was left. A failed call is stored as :class:`RPCError`
+    instance, so that one failing call does not discard the whole batch.
+
+    :param RPC rpc: RPC instance which is used for sending
+    :param str endpoint: endpoint for all calls (default is contracts)
+
+    Usage:
+
+        .. code-block:: python
+
+            from steemengine.rpc import RPC
+            rpc = RPC()
+            batch = rpc.batch(endpoint="contracts")
+            batch.findOne({"contract": "tokens", "table": "tokens", "query": {"symbol": "ENG"}})
+            batch.findOne({"contract": "tokens", "table": "tokens", "query": {"symbol": "BTC"}})
+            eng, btc = batch.execute()
+
+    """
+
+    def __init__(self, rpc, endpoint="contracts"):
+        self.rpc = rpc
+        self.endpoint = endpoint
+        self.queries = []
+        self.results = None
+
+    def __len__(self):
+        return len(self.queries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+
+    def execute(self):
+        """Sends all collected calls and returns their results in call order"""
+        queries = self.queries
+        self.queries = []
+        if len(queries) == 0:
+            self.results = []
+        else:
+            self.results = self.rpc.rpcexec_batch(self.endpoint, queries)
+        return self.results
+
+    def __getattr__(self, name):
+        """Map all methods to RPC calls which are added to the batch."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            endpoint = kwargs.get("endpoint") or self.endpoint
+            if endpoint != self.endpoint:
+                raise ValueError("All calls of a batch must use the endpoint %s" % self.endpoint)
+            self.queries.append(self.rpc._build_query(name, args))
+            return len(self.queries) - 1
+        return method
@@ -0,0 +1,103 @@
+"""JSON serializers for RPC requests and replies.
+
+orjson or ujson is used when it is installed, otherwise the json module
+of the standard library is used. :func:`set_serializer` selects a
+serializer by name or sets a custom serializer object with ``dumps``
+(returning bytes) and ``loads`` (accepting bytes or str) methods.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import bytes, str
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JSONSerializer(object):
+    """Serializer which uses the json module"""
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(obj, ensure_ascii=False).encode('utf8')
+
+    def loads(self, data):
+        if isinstance(data, bytes):
+            data = data.decode('utf8')
+        return json.loads(data, strict=False)
+
+
+class OrjsonSerializer(JSONSerializer):
+    """Serializer which uses orjson. Replies with control characters
+        in strings are decoded by the json module.
+    """
+    name = "orjson"
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+    def loads(self, data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return super(OrjsonSerializer, self).loads(data)
+
+
+class UjsonSerializer(JSONSerializer):
+    """Serializer which uses ujson"""
+    name = "ujson"
+
+    def dumps(self, obj):
+        return ujson.dumps(obj, ensure_ascii=False).encode('utf8')
+
+    def loads(self, data):
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            return super(UjsonSerializer, self).loads(data)
+
+
+SERIALIZERS = {"json": JSONSerializer}
+if orjson is not None:
+    SERIALIZERS["orjson"] = OrjsonSerializer
+if ujson is not None:
+    SERIALIZERS["ujson"] = UjsonSerializer
+
+
+class SerializerInstance(object):
+    """Singelton for the Serializer Instance"""
+    instance = None
+
+
+def set_serializer(serializer):
+    """Sets the serializer which is used by RPC
+
+        :param serializer: name (``json``, ``orjson`` or ``ujson``) or
+            serializer object
+    """
+    if isinstance(serializer, str):
+        if serializer not in SERIALIZERS:
+            raise ValueError("%s is not installed" % serializer)
+        serializer = SERIALIZERS[serializer]()
+    SerializerInstance.instance = serializer
+
+
+def get_serializer():
+    """Returns the serializer which is used by RPC. The fastest
+        installed serializer is selected on first use.
+    """
+    if SerializerInstance.instance is None:
+        for name in ["orjson", "ujson", "json"]:
+            if name in SERIALIZERS:
+                SerializerInstance.instance = SERIALIZERS[name]()
+                break
+    return SerializerInstance.instance
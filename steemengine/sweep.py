@@ -0,0 +1,111 @@
+"""Planning of wallet sweeps (transfer, stake, unstake or sell all tokens)."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import decimal
+from concurrent.futures import ThreadPoolExecutor
+from beem.account import Account
+from steemengine.actionbatch import get_transfer_action, get_stake_action, get_order_action
+from steemengine.api import Api
+from steemengine.tokens import Tokens
+from steemengine.wallet import Wallet
+
+SWEEP_ACTIONS = ["transfer", "stake", "unstake", "sell"]
+
+
+def get_token_price(metrics):
+    """Returns the highest bid of the market metrics as string. The last
+        price is returned when there is no bid and None without metrics.
+    """
+    if metrics is None:
+        return None
+    if float(metrics.get("highestBid") or 0) > 0:
+        return metrics["highestBid"]
+    return metrics.get("lastPrice")
+
+
+def prefetch_sweep_data(account, api=None, steem_instance=None):
+    """Requests the wallet, all token definitions and all market metrics
+        concurrently.
+
+        :return: (wallet, tokens, metrics), metrics is a dict with the
+            market metrics of each symbol
+    """
+    if api is None:
+        api = Api()
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        wallet = executor.submit(Wallet, account, api=api, steem_instance=steem_instance)
+        tokens = executor.submit(Tokens, api=api)
+        metrics = executor.submit(lambda: list(api.find_all("market", "metrics", query={})))
+        metrics = dict((m["symbol"], m) for m in metrics.result())
+        return wallet.result(), tokens.result(), metrics
+
+
+def plan_sweep(action, wallet, tokens, metrics, min_value=0.001):
+    """Returns a list with one entry per token of the wallet which is
+        transfered, staked, unstaked or sold. Each entry is a dict with
+        ``symbol``, ``amount`` (quantized Decimal), ``price`` and ``value``
+        (in STEEM, None when the token has no market).
+
+        :param str action: transfer, stake, unstake or sell
+        :param Wallet wallet: wallet (list of balances)
+        :param Tokens tokens: all token definitions
+        :param dict metrics: market metrics of each symbol
+        :param float min_value: tokens with a lower STEEM value are not sold
+    """
+    if action not in SWEEP_ACTIONS:
+        raise ValueError("action must be one of %s" % ", ".join(SWEEP_ACTIONS))
+    plan = []
+    for balance in wallet:
+        symbol = balance["symbol"]
+        if action == "unstake":
+            amount = balance.get("stake") or "0"
+        else:
+            amount = balance["balance"]
+        if decimal.Decimal(amount) <= 0:
+            continue
+        token = tokens.get_token(symbol)
+        if token is None:
+            continue
+        if action in ["stake", "unstake"] and not token.get("stakingEnabled"):
+            continue
+        quant_amount = token.quantize(amount)
+        if quant_amount <= 0:
+            continue
+        price = get_token_price(metrics.get(symbol))
+        value = None
+        if price is not None:
+            value = float(price) * float(quant_amount)
+        if action == "sell" and (price is None or float(price) <= 0 or value < min_value):
+            continue
+        plan.append({"symbol": symbol, "amount": quant_amount, "price": price, "value": value})
+    return plan
+
+
+def execute_sweep(action, plan, wallet, to=None, memo="", batch=None):
+    """Adds the planned actions to an :class:`steemengine.actionbatch.ActionBatch`
+        and broadcasts them together. The actions are built by the same
+        functions as in :class:`steemengine.wallet.Wallet` and
+        :class:`steemengine.market.Market`. The amounts were already checked
+        against the wallet by :func:`plan_sweep`.
+
+        :param str action: transfer, stake, unstake or sell
+        :param list plan: plan from :func:`plan_sweep`
+        :param Wallet wallet: wallet which signs the actions
+        :param str to: recipient of transfers
+        :param str memo: memo of transfers
+        :return: list with the result of each planned action
+    """
+    if batch is None:
+        batch = wallet.batch()
+    if action == "transfer" and len(plan) > 0:
+        to = Account(to, steem_instance=wallet.steem)["name"]
+    for entry in plan:
+        if action == "transfer":
+            batch.append(get_transfer_action(to, entry["amount"], entry["symbol"], memo))
+        elif action in ["stake", "unstake"]:
+            batch.append(get_stake_action(action, entry["amount"], entry["symbol"]))
+        elif action == "sell":
+            batch.append(get_order_action("sell", entry["amount"], entry["symbol"], entry["price"]))
+    return batch.flush()
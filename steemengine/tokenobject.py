@@ -3,16 +3,41 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 from steemengine.api import Api
+from steemengine.cache import ObjectCache
 from steemengine.exceptions import TokenDoesNotExists
 import decimal
 
 
+# Token definitions shared by all Token and Tokens objects.
+# The keys are (api url, symbol), (api url, None) is used for the token list.
+token_cache = ObjectCache(default_expiration=3600, max_size=10000)
+
+
+def invalidate_token_cache(symbol=None):
+    """Removes the cached definition of the given token symbol.
+        All cached token definitions are removed when symbol is None.
+    """
+    if symbol is None:
+        token_cache.invalidate()
+    else:
+        symbol = symbol.upper()
+        token_cache.invalidate(lambda key: key[1] is None or key[1] == symbol)
+
+
+def set_token_cache_expiration(expiration):
+    """Sets the time in seconds after which cached token definitions are fetched again"""
+    token_cache.set_expiration(expiration)
+
+
 class Token(dict):
     """ steem-engine token dict
 
         :param str token: Name of the token
+        :param Api api: Api instance
+        :param bool use_cache: When False, the token definition is fetched
+            from the API and not taken from the shared token cache
     """
-    def __init__(self, symbol, api=None):
+    def __init__(self, symbol, api=None, use_cache=True):
         if api is None:
             self.api = Api()
         else:
@@ -22,12 +47,21 @@ class Token(dict):
             super(Token, self).__init__(symbol)
         else:
             self.symbol = symbol.upper()
-            self.refresh()
+            self.refresh(use_cache=use_cache)
 
-    def refresh(self):
-        info = self.get_info()
+    def refresh(self, use_cache=True):
+        """Updates the token definition. The definition is taken from the shared
+            token cache, when use_cache is True and it is cached.
+        """
+        cache_key = (self.api.url, self.symbol)
+        info = None
+        if use_cache:
+            info = token_cache.get(cache_key)
         if info is None:
-            raise TokenDoesNotExists("Token %s does not exists!" % self.symbol)
+            info = self.get_info()
+            if info is None or len(info) == 0:
+                raise TokenDoesNotExists("Token %s does not exists!" % self.symbol)
+            token_cache[cache_key] = info
         super(Token, self).__init__(info)
 
     def quantize(self, amount):
@@ -44,9 +78,14 @@ class Token(dict):
         else:
             return token
 
-    def get_holder(self, limit=1000, offset=0):
-        """Returns all token holders"""
-        holder = self.api.find("tokens", "balances", query={"symbol": self.symbol}, limit=limit, offset=offset)
+    def get_holder(self, limit=None, offset=0):
+        """Returns all token holders. When limit is set, only
+            limit holders starting at offset are returned.
+        """
+        if limit is None:
+            holder = list(self.api.find_all("tokens", "balances", query={"symbol": self.symbol}, offset=offset))
+        else:
+            holder = self.api.find("tokens", "balances", query={"symbol": self.symbol}, limit=limit, offset=offset)
         return holder
 
     def get_market_info(self):
@@ -3,7 +3,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 from steemengine.api import Api
-from steemengine.tokenobject import Token
+from steemengine.tokenobject import Token, token_cache
 
 
 class Tokens(list):
@@ -16,20 +16,41 @@ class Tokens(list):
             self.api = api        
         self.refresh()
 
-    def refresh(self):
-        super(Tokens, self).__init__(self.get_token_list())
+    def refresh(self, use_cache=True):
+        """Updates the token list. The list is taken from the shared token cache,
+            when use_cache is True and it is cached.
+        """
+        token_list = None
+        if use_cache:
+            token_list = token_cache.get((self.api.url, None))
+        if token_list is None:
+            token_list = self.get_token_list()
+            token_cache[(self.api.url, None)] = token_list
+            for t in token_list:
+                token_cache[(self.api.url, t["symbol"])] = t
+        super(Tokens, self).__init__(token_list)
+        self._symbol_index = {}
+        for t in self:
+            self._symbol_index[t["symbol"].lower()] = t
+        self._token_objects = {}
 
     def get_token_list(self):
         """Returns all available token as list"""
-        tokens = self.api.find("tokens", "tokens", query={})
+        tokens = list(self.api.find_all("tokens", "tokens", query={}))
         return tokens
 
     def get_token(self, symbol):
         """Returns Token from given token symbol. Is None
-            when token does not exists.
+            when token does not exists. The returned Token objects
+            are cached until the next refresh.
         """
-        for t in self:
-            if t["symbol"].lower() == symbol.lower():
-                return Token(t, api=self.api)
-        return None
+        key = symbol.lower()
+        token = self._token_objects.get(key)
+        if token is None:
+            t = self._symbol_index.get(key)
+            if t is None:
+                return None
+            token = Token(t, api=self.api)
+            self._token_objects[key] = token
+        return token
 
@@ -0,0 +1,357 @@
+"""Append-only trade history files with OHLCV aggregation (requires numpy)."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import calendar
+import hashlib
+import logging
+import os
+from datetime import datetime
+from steemengine.api import Api
+from steemengine.blockchain import Blockchain
+from steemengine.checkpoint import get_checkpoint_store
+from steemengine.transaction import Transaction
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+    # One record per trade, type is 1 for buy and -1 for sell. id is the _id
+    # from tradesHistory or a negative key of a streamed trade (get_trade_id),
+    # -1 marks a trade without key.
+    TRADE_DTYPE = np.dtype([("timestamp", "<i8"), ("id", "<i8"), ("price", "<f8"),
+                            ("quantity", "<f8"), ("type", "i1")])
+    OHLCV_DTYPE = np.dtype([("timestamp", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+                            ("close", "<f8"), ("volume", "<f8"), ("steem_volume", "<f8"),
+                            ("vwap", "<f8"), ("trades", "<i8")])
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+log = logging.getLogger(__name__)
+
+
+def parse_block_timestamp(timestamp):
+    """Returns the unix time of a block timestamp (e.g. ``2019-06-01T12:00:00``)"""
+    return calendar.timegm(datetime.strptime(timestamp[:19], "%Y-%m-%dT%H:%M:%S").timetuple())
+
+
+def get_trade_id(transaction_id, index):
+    """Returns the negative record id of the index-th trade (order fill) of a
+        streamed transaction. It is derived from the transaction id, so that
+        the same trade always gets the same id.
+    """
+    key = ("%s:%d" % (transaction_id, index)).encode("utf-8")
+    return -(int(hashlib.sha1(key).hexdigest()[:15], 16) + 2)
+
+
+def get_trades_from_transaction(trx):
+    """Returns a list of (price, quantity) tuples with the trades of a market
+        buy or sell transaction. The trades are taken from the token
+        transfers in the logs: each filled order transfers the token to the
+        buyer and STEEMP to the seller.
+    """
+    if trx["contract"] != "market" or trx["action"] not in ["buy", "sell"]:
+        return []
+    if not isinstance(trx, Transaction):
+        trx = Transaction(trx)
+    logs = trx.logs
+    payload = trx.payload
+    if not isinstance(logs, dict) or "errors" in logs or not isinstance(payload, dict):
+        return []
+    symbol = payload.get("symbol", "").upper()
+    sender = trx.get("sender")
+    token_quantities = []
+    steem_quantities = []
+    for event in logs.get("events", []):
+        if event.get("event") != "transferFromContract":
+            continue
+        data = event.get("data", {})
+        to_sender = data.get("to") == sender
+        if data.get("symbol") == symbol and to_sender == (trx["action"] == "buy"):
+            token_quantities.append(float(data["quantity"]))
+        elif data.get("symbol") == "STEEMP" and to_sender == (trx["action"] == "sell"):
+            steem_quantities.append(float(data["quantity"]))
+    trades = []
+    for quantity, steem_quantity in zip(token_quantities, steem_quantities):
+        if quantity > 0:
+            trades.append((steem_quantity / quantity, quantity))
+    return trades
+
+
+class TradeStore(object):
+    """ Stores the trades of a token in an append-only file
+
+        Each trade is stored as fixed size record (:data:`TRADE_DTYPE`) in
+        ``<directory>/<symbol>.trades``. The trades are read with a numpy
+        memmap, so that aggregations do not load the history into python
+        objects. :meth:`sync_history` pages backwards through
+        ``market.tradesHistory`` until the last stored trade is reached,
+        :meth:`stream` adds the trades from streamed market transactions.
+
+        The record id is the key of a trade: the ``_id`` for trades from
+        ``market.tradesHistory`` and :func:`get_trade_id` of the transaction
+        id and the fill index for streamed trades. Trades whose id is already
+        stored are skipped. History and streamed trades of the same trade
+        have different ids, so a file should be filled from the history first
+        and streamed afterwards.
+
+        :param str symbol: token symbol
+        :param str directory: directory of the trade files
+        :param Api api: Api instance
+        :param checkpoint_store: :class:`steemengine.checkpoint.FileCheckpointStore`,
+            :class:`steemengine.checkpoint.SQLiteCheckpointStore` or path
+            (a path ending with ``.db`` or ``.sqlite`` is opened
+            as SQLite database). The stream position is only kept in memory when not set.
+        :param str checkpoint_key: key of the stream position in the checkpoint
+            store (default is ``tradestore:<symbol>``)
+        :param int checkpoint_interval: the position is stored at least every
+            checkpoint_interval blocks, blocks with trades are always stored
+
+        .. code-block:: python
+
+            from steemengine.tradestore import TradeStore
+            store = TradeStore("ENG", directory="trades", checkpoint_store="trades/checkpoints.json")
+            store.sync_history()
+            candles = store.ohlcv(3600)
+            print(candles["close"])
+
+    """
+    def __init__(self, symbol, directory=".", api=None, checkpoint_store=None, checkpoint_key=None,
+                 checkpoint_interval=100):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for steemengine.tradestore")
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        self.symbol = symbol.upper()
+        self.directory = directory
+        self.path = os.path.join(directory, "%s.trades" % self.symbol)
+        self.checkpoint_store = get_checkpoint_store(checkpoint_store)
+        if checkpoint_key is None:
+            checkpoint_key = "tradestore:%s" % self.symbol
+        self.checkpoint_key = checkpoint_key
+        self.checkpoint_interval = checkpoint_interval
+        self.block_num = None
+        self._stored_block_num = None
+        if self.checkpoint_store is not None:
+            checkpoint = self.checkpoint_store.get(self.checkpoint_key)
+            if checkpoint is not None:
+                self.block_num = checkpoint["block"]
+                self._stored_block_num = self.block_num
+
+    def __len__(self):
+        if not os.path.exists(self.path):
+            return 0
+        return os.path.getsize(self.path) // TRADE_DTYPE.itemsize
+
+    def get_trades(self, start=None, end=None):
+        """Returns a read-only array of all trades with start <= timestamp < end"""
+        count = len(self)
+        if count == 0:
+            return np.zeros(0, dtype=TRADE_DTYPE)
+        trades = np.memmap(self.path, dtype=TRADE_DTYPE, mode="r", shape=(count, ))
+        first = 0
+        last = count
+        if start is not None:
+            first = np.searchsorted(trades["timestamp"], start, side="left")
+        if end is not None:
+            last = np.searchsorted(trades["timestamp"], end, side="left")
+        return trades[first:last]
+
+    def get_last_trade(self):
+        """Returns the last stored trade or None"""
+        count = len(self)
+        if count == 0:
+            return None
+        return np.memmap(self.path, dtype=TRADE_DTYPE, mode="r", offset=(count - 1) * TRADE_DTYPE.itemsize,
+                         shape=(1, ))[0]
+
+    def get_last_history_id(self):
+        """Returns the highest stored ``_id`` of market.tradesHistory or None"""
+        count = len(self)
+        if count == 0:
+            return None
+        ids = np.memmap(self.path, dtype=TRADE_DTYPE, mode="r", shape=(count, ))["id"]
+        ids = ids[ids >= 0]
+        if len(ids) == 0:
+            return None
+        return int(ids.max())
+
+    def append(self, trades):
+        """Appends trades to the file. Trades which are older than the last
+            stored trade are skipped, so that the file stays sorted. Trades
+            whose id is already stored (or appears twice) are skipped,
+            trades with id -1 are always appended.
+
+            :param trades: array with :data:`TRADE_DTYPE` or list of
+                (timestamp, id, price, quantity, type) tuples
+        """
+        if not isinstance(trades, np.ndarray):
+            trades = np.array(trades, dtype=TRADE_DTYPE)
+        if len(trades) == 0:
+            return 0
+        trades = trades[np.argsort(trades["timestamp"], kind="mergesort")]
+        last_trade = self.get_last_trade()
+        if last_trade is not None:
+            trades = trades[trades["timestamp"] >= last_trade["timestamp"]]
+            known_ids = self.get_trades(start=last_trade["timestamp"])["id"]
+        else:
+            known_ids = np.zeros(0, dtype=np.int64)
+        ids = trades["id"]
+        first = np.zeros(len(trades), dtype=bool)
+        first[np.unique(ids, return_index=True)[1]] = True
+        trades = trades[(ids == -1) | (first & ~np.isin(ids, known_ids))]
+        if len(trades) == 0:
+            return 0
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        with open(self.path, "ab") as f:
+            # removes a partly written record
+            size = len(self) * TRADE_DTYPE.itemsize
+            if f.tell() != size:
+                f.truncate(size)
+                f.seek(size)
+            f.write(trades.astype(TRADE_DTYPE).tobytes())
+        return len(trades)
+
+    def sync_history(self, page_size=1000):
+        """Pages backwards through market.tradesHistory and appends all trades
+            whose ``_id`` is higher than the highest stored ``_id``. When no
+            history trade is stored, the paging stops at the first trade which
+            is older than the last stored trade.
+
+            :return: number of appended trades
+        """
+        last_id = self.get_last_history_id()
+        last_trade = self.get_last_trade()
+        new_trades = []
+        offset = 0
+        while True:
+            page = self.api.find("market", "tradesHistory", query={"symbol": self.symbol}, limit=page_size,
+                                 offset=offset, indexes=[{"index": "_id", "descending": True}])
+            if page is None or len(page) == 0:
+                break
+            reached_last_trade = False
+            for trade in page:
+                trade_id = int(trade["_id"])
+                timestamp = int(trade["timestamp"])
+                if last_id is not None:
+                    reached_last_trade = trade_id <= last_id
+                elif last_trade is not None:
+                    reached_last_trade = timestamp < last_trade["timestamp"]
+                if reached_last_trade:
+                    break
+                trade_type = 1 if trade.get("type") == "buy" else -1
+                new_trades.append((timestamp, trade_id, float(trade["price"]), float(trade["quantity"]), trade_type))
+            if reached_last_trade or len(page) < page_size:
+                break
+            offset += len(page)
+        new_trades.reverse()
+        return self.append(new_trades)
+
+    def apply_transaction(self, trx, timestamp=None):
+        """Appends the trades of a market transaction
+
+            :return: number of appended trades
+        """
+        if timestamp is None:
+            timestamp = trx["timestamp"]
+        if not isinstance(timestamp, int):
+            timestamp = parse_block_timestamp(timestamp)
+        if not isinstance(trx, Transaction):
+            trx = Transaction(trx)
+        payload = trx.payload
+        if not isinstance(payload, dict) or payload.get("symbol", "").upper() != self.symbol:
+            return 0
+        trade_type = 1 if trx["action"] == "buy" else -1
+        transaction_id = trx.get("transactionId")
+        trades = []
+        for index, (price, quantity) in enumerate(get_trades_from_transaction(trx)):
+            trade_id = -1 if transaction_id is None else get_trade_id(transaction_id, index)
+            trades.append((timestamp, trade_id, price, quantity, trade_type))
+        return self.append(trades)
+
+    def set_block_num(self, block_num, store=True):
+        """Sets the last streamed block and stores it in the checkpoint store"""
+        self.block_num = block_num
+        if store and self.checkpoint_store is not None:
+            self.checkpoint_store.set(self.checkpoint_key, {"block": block_num})
+            self._stored_block_num = block_num
+
+    def reset(self):
+        """Removes the stored stream position, the next stream starts at the head block"""
+        self.block_num = None
+        self._stored_block_num = None
+        if self.checkpoint_store is not None:
+            self.checkpoint_store.delete(self.checkpoint_key)
+
+    def stream(self, blockchain=None, start=None, stop=None):
+        """Appends the trades from streamed market transactions and yields
+            each transaction with trades. The position is stored after all
+            trades of a block were appended. A block which is streamed again
+            after a restart does not add its trades twice.
+
+            :param Blockchain blockchain: Blockchain instance which is used for streaming
+            :param int start: first block number (default is the block after
+                the stored position or the head block)
+            :param int stop: last block number, blocks are streamed forever when not set
+        """
+        if blockchain is None:
+            blockchain = Blockchain(api=self.api)
+        if start is None and self.block_num is not None:
+            start = self.block_num + 1
+        for block in blockchain.blocks(start=start, stop=stop):
+            appended = 0
+            for trx in block["transactions"]:
+                if trx["contract"] != "market" or trx["action"] not in ["buy", "sell"]:
+                    continue
+                trx = Transaction(trx)
+                trx["blockNumber"] = block["blockNumber"]
+                trx["timestamp"] = block["timestamp"]
+                count = self.apply_transaction(trx)
+                if count > 0:
+                    appended += count
+                    yield trx
+            block_num = block["blockNumber"]
+            store = appended > 0 or self._stored_block_num is None or \
+                block_num - self._stored_block_num >= self.checkpoint_interval or block_num == stop
+            self.set_block_num(block_num, store=store)
+
+    def ohlcv(self, interval, start=None, end=None):
+        """Returns candles with the given interval as array with :data:`OHLCV_DTYPE`.
+            Only intervals with trades are returned.
+
+            :param int interval: candle length in seconds
+            :param int start: unix time of the first trade
+            :param int end: unix time after the last trade
+        """
+        trades = self.get_trades(start=start, end=end)
+        if len(trades) == 0:
+            return np.zeros(0, dtype=OHLCV_DTYPE)
+        timestamps = trades["timestamp"]
+        prices = trades["price"]
+        quantities = trades["quantity"]
+        buckets = timestamps // interval * interval
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        ends = np.concatenate((starts[1:], [len(trades)])) - 1
+        candles = np.zeros(len(starts), dtype=OHLCV_DTYPE)
+        candles["timestamp"] = buckets[starts]
+        candles["open"] = prices[starts]
+        candles["close"] = prices[ends]
+        candles["high"] = np.maximum.reduceat(prices, starts)
+        candles["low"] = np.minimum.reduceat(prices, starts)
+        candles["volume"] = np.add.reduceat(quantities, starts)
+        candles["steem_volume"] = np.add.reduceat(prices * quantities, starts)
+        candles["trades"] = ends - starts + 1
+        volume = candles["volume"]
+        candles["vwap"] = np.divide(candles["steem_volume"], volume, out=np.zeros(len(volume)), where=volume > 0)
+        return candles
+
+    def vwap(self, start=None, end=None):
+        """Returns the volume weighted average price of all trades between start and end"""
+        trades = self.get_trades(start=start, end=end)
+        volume = trades["quantity"].sum()
+        if volume == 0:
+            return 0.
+        return float(np.dot(trades["price"], trades["quantity"]) / volume)
@@ -0,0 +1,97 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import bytes, str
+import json
+
+
+_NOT_DECODED = object()
+
+
+class Transaction(dict):
+    """ steem-engine sidechain transaction dict
+
+        ``logs`` and ``payload`` are stored as JSON strings. They are decoded
+        on first access of the ``logs`` and ``payload`` properties and
+        the decoded objects are cached. ``trx["logs"]`` and ``trx["payload"]``
+        still return the JSON strings. The cache is reset when these keys are
+        changed by any dict method.
+
+        :param dict trx: transaction as returned by the sidechain
+
+        .. code-block:: python
+
+            from steemengine.api import Api
+            api = Api()
+            trx = api.get_transaction_info("e6c7f351b3743d1ed3d66eb9c6f2c102020aaa5d")
+            print(trx.payload["symbol"])
+
+    """
+    __slots__ = ("_logs", "_payload")
+
+    def __init__(self, trx):
+        super(Transaction, self).__init__(trx)
+        self._logs = _NOT_DECODED
+        self._payload = _NOT_DECODED
+
+    @property
+    def logs(self):
+        """Returns the decoded logs"""
+        if self._logs is _NOT_DECODED:
+            self._logs = self._decode("logs")
+        return self._logs
+
+    @property
+    def payload(self):
+        """Returns the decoded payload"""
+        if self._payload is _NOT_DECODED:
+            self._payload = self._decode("payload")
+        return self._payload
+
+    def _decode(self, key):
+        value = self.get(key)
+        if value is None or not isinstance(value, (str, bytes)):
+            return value
+        if len(value) == 0:
+            return None
+        return json.loads(value)
+
+    def _reset(self, key):
+        """Removes the cached decoded value of key"""
+        if key == "logs":
+            self._logs = _NOT_DECODED
+        elif key == "payload":
+            self._payload = _NOT_DECODED
+
+    def __setitem__(self, key, value):
+        self._reset(key)
+        super(Transaction, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._reset(key)
+        super(Transaction, self).__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        super(Transaction, self).update(*args, **kwargs)
+        self._logs = _NOT_DECODED
+        self._payload = _NOT_DECODED
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._reset(key)
+        return super(Transaction, self).setdefault(key, default)
+
+    def pop(self, key, *args):
+        self._reset(key)
+        return super(Transaction, self).pop(key, *args)
+
+    def popitem(self):
+        self._logs = _NOT_DECODED
+        self._payload = _NOT_DECODED
+        return super(Transaction, self).popitem()
+
+    def clear(self):
+        self._logs = _NOT_DECODED
+        self._payload = _NOT_DECODED
+        super(Transaction, self).clear()
@@ -11,11 +11,16 @@ import requests
 from timeit import default_timer as timer
 import logging
 import decimal
+import hashlib
 from steemengine.api import Api
 from steemengine.tokenobject import Token
+from steemengine.history import AccountHistory
+from steemengine.actionbatch import ActionBatch, get_transfer_action, get_stake_action
+from steemengine.checkpoint import get_checkpoint_store
 from steemengine.exceptions import (TokenDoesNotExists, TokenNotInWallet, InsufficientTokenAmount, TokenIssueNotPermitted, MaxSupplyReached, InvalidTokenAmount)
 from beem.instance import shared_steem_instance
-from beem.account import Account
+from beem.account import Account, Accounts
+from beem.exceptions import AccountDoesNotExistsException
 
 
 class Wallet(list):
@@ -52,9 +57,25 @@ class Wallet(list):
         """Sets the ssc id (default is ssc-mainnet1)"""
         self.ssc_id = ssc_id
 
+    def batch(self):
+        """Returns an :class:`steemengine.actionbatch.ActionBatch` for the wallet account.
+            Actions which are added to the batch are broadcasted together by ``flush()``.
+        """
+        return ActionBatch(self.account, steem_instance=self.steem, ssc_id=self.ssc_id)
+
+    def _broadcast(self, json_data, batch=None):
+        """Broadcasts the action or adds it to the batch, which has to be
+            signed by the wallet account
+        """
+        if batch is not None:
+            if batch.account != self.account:
+                raise ValueError("The batch is signed by %s and not by %s" % (batch.account, self.account))
+            return batch.append(json_data)
+        return self.steem.custom_json(self.ssc_id, json_data, required_auths=[self.account])
+
     def get_balances(self):
         """Returns all token within the wallet as list"""
-        balances = self.api.find("tokens", "balances", query={"account": self.account})
+        balances = list(self.api.find_all("tokens", "balances", query={"account": self.account}))
         return balances
 
     def change_account(self, account):
@@ -70,13 +91,15 @@ class Wallet(list):
                 return token
         return None
 
-    def transfer(self, to, amount, symbol, memo=""):
+    def transfer(self, to, amount, symbol, memo="", batch=None):
         """Transfer a token to another account.
 
             :param str to: Recipient
             :param float amount: Amount to transfer
             :param str symbol: Token to transfer
             :param str memo: (optional) Memo
+            :param ActionBatch batch: (optional) the action is added to the batch and
+                its index is returned instead of broadcasting it
 
 
             Transfer example:
@@ -100,17 +123,98 @@ class Wallet(list):
         if quant_amount <= decimal.Decimal("0"):
             raise InvalidTokenAmount("Amount to transfer is below token precision of %d" % token["precision"])
         check_to = Account(to, steem_instance=self.steem)
-        contract_payload = {"symbol":symbol.upper(),"to":to,"quantity":str(quant_amount),"memo":memo}
-        json_data = {"contractName":"tokens","contractAction":"transfer",
-                     "contractPayload":contract_payload}
-        tx = self.steem.custom_json(self.ssc_id, json_data, required_auths=[self.account])
-        return tx
+        return self._broadcast(get_transfer_action(to, quant_amount, symbol, memo), batch=batch)
+
+    def bulk_transfer(self, recipients, symbol, memo="", journal=None):
+        """Transfers a token to many accounts with as few broadcasts as possible.
+
+            All amounts are quantized with the token precision and all recipients
+            are checked with batched account lookups before the first transfer
+            is broadcasted. The transfers are packed into multi action custom_json
+            operations by an :class:`steemengine.actionbatch.ActionBatch`.
+
+            :param list recipients: list of (to, amount) or (to, amount, memo) tuples
+            :param str symbol: Token to transfer
+            :param str memo: (optional) Memo for recipients without a memo
+            :param journal: (optional) checkpoint store or path to a JSON/SQLite file.
+                Broadcasted transfers are stored in the journal and skipped when the
+                same bulk transfer is started again, e.g. after a crash.
+            :return: list with one result per recipient, which is the broadcasted
+                transaction, the exception of a failed broadcast or None, when the
+                transfer was skipped as it is in the journal.
 
-    def stake(self, amount, symbol):
+            Bulk transfer example:
+
+            .. code-block:: python
+
+                from steemengine.wallet import Wallet
+                from beem import Steem
+                active_wif = "5xxxx"
+                stm = Steem(keys=[active_wif])
+                wallet = Wallet("test", steem_instance=stm)
+                wallet.bulk_transfer([("test1", 1), ("test2", 2, "thanks")], "ENG", journal="airdrop.json")
+        """
+        token_in_wallet = self.get_token(symbol)
+        if token_in_wallet is None:
+            raise TokenNotInWallet("%s is not in wallet." % symbol)
+        token = Token(symbol, api=self.api)
+        transfers = []
+        for recipient in recipients:
+            to, amount = recipient[0], recipient[1]
+            if len(recipient) > 2 and recipient[2] is not None:
+                transfer_memo = recipient[2]
+            else:
+                transfer_memo = memo
+            quant_amount = token.quantize(amount)
+            if quant_amount <= decimal.Decimal("0"):
+                raise InvalidTokenAmount("Amount to transfer to %s is below token precision of %d" % (to, token["precision"]))
+            transfers.append((to, quant_amount, transfer_memo))
+
+        journal = get_checkpoint_store(journal)
+        journal_key = self.get_bulk_transfer_key(symbol, transfers)
+        done = set()
+        if journal is not None:
+            done = set(journal.get(journal_key, []))
+        pending = [i for i in range(len(transfers)) if i not in done]
+        total_amount = sum([transfers[i][1] for i in pending], decimal.Decimal("0"))
+        if decimal.Decimal(token_in_wallet["balance"]) < total_amount:
+            raise InsufficientTokenAmount("Only %.3f in wallet" % float(token_in_wallet["balance"]))
+        names = sorted(set([transfers[i][0] for i in pending]))
+        existing = set([acc["name"] for acc in Accounts(names, lazy=True, full=False, steem_instance=self.steem)])
+        missing = [name for name in names if name not in existing]
+        if len(missing) > 0:
+            raise AccountDoesNotExistsException(", ".join(missing))
+
+        batch = self.batch()
+        for i in pending:
+            to, quant_amount, transfer_memo = transfers[i]
+            batch.append(get_transfer_action(to, quant_amount, symbol, transfer_memo))
+
+        def store_journal(indices, tx):
+            if journal is None or isinstance(tx, Exception):
+                return
+            done.update([pending[index] for index in indices])
+            journal.set(journal_key, sorted(done))
+
+        results = [None] * len(transfers)
+        for index, tx in enumerate(batch.flush(callback=store_journal)):
+            results[pending[index]] = tx
+        return results
+
+    def get_bulk_transfer_key(self, symbol, transfers):
+        """Returns the journal key of a bulk transfer"""
+        transfer_hash = hashlib.sha1()
+        for to, quant_amount, transfer_memo in transfers:
+            transfer_hash.update(("%s|%s|%s\n" % (to, str(quant_amount), transfer_memo)).encode("utf8"))
+        return "transfer:%s:%s:%s" % (self.account, symbol.upper(), transfer_hash.hexdigest())
+
+    def stake(self, amount, symbol, batch=None):
         """Stake a token.
 
             :param float amount: Amount to stake
             :param str symbol: Token to stake
+            :param ActionBatch batch: (optional) the action is added to the batch and
+                its index is returned instead of broadcasting it
 
             Stake example:
 
@@ -132,17 +236,15 @@ class Wallet(list):
         quant_amount = token.quantize(amount)
         if quant_amount <= decimal.Decimal("0"):
             raise InvalidTokenAmount("Amount to stake is below token precision of %d" % token["precision"])
-        contract_payload = {"symbol":symbol.upper(),"quantity":str(quant_amount)}
-        json_data = {"contractName":"tokens","contractAction":"stake",
-                     "contractPayload":contract_payload}
-        tx = self.steem.custom_json(self.ssc_id, json_data, required_auths=[self.account])
-        return tx
+        return self._broadcast(get_stake_action("stake", quant_amount, symbol), batch=batch)
 
-    def unstake(self, amount, symbol):
+    def unstake(self, amount, symbol, batch=None):
         """Unstake a token.
 
             :param float amount: Amount to unstake
             :param str symbol: Token to unstake
+            :param ActionBatch batch: (optional) the action is added to the batch and
+                its index is returned instead of broadcasting it
 
             Unstake example:
 
@@ -166,16 +268,14 @@ class Wallet(list):
         quant_amount = token.quantize(amount)
         if quant_amount <= decimal.Decimal("0"):
             raise InvalidTokenAmount("Amount to stake is below token precision of %d" % token["precision"])
-        contract_payload = {"symbol":symbol.upper(),"quantity":str(quant_amount)}
-        json_data = {"contractName":"tokens","contractAction":"unstake",
-                     "contractPayload":contract_payload}
-        tx = self.steem.custom_json(self.ssc_id, json_data, required_auths=[self.account])
-        return tx
+        return self._broadcast(get_stake_action("unstake", quant_amount, symbol), batch=batch)
 
-    def cancel_unstake(self, trx_id):
+    def cancel_unstake(self, trx_id, batch=None):
         """Cancel unstaking a token.
 
             :param str trx_id: transaction id in which the tokan was unstaked
+            :param ActionBatch batch: (optional) the action is added to the batch and
+                its index is returned instead of broadcasting it
 
             Cancel unstake example:
 
@@ -191,15 +291,16 @@ class Wallet(list):
         contract_payload = {"txID":trx_id}
         json_data = {"contractName":"tokens","contractAction":"cancelUnstake",
                      "contractPayload":contract_payload}
-        tx = self.steem.custom_json(self.ssc_id, json_data, required_auths=[self.account])
-        return tx
+        return self._broadcast(json_data, batch=batch)
 
-    def issue(self, to, amount, symbol):
+    def issue(self, to, amount, symbol, batch=None):
         """Issues a specific token amount.
 
             :param str to: Recipient
             :param float amount: Amount to issue
             :param str symbol: Token to issue
+            :param ActionBatch batch: (optional) the action is added to the batch and
+                its index is returned instead of broadcasting it
 
 
             Issue example:
@@ -213,7 +314,7 @@ class Wallet(list):
                 wallet = Wallet("test", steem_instance=stm)
                 wallet.issue(1, "my_token")
         """
-        token = Token(symbol, api=self.api)
+        token = Token(symbol, api=self.api, use_cache=False)
         if token["issuer"] != self.account:
             raise TokenIssueNotPermitted("%s is not the issuer of token %s" % (self.account, symbol))
         
@@ -226,13 +327,30 @@ class Wallet(list):
         contract_payload = {"symbol":symbol.upper(),"to":to,"quantity":str(quant_amount)}
         json_data = {"contractName":"tokens","contractAction":"issue",
                      "contractPayload":contract_payload}
-        tx = self.steem.custom_json(self.ssc_id, json_data, required_auths=[self.account])
-        return tx
+        return self._broadcast(json_data, batch=batch)
 
     def get_history(self, symbol, limit=1000, offset=0):
         """Returns the transfer history of a token"""
         return self.api.get_history(self.account, symbol, limit, offset)
 
+    def get_account_history(self, symbol, checkpoint_store=None):
+        """Returns an :class:`steemengine.history.AccountHistory` object, which
+            returns only operations which are newer than the stored checkpoint.
+
+            :param str symbol: token symbol
+            :param checkpoint_store: checkpoint store or path to a JSON/SQLite file
+
+            .. code-block:: python
+
+                from steemengine.wallet import Wallet
+                wallet = Wallet("test")
+                history = wallet.get_account_history("ENG", checkpoint_store="history.json")
+                for op in history:
+                    print(op)
+
+        """
+        return AccountHistory(self.account, symbol, api=self.api, checkpoint_store=checkpoint_store)
+
     def get_buy_book(self, symbol=None, limit=100, offset=0):
         """Returns the buy book for the wallet account. When symbol is set,
             the order book from the given token is shown.
@@ -0,0 +1,181 @@
+"""Dispatches streamed token transfers to callbacks."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import logging
+from steemengine.api import Api
+from steemengine.blockchain import Blockchain
+from steemengine.checkpoint import get_checkpoint_store
+from steemengine.transaction import Transaction
+
+log = logging.getLogger(__name__)
+
+
+class TransferWatcher(object):
+    """ Watches the sidechain blocks for token transfers
+
+        Each ``tokens.transfer`` action to one of the watched accounts and of
+        one of the watched symbols is passed to all callbacks as soon as its
+        block is streamed. Failed transfers (logs with errors) are skipped.
+        Accounts and symbols are stored as sets, all accounts or symbols are
+        watched when they are not set.
+
+        The last handled block is stored in the checkpoint store after all
+        transfers of the block were dispatched, so that a restarted watcher
+        continues after this block.
+
+        :param list accounts: receiving accounts which are watched
+        :param list symbols: token symbols which are watched
+        :param Api api: Api instance
+        :param checkpoint_store: :class:`steemengine.checkpoint.FileCheckpointStore`,
+            :class:`steemengine.checkpoint.SQLiteCheckpointStore` or path
+            (a path ending with ``.db`` or ``.sqlite`` is opened
+            as SQLite database). The position is only kept in memory when not set.
+        :param str checkpoint_key: key of the position in the checkpoint store
+        :param int checkpoint_interval: the position is stored at least every
+            checkpoint_interval blocks, blocks with transfers are always stored
+
+        .. code-block:: python
+
+            from steemengine.watcher import TransferWatcher
+            watcher = TransferWatcher(["beembot"], ["ENG"], checkpoint_store="watcher.json")
+            def on_transfer(transfer):
+                print(transfer["from"], transfer["quantity"], transfer["memo"])
+            watcher.add_callback(on_transfer)
+            watcher.run()
+
+    """
+    def __init__(self, accounts=None, symbols=None, api=None, checkpoint_store=None,
+                 checkpoint_key="transfer_watcher", checkpoint_interval=100):
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        self.accounts = None
+        self.symbols = None
+        if accounts is not None:
+            self.accounts = set(accounts)
+        if symbols is not None:
+            self.symbols = set(symbol.upper() for symbol in symbols)
+        self.callbacks = []
+        self.checkpoint_store = get_checkpoint_store(checkpoint_store)
+        self.checkpoint_key = checkpoint_key
+        self.checkpoint_interval = checkpoint_interval
+        self.block_num = None
+        self._stored_block_num = None
+        if self.checkpoint_store is not None:
+            checkpoint = self.checkpoint_store.get(self.checkpoint_key)
+            if checkpoint is not None:
+                self.block_num = checkpoint["block"]
+                self._stored_block_num = self.block_num
+
+    def add_account(self, account):
+        """Adds an account to the watched accounts"""
+        if self.accounts is None:
+            self.accounts = set()
+        self.accounts.add(account)
+
+    def remove_account(self, account):
+        """Removes an account from the watched accounts"""
+        if self.accounts is not None:
+            self.accounts.discard(account)
+
+    def add_symbol(self, symbol):
+        """Adds a token symbol to the watched symbols"""
+        if self.symbols is None:
+            self.symbols = set()
+        self.symbols.add(symbol.upper())
+
+    def remove_symbol(self, symbol):
+        """Removes a token symbol from the watched symbols"""
+        if self.symbols is not None:
+            self.symbols.discard(symbol.upper())
+
+    def add_callback(self, callback):
+        """Adds a function which is called with each watched transfer"""
+        self.callbacks.append(callback)
+
+    def get_transfer(self, trx):
+        """Returns the transfer of a transaction as dict (with ``from``, ``to``,
+            ``symbol``, ``quantity``, ``memo``, ``blockNumber``, ``timestamp``
+            and ``transactionId``) or None, when the transaction is not a
+            watched transfer.
+        """
+        if trx["contract"] != "tokens" or trx["action"] != "transfer":
+            return None
+        if not isinstance(trx, Transaction):
+            trx = Transaction(trx)
+        payload = trx.payload
+        if not isinstance(payload, dict):
+            return None
+        to = payload.get("to")
+        symbol = payload.get("symbol", "").upper()
+        if self.accounts is not None and to not in self.accounts:
+            return None
+        if self.symbols is not None and symbol not in self.symbols:
+            return None
+        logs = trx.logs
+        if isinstance(logs, dict) and "errors" in logs:
+            return None
+        return {"from": trx.get("sender"), "to": to, "symbol": symbol, "quantity": payload.get("quantity"),
+                "memo": payload.get("memo", ""), "blockNumber": trx.get("blockNumber"),
+                "timestamp": trx.get("timestamp"), "transactionId": trx.get("transactionId")}
+
+    def get_transfers(self, block):
+        """Returns all watched transfers of a block"""
+        transfers = []
+        for trx in block["transactions"]:
+            if trx["contract"] != "tokens" or trx["action"] != "transfer":
+                continue
+            trx = Transaction(trx)
+            trx["blockNumber"] = block["blockNumber"]
+            trx["timestamp"] = block["timestamp"]
+            transfer = self.get_transfer(trx)
+            if transfer is not None:
+                transfers.append(transfer)
+        return transfers
+
+    def set_block_num(self, block_num, store=True):
+        """Sets the last handled block and stores it in the checkpoint store"""
+        self.block_num = block_num
+        if store and self.checkpoint_store is not None:
+            self.checkpoint_store.set(self.checkpoint_key, {"block": block_num})
+            self._stored_block_num = block_num
+
+    def reset(self):
+        """Removes the stored position, the next stream starts at the head block"""
+        self.block_num = None
+        self._stored_block_num = None
+        if self.checkpoint_store is not None:
+            self.checkpoint_store.delete(self.checkpoint_key)
+
+    def stream(self, blockchain=None, start=None, stop=None):
+        """Yields all watched transfers. The position is stored after all
+            transfers of a block were handled.
+
+            :param Blockchain blockchain: Blockchain instance which is used for streaming
+            :param int start: first block number (default is the block after
+                the stored position or the head block)
+            :param int stop: last block number, blocks are streamed forever when not set
+        """
+        if blockchain is None:
+            blockchain = Blockchain(api=self.api)
+        if start is None and self.block_num is not None:
+            start = self.block_num + 1
+        for block in blockchain.blocks(start=start, stop=stop):
+            transfers = self.get_transfers(block)
+            for transfer in transfers:
+                yield transfer
+            block_num = block["blockNumber"]
+            store = len(transfers) > 0 or self._stored_block_num is None or \
+                block_num - self._stored_block_num >= self.checkpoint_interval or block_num == stop
+            self.set_block_num(block_num, store=store)
+
+    def run(self, blockchain=None, start=None, stop=None):
+        """Streams the blocks and calls all callbacks with each watched transfer.
+            The arguments are the same as for :meth:`stream`.
+        """
+        for transfer in self.stream(blockchain=blockchain, start=start, stop=stop):
+            for callback in self.callbacks:
+                callback(transfer)
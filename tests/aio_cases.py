@@ -0,0 +1,61 @@
+"""asyncio test cases, which are only imported on python 3.5 and newer by test_aio.py"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import asyncio
+import unittest
+from steemengine.aio import AsyncApi, AsyncRPC, AIOHTTP_AVAILABLE
+from steemengine.rpc import RPCError
+from tests.helpers import Handler, LocalServer
+
+
+class BatchHandler(Handler):
+    """Replies to JSON-RPC arrays, the method fail returns an error"""
+    requests = []
+
+    def do_POST(self):
+        queries = self.read_json()
+        self.requests.append((self.path, queries))
+        reply = []
+        for query in queries:
+            if query["method"] == "fail":
+                reply.append({"jsonrpc": "2.0", "id": query["id"], "error": {"code": -1, "message": "failed"}})
+            else:
+                reply.append({"jsonrpc": "2.0", "id": query["id"], "result": query["params"]})
+        self.reply(reply)
+
+
+@unittest.skipIf(not AIOHTTP_AVAILABLE, "aiohttp is not installed")
+class Testcases(unittest.TestCase):
+    def test_async_api(self):
+        async def get_blocks():
+            async with AsyncApi() as api:
+                return await asyncio.gather(*[api.get_block_info(n) for n in range(1910, 1915)])
+        blocks = asyncio.get_event_loop().run_until_complete(get_blocks())
+        self.assertEqual([b["blockNumber"] for b in blocks], list(range(1910, 1915)))
+
+    def test_async_batch(self):
+        server = LocalServer(BatchHandler).start()
+        url = server.url + "rpc/"
+
+        async def run_batch():
+            async with AsyncRPC(url=url) as rpc:
+                async with rpc.batch(endpoint="blockchain") as batch:
+                    for block_num in range(1, 4):
+                        self.assertEqual(batch.getBlockInfo({"blockNumber": block_num}), block_num - 1)
+                    batch.fail({})
+                empty = await rpc.batch().execute()
+                return batch.results, empty
+        try:
+            results, empty = asyncio.new_event_loop().run_until_complete(run_batch())
+        finally:
+            server.stop()
+        self.assertEqual(results[:3], [{"blockNumber": n} for n in range(1, 4)])
+        self.assertTrue(isinstance(results[3], RPCError))
+        self.assertEqual(empty, [])
+        self.assertEqual(len(BatchHandler.requests), 1)
+        self.assertEqual(BatchHandler.requests[0][0], "/rpc/blockchain")
+        with self.assertRaises(TypeError):
+            with AsyncRPC(url=url).batch():
+                pass
@@ -0,0 +1,75 @@
+"""Fakes and the local JSON-RPC server which are shared by the offline tests"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import threading
+from six.moves import BaseHTTPServer, socketserver
+
+
+class FakeSteem(object):
+    """Records the broadcasted custom_json data. The broadcast with the
+        index fail_at raises an exception.
+    """
+    def __init__(self, fail_at=None):
+        self.broadcasts = []
+        self.fail_at = fail_at
+
+    def custom_json(self, id, json_data, required_auths=[], required_posting_auths=[]):
+        if len(self.broadcasts) == self.fail_at:
+            self.broadcasts.append(None)
+            raise Exception("broadcast failed")
+        self.broadcasts.append(json_data)
+        return {"trx_num": len(self.broadcasts)}
+
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Request handler without logging"""
+    def log_message(self, *args):
+        pass
+
+    def read_json(self):
+        return json.loads(self.rfile.read(int(self.headers["Content-Length"])).decode("utf8"))
+
+    def reply(self, data, status=200, headers={}):
+        if not isinstance(data, bytes):
+            data = json.dumps(data).encode("utf8")
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class LocalServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Serves the handler on a free local port in a background thread
+
+        .. code-block:: python
+
+            with LocalServer(RPCHandler) as server:
+                rpc = RPC(url=server.url + "rpc/")
+
+    """
+    daemon_threads = True
+
+    def __init__(self, handler):
+        BaseHTTPServer.HTTPServer.__init__(self, ("127.0.0.1", 0), handler)
+        self.url = "http://127.0.0.1:%d/" % self.server_address[1]
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
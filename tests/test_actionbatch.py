@@ -0,0 +1,77 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import range
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+from steemengine.actionbatch import ActionBatch, get_json_size
+from steemengine.exceptions import CustomJsonTooLarge
+from steemengine.wallet import Wallet
+from tests.helpers import FakeSteem
+
+
+class WalletApi(object):
+    url = "fake://actionbatch"
+
+    def find_all(self, contract_name, table_name, query={}, **kwargs):
+        return [{"account": "test", "symbol": "ENG", "balance": "10", "stake": "5", "pendingUnstake": "0"}]
+
+    def find_one(self, contract_name, table_name, query={}):
+        return [{"symbol": "ENG", "precision": 8, "stakingEnabled": True, "issuer": "test",
+                 "supply": "100", "maxSupply": "1000"}]
+
+
+class Testcases(unittest.TestCase):
+    def test_chunks(self):
+        steem = FakeSteem()
+        with ActionBatch("test", steem_instance=steem, max_size=1000) as batch:
+            for i in range(40):
+                index = batch.add_action("tokens", "transfer", {"symbol": "ENG", "to": "test%d" % i,
+                                                                "quantity": "1", "memo": ""})
+                self.assertEqual(index, i)
+            chunks = batch.get_chunks()
+            self.assertEqual(sum(len(chunk) for chunk in chunks), 40)
+            for chunk in chunks:
+                self.assertTrue(get_json_size(chunk) <= 1000)
+            self.assertTrue(get_json_size(chunks[0] + chunks[1][:1]) > 1000)
+        self.assertEqual(len(steem.broadcasts), len(chunks))
+        self.assertEqual(len(batch.results), 40)
+        self.assertEqual(batch.results[-1], {"trx_num": len(chunks)})
+        self.assertEqual(len(batch), 0)
+
+    def test_single_action_and_errors(self):
+        steem = FakeSteem(fail_at=0)
+        batch = ActionBatch("test", steem_instance=steem, max_size=200)
+        with self.assertRaises(CustomJsonTooLarge):
+            batch.add_action("tokens", "transfer", {"memo": "x" * 200})
+        batch.add_action("market", "cancel", {"type": "buy", "id": 1})
+        results = batch.flush()
+        self.assertTrue(isinstance(results[0], Exception))
+        batch.add_action("market", "cancel", {"type": "buy", "id": 1})
+        batch.flush()
+        self.assertEqual(steem.broadcasts[1]["contractAction"], "cancel")
+
+    def test_wallet_batch_account(self):
+        steem = FakeSteem()
+        with mock.patch("steemengine.wallet.Account", return_value={"name": "test"}):
+            wallet = Wallet("test", api=WalletApi(), steem_instance=steem)
+            other_batch = ActionBatch("other", steem_instance=steem)
+            with self.assertRaises(ValueError):
+                wallet.transfer("test1", 1, "ENG", batch=other_batch)
+            with self.assertRaises(ValueError):
+                wallet.stake(1, "ENG", batch=other_batch)
+            with self.assertRaises(ValueError):
+                wallet.unstake(1, "ENG", batch=other_batch)
+            with self.assertRaises(ValueError):
+                wallet.cancel_unstake("trx_id", batch=other_batch)
+            with self.assertRaises(ValueError):
+                wallet.issue("test1", 1, "ENG", batch=other_batch)
+            self.assertEqual(len(other_batch), 0)
+            batch = wallet.batch()
+            self.assertEqual(wallet.transfer("test1", 1, "ENG", batch=batch), 0)
+            self.assertEqual(wallet.stake(1, "ENG", batch=batch), 1)
+        self.assertEqual(len(steem.broadcasts), 0)
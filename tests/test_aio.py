@@ -0,0 +1,9 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import sys
+
+# The test cases use async/await, which is a syntax error before python 3.5
+if sys.version_info >= (3, 5):
+    from tests.aio_cases import Testcases  # noqa: F401
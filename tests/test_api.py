@@ -31,4 +31,14 @@ class Testcases(unittest.TestCase):
         
         result = api.get_history("holger80", "NINJA")
         self.assertTrue(len(result) > 0)
-     
\ No newline at end of file
+
+    def test_get_blocks(self):
+        api = Api()
+        blocks = list(api.get_blocks(1910, 1930, workers=2, batch_size=5))
+        self.assertEqual([b["blockNumber"] for b in blocks], list(range(1910, 1930)))
+
+    def test_find_all(self):
+        api = Api()
+        tokens = list(api.find_all("tokens", "tokens", page_size=100, prefetch=True))
+        self.assertTrue(len(tokens) > 100)
+        self.assertEqual(len(set([t["symbol"] for t in tokens])), len(tokens))
@@ -0,0 +1,52 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from steemengine.blockchain import Blockchain
+
+
+class HeadApi(object):
+    """The head block advances by one block with each poll"""
+    def __init__(self, head_block_num):
+        self.head_block_num = head_block_num
+        self.get_blocks_calls = []
+        self.get_block_info_calls = []
+
+    def get_latest_block_info(self):
+        self.head_block_num += 1
+        return {"blockNumber": self.head_block_num}
+
+    def get_block_info(self, block_num):
+        self.get_block_info_calls.append(block_num)
+        if block_num > self.head_block_num:
+            return None
+        return {"blockNumber": block_num, "transactions": []}
+
+    def get_blocks(self, start, stop, workers=4, batch_size=50):
+        self.get_blocks_calls.append((start, stop))
+        for block_num in range(start, min(stop, self.head_block_num + 1)):
+            yield {"blockNumber": block_num, "transactions": []}
+
+
+class Testcases(unittest.TestCase):
+    def test_blocks(self):
+        b = Blockchain()
+        block_nums = [block["blockNumber"] for block in b.blocks(start=1910, stop=1915)]
+        self.assertEqual(block_nums, list(range(1910, 1916)))
+
+    def test_stream(self):
+        b = Blockchain()
+        for trx in b.stream(start=1910, stop=1950, only_contracts=["tokens"]):
+            self.assertEqual(trx["contract"], "tokens")
+            self.assertTrue(isinstance(trx.payload, dict))
+            self.assertTrue(trx["blockNumber"] >= 1910)
+
+    def test_follow_head(self):
+        api = HeadApi(100)
+        b = Blockchain(api=api, min_interval=0, max_interval=0)
+        block_nums = [block["blockNumber"] for block in b.blocks(start=1, stop=110)]
+        self.assertEqual(block_nums, list(range(1, 111)))
+        # only the catch up range is fetched by the worker pool
+        self.assertEqual(api.get_blocks_calls, [(1, 102)])
+        self.assertEqual(api.get_block_info_calls, list(range(102, 111)))
@@ -0,0 +1,137 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import range
+import decimal
+import os
+import shutil
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+from beem.exceptions import AccountDoesNotExistsException
+from steemengine.exceptions import InsufficientTokenAmount, InvalidTokenAmount
+from steemengine.wallet import Wallet
+from tests.helpers import FakeSteem
+
+
+class WalletApi(object):
+    url = "fake://bulk_transfer"
+
+    def __init__(self, balance):
+        self.balance = balance
+
+    def find_all(self, contract_name, table_name, query={}, **kwargs):
+        return [{"account": "holger80", "symbol": "ENG", "balance": self.balance, "stake": "0"}]
+
+    def find_one(self, contract_name, table_name, query={}):
+        return [{"symbol": "ENG", "precision": 3}]
+
+
+def get_accounts(names, **kwargs):
+    return [{"name": name} for name in names if not name.startswith("missing")]
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.journal = os.path.join(self.tmp_dir, "airdrop.json")
+        patcher = mock.patch("steemengine.wallet.Accounts", side_effect=get_accounts)
+        self.accounts = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def get_wallet(self, steem, balance="1000"):
+        with mock.patch("steemengine.wallet.Account", return_value={"name": "holger80"}):
+            return Wallet("holger80", api=WalletApi(balance), steem_instance=steem)
+
+    def get_transfers(self, steem):
+        transfers = []
+        for json_data in steem.broadcasts:
+            if json_data is None:
+                continue
+            if not isinstance(json_data, list):
+                json_data = [json_data]
+            transfers.extend(action["contractPayload"] for action in json_data)
+        return transfers
+
+    def test_quantize(self):
+        steem = FakeSteem()
+        wallet = self.get_wallet(steem)
+        results = wallet.bulk_transfer([("test1", "1.23456"), ("test2", 2, "thanks")], "eng", memo="airdrop")
+        transfers = self.get_transfers(steem)
+        self.assertEqual(len(steem.broadcasts), 1)
+        self.assertEqual(transfers[0], {"symbol": "ENG", "to": "test1", "quantity": "1.234", "memo": "airdrop"})
+        self.assertEqual(transfers[1]["memo"], "thanks")
+        self.assertEqual(results, [{"trx_num": 1}, {"trx_num": 1}])
+        with self.assertRaises(InvalidTokenAmount):
+            wallet.bulk_transfer([("test1", 1), ("test2", "0.0001")], "ENG")
+        self.assertEqual(len(steem.broadcasts), 1)
+
+    def test_balance_check(self):
+        steem = FakeSteem()
+        wallet = self.get_wallet(steem, balance="10")
+        with self.assertRaises(InsufficientTokenAmount):
+            wallet.bulk_transfer([("test%d" % i, 1) for i in range(11)], "ENG")
+        self.assertEqual(len(steem.broadcasts), 0)
+        wallet.bulk_transfer([("test%d" % i, 1) for i in range(10)], "ENG")
+        self.assertEqual(len(self.get_transfers(steem)), 10)
+
+    def test_missing_account(self):
+        steem = FakeSteem()
+        wallet = self.get_wallet(steem)
+        with self.assertRaises(AccountDoesNotExistsException) as cm:
+            wallet.bulk_transfer([("test1", 1), ("missing1", 1), ("missing2", 1)], "ENG")
+        self.assertEqual(str(cm.exception), "missing1, missing2")
+        self.assertEqual(len(steem.broadcasts), 0)
+
+    def test_journal(self):
+        recipients = [("test%d" % i, 1, "memo %d" % i) for i in range(300)]
+        # the second broadcast fails
+        steem = FakeSteem(fail_at=1)
+        wallet = self.get_wallet(steem)
+        results = wallet.bulk_transfer(recipients, "ENG", journal=self.journal)
+        self.assertTrue(len(steem.broadcasts) > 2)
+        failed = [i for i, result in enumerate(results) if isinstance(result, Exception)]
+        self.assertTrue(len(failed) > 0)
+        # each result is the transaction which contains the transfer of the recipient
+        trx_nums = {}
+        for trx_num, json_data in enumerate(steem.broadcasts, 1):
+            for action in json_data or []:
+                trx_nums[action["contractPayload"]["to"]] = trx_num
+        for i, (to, amount, memo) in enumerate(recipients):
+            if i in failed:
+                self.assertTrue(to not in trx_nums)
+            else:
+                self.assertEqual(results[i], {"trx_num": trx_nums[to]})
+        sent = dict((t["to"], t) for t in self.get_transfers(steem))
+        for i, (to, amount, memo) in enumerate(recipients):
+            if to in sent:
+                self.assertEqual(sent[to]["memo"], memo)
+
+        # the rerun only sends the failed transfers
+        steem = FakeSteem()
+        wallet = self.get_wallet(steem)
+        results = wallet.bulk_transfer(recipients, "ENG", journal=self.journal)
+        self.assertEqual(sorted(t["to"] for t in self.get_transfers(steem)),
+                         sorted("test%d" % i for i in failed))
+        for i, result in enumerate(results):
+            if i in failed:
+                self.assertEqual(result, {"trx_num": 1})
+            else:
+                self.assertTrue(result is None)
+        self.assertEqual(sorted(self.accounts.call_args[0][0]), sorted("test%d" % i for i in failed))
+
+        # all transfers are in the journal
+        steem = FakeSteem()
+        wallet = self.get_wallet(steem, balance="0")
+        self.assertEqual(wallet.bulk_transfer(recipients, "ENG", journal=self.journal), [None] * 300)
+        self.assertEqual(len(steem.broadcasts), 0)
+        # other amounts are another bulk transfer
+        with self.assertRaises(InsufficientTokenAmount):
+            wallet.bulk_transfer([(to, 2, memo) for to, amount, memo in recipients], "ENG", journal=self.journal)
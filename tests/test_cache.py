@@ -0,0 +1,39 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import time
+import unittest
+from steemengine.cache import ObjectCache
+
+
+class Testcases(unittest.TestCase):
+    def test_cache(self):
+        cache = ObjectCache(default_expiration=60, max_size=2)
+        cache["ENG"] = {"precision": 8}
+        cache["BTC"] = {"precision": 8}
+        self.assertEqual(cache["ENG"]["precision"], 8)
+        cache["STEEMP"] = {"precision": 3}
+        self.assertEqual(len(cache), 2)
+        self.assertTrue("ENG" in cache)
+        self.assertFalse("BTC" in cache)
+        self.assertTrue(cache.get("BTC") is None)
+
+    def test_expiration(self):
+        cache = ObjectCache(default_expiration=0.05)
+        cache["ENG"] = 1
+        self.assertEqual(cache["ENG"], 1)
+        time.sleep(0.1)
+        self.assertFalse("ENG" in cache)
+        with self.assertRaises(KeyError):
+            cache["ENG"]
+
+    def test_invalidate(self):
+        cache = ObjectCache()
+        cache[("url", "ENG")] = 1
+        cache[("url", "BTC")] = 2
+        cache.invalidate(lambda key: key[1] == "ENG")
+        self.assertFalse(("url", "ENG") in cache)
+        self.assertTrue(("url", "BTC") in cache)
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
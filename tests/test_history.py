@@ -0,0 +1,71 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import shutil
+import tempfile
+import unittest
+from steemengine.checkpoint import FileCheckpointStore, SQLiteCheckpointStore
+from steemengine.history import AccountHistory
+
+
+class HistoryApi(object):
+    """Returns the history newest first, as the history api does"""
+    def __init__(self, ops):
+        self.ops = ops
+        self.calls = 0
+
+    def get_history(self, account, symbol, limit=1000, offset=0, histtype="user"):
+        self.calls += 1
+        return list(reversed(self.ops))[offset:offset + limit]
+
+
+def make_op(i, block):
+    return {"_id": "id%d" % i, "block": block, "from": "a", "to": "b", "quantity": str(i)}
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_checkpoint_stores(self):
+        file_store = FileCheckpointStore(os.path.join(self.tmp_dir, "checkpoints.json"))
+        sqlite_store = SQLiteCheckpointStore(os.path.join(self.tmp_dir, "checkpoints.db"))
+        for store in [file_store, sqlite_store]:
+            self.assertTrue(store.get("holger80:ENG") is None)
+            store.set("holger80:ENG", {"block": 5, "ids": ["a"]})
+            self.assertEqual(store.get("holger80:ENG"), {"block": 5, "ids": ["a"]})
+            store.delete("holger80:ENG")
+            self.assertEqual(store.get("holger80:ENG", 0), 0)
+        sqlite_store.close()
+        file_store.set("holger80:ENG", {"block": 6, "ids": []})
+        file_store = FileCheckpointStore(os.path.join(self.tmp_dir, "checkpoints.json"))
+        self.assertEqual(file_store.get("holger80:ENG")["block"], 6)
+
+    def test_account_history(self):
+        path = os.path.join(self.tmp_dir, "history.json")
+        api = HistoryApi([make_op(i, i // 2) for i in range(25)])
+        history = AccountHistory("holger80", "ENG", api=api, checkpoint_store=path, page_size=10)
+        ops = list(history)
+        self.assertEqual(len(ops), 25)
+        self.assertEqual(ops[0]["_id"], "id0")
+        self.assertEqual(api.calls, 3)
+        self.assertEqual(len(list(history)), 0)
+
+        api.ops += [make_op(25, 12), make_op(26, 13)]
+        history = AccountHistory("holger80", "ENG", api=api, checkpoint_store=path, page_size=10)
+        api.calls = 0
+        self.assertEqual([op["_id"] for op in history], ["id25", "id26"])
+        self.assertEqual(api.calls, 1)
+
+    def test_interrupted_iteration(self):
+        api = HistoryApi([make_op(i, i) for i in range(5)])
+        history = AccountHistory("holger80", "ENG", api=api)
+        for op in history:
+            if op["_id"] == "id2":
+                break
+        self.assertEqual([op["_id"] for op in history], ["id2", "id3", "id4"])
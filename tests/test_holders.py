@@ -0,0 +1,57 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from steemengine.holders import HolderStats, NUMPY_AVAILABLE
+
+
+class BalancesApi(object):
+    def __init__(self, balances):
+        self.balances = balances
+
+    def find_all(self, contract_name, table_name, query={}, page_size=1000, offset=0, indexes=[], prefetch=False):
+        for balance in self.balances:
+            yield balance
+
+
+@unittest.skipIf(not NUMPY_AVAILABLE, "numpy is not installed")
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        balances = [{"account": "a%d" % i, "symbol": "ENG", "balance": str(i), "stake": "1"} for i in range(100)]
+        balances.append({"account": "whale", "symbol": "ENG", "balance": "10000", "stake": "0",
+                         "pendingUnstake": "50"})
+        self.stats = HolderStats("eng", api=BalancesApi(balances), last_price=0.5)
+
+    def test_top(self):
+        stats = self.stats
+        self.assertEqual(len(stats), 101)
+        top = stats.top(3)
+        self.assertEqual([h["account"] for h in top], ["whale", "a99", "a98"])
+        self.assertEqual(top[0]["total"], 10050)
+        self.assertEqual(top[0]["value"], 5025)
+        self.assertEqual(len(stats.top(None)), 101)
+        self.assertEqual(stats.top(1, field="stake")[0]["account"], "a0")
+
+    def test_stats(self):
+        stats = self.stats
+        info = stats.get_stats()
+        self.assertEqual(info["holders"], 101)
+        self.assertEqual(info["total"], 10000 + 4950 + 100 + 50)
+        self.assertAlmostEqual(stats.concentration(1), 10050. / info["total"])
+        self.assertTrue(0.5 < stats.gini() < 1)
+        self.assertAlmostEqual(stats.gini("stake"), 1. / 101)
+        with self.assertRaises(ValueError):
+            stats.get_amounts("quantity")
+
+    def test_amount_strings(self):
+        balances = [{"account": "a", "symbol": "ENG", "balance": "12345678901.12345679", "stake": "0.00000001"},
+                    {"account": "b", "symbol": "ENG", "balance": "12345678901.12345678", "stake": "1.00000000",
+                     "pendingUnstake": "0.5"}]
+        stats = HolderStats("eng", api=BalancesApi(balances), last_price=1)
+        self.assertNotEqual("%.8f" % stats.balance[0], "12345678901.12345679")
+        index = stats.top_indices(1, field="balance")[0]
+        self.assertEqual(stats.get_holder_strings(index), {"account": "a", "balance": "12345678901.12345679",
+                                                           "stake": "0.00000001", "pendingUnstake": "0"})
+        self.assertEqual(str(stats.get_sum("balance")), "24691357802.24691357")
+        self.assertEqual(str(stats.get_sum()), "24691357803.74691358")
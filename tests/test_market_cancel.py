@@ -0,0 +1,59 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import range
+import unittest
+from steemengine.market import Market
+from steemengine.mirror import match_query
+from tests.helpers import FakeSteem
+
+
+class FakeApi(object):
+    url = "fake://market_cancel"
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.queries = []
+
+    def find_all(self, contract_name, table_name, query={}, page_size=1000, offset=0, indexes=[], prefetch=False):
+        self.queries.append((contract_name, table_name, query))
+        return [row for row in self.tables.get(table_name, []) if match_query(row, query)]
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        buy_book = [{"_id": i, "account": "test", "symbol": "ENG" if i % 2 else "BTC",
+                     "quantity": "1", "price": "0.1"} for i in range(300)]
+        buy_book.append({"_id": 300, "account": "other", "symbol": "ENG", "quantity": "1", "price": "0.1"})
+        sell_book = [{"_id": 1000, "account": "test", "symbol": "ENG", "quantity": "2", "price": "1"}]
+        self.api = FakeApi({"buyBook": buy_book, "sellBook": sell_book, "tokens": [], "metrics": []})
+        self.steem = FakeSteem()
+        self.market = Market(api=self.api, steem_instance=self.steem)
+
+    def test_get_open_orders(self):
+        orders = self.market.get_open_orders("test")
+        self.assertEqual(len(orders), 301)
+        self.assertEqual(orders[-1]["type"], "sell")
+        orders = self.market.get_open_orders("test", "buy", symbols=["eng"])
+        self.assertEqual(len(orders), 150)
+        self.assertEqual(self.api.queries[-1], ("market", "buyBook", {"account": "test", "symbol": {"$in": ["ENG"]}}))
+        with self.assertRaises(ValueError):
+            self.market.get_open_orders("test", "swap")
+
+    def test_cancel_all(self):
+        self.api.queries = []
+        results = self.market.cancel_all("test")
+        self.assertEqual(len(self.api.queries), 2)
+        self.assertEqual(len(results), 301)
+        self.assertTrue(len(self.steem.broadcasts) < 10)
+        actions = []
+        for json_data in self.steem.broadcasts:
+            actions.extend(json_data if isinstance(json_data, list) else [json_data])
+        payloads = [action["contractPayload"] for action in actions]
+        self.assertEqual(payloads[0], {"type": "buy", "id": 0})
+        self.assertEqual(payloads[-1], {"type": "sell", "id": 1000})
+        self.assertEqual(len(payloads), 301)
+        order, tx = results[-1]
+        self.assertEqual(order["_id"], 1000)
+        self.assertEqual(tx, {"trx_num": len(self.steem.broadcasts)})
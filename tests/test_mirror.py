@@ -0,0 +1,170 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import os
+import shutil
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+from steemengine.exceptions import TokenDoesNotExists
+from steemengine.mirror import Mirror, MirrorApi, match_query, sort_objects
+from steemengine.tokenobject import Token
+from steemengine.wallet import Wallet
+
+
+class TableApi(object):
+    """Serves the tables from a dict"""
+    url = "http://mirror.test/"
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.requests = []
+
+    def get_latest_block_info(self):
+        return {"blockNumber": 10}
+
+    def find(self, contract_name, table_name, query={}, limit=1000, offset=0, indexes=[]):
+        return list(self.find_all(contract_name, table_name, query=query, offset=offset))[:limit]
+
+    def find_all(self, contract_name, table_name, query={}, page_size=1000, offset=0, indexes=[], prefetch=False):
+        self.requests.append((contract_name, table_name, query))
+        objs = sort_objects(list(self.tables.get((contract_name, table_name), [])), indexes)
+        for obj in objs[offset:]:
+            if match_query(obj, query):
+                yield obj
+
+
+class BlockSource(object):
+    def __init__(self, blocks):
+        self.blocks_list = blocks
+
+    def blocks(self, start=None, stop=None):
+        for block in self.blocks_list:
+            if block["blockNumber"] >= start:
+                yield block
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.api = TableApi({
+            ("tokens", "balances"): [
+                {"_id": 1, "account": "holger80", "symbol": "ENG", "balance": "10"},
+                {"_id": 2, "account": "beembot", "symbol": "ENG", "balance": "5"},
+                {"_id": 3, "account": "holger80", "symbol": "BTC", "balance": "1"}],
+            ("tokens", "tokens"): [
+                {"_id": 1, "symbol": "ENG", "precision": 8, "stakingEnabled": True}],
+            ("market", "metrics"): [
+                {"_id": 1, "symbol": "ENG", "lastPrice": "0.9", "highestBid": "0.8"}],
+            ("market", "buyBook"): [
+                {"_id": 1, "account": "holger80", "symbol": "ENG", "price": "0.9", "quantity": "1"},
+                {"_id": 2, "account": "beembot", "symbol": "ENG", "price": "1.1", "quantity": "1"}],
+            ("market", "tradesHistory"): [
+                {"_id": 1, "symbol": "ENG", "type": "buy", "price": "1.0", "quantity": "1"},
+                {"_id": 2, "symbol": "BTC", "type": "buy", "price": "2.0", "quantity": "1"}]})
+        self.mirror = Mirror(os.path.join(self.tmp_dir, "mirror.db"), api=self.api,
+                             tables=[("tokens", "balances"), ("tokens", "tokens"), ("market", "metrics"),
+                                     ("market", "buyBook"), ("market", "tradesHistory")])
+        self.mirror.load()
+
+    def tearDown(self):
+        self.mirror.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_find(self):
+        mirror = self.mirror
+        self.assertEqual(mirror.block_num, 10)
+        self.assertEqual(len(mirror.find("tokens", "balances", query={"account": "holger80"})), 2)
+        self.assertEqual(len(mirror.find("tokens", "balances", query={"symbol": {"$in": ["BTC", "ENG"]}}, limit=2)), 2)
+        self.assertEqual(mirror.find("tokens", "balances", query={"balance": {"$gt": "4"}}, offset=1)[0]["_id"], 2)
+        book = mirror.find("market", "buyBook", query={"symbol": "ENG"},
+                           indexes=[{"index": "price", "descending": True}])
+        self.assertEqual(book[0]["account"], "beembot")
+        self.assertTrue(mirror.find_one("market", "buyBook", query={"account": "test"}) is None)
+
+        mirror = Mirror(os.path.join(self.tmp_dir, "mirror.db"), api=self.api)
+        self.assertTrue(mirror.is_loaded("tokens", "balances"))
+        self.assertFalse(mirror.is_loaded("market", "sellBook"))
+        self.assertEqual(mirror.block_num, 10)
+        mirror.close()
+
+    def test_mirror_api(self):
+        api = MirrorApi(self.mirror)
+        self.assertEqual(api.url, self.api.url)
+        self.api.requests = []
+        balances = list(api.find_all("tokens", "balances", query={"account": "holger80"}))
+        self.assertEqual(sorted(b["symbol"] for b in balances), ["BTC", "ENG"])
+        self.assertEqual(len(self.api.requests), 0)
+        api.find("market", "sellBook", query={"symbol": "ENG"})
+        self.assertEqual(self.api.requests, [("market", "sellBook", {"symbol": "ENG"})])
+        self.assertEqual(api.find_one("tokens", "balances", query={"account": "beembot"})[0]["balance"], "5")
+        self.assertEqual(api.find_one("tokens", "balances", query={"account": "test"}), [None])
+
+    def test_mirror_api_token(self):
+        api = MirrorApi(self.mirror)
+        self.api.requests = []
+        token = Token("eng", api=api, use_cache=False)
+        self.assertEqual(token["precision"], 8)
+        self.assertEqual(token.get_market_info()["lastPrice"], "0.9")
+        with self.assertRaises(TokenDoesNotExists):
+            Token("NOTOKEN", api=api, use_cache=False)
+        self.assertEqual(len(self.api.requests), 0)
+
+    def test_mirror_api_wallet(self):
+        api = MirrorApi(self.mirror)
+        self.api.requests = []
+        with mock.patch("steemengine.wallet.Account", return_value={"name": "holger80"}):
+            wallet = Wallet("holger80", api=api, steem_instance=object())
+        self.assertEqual(sorted(balance["symbol"] for balance in wallet), ["BTC", "ENG"])
+        self.assertEqual(wallet.get_token("ENG")["balance"], "10")
+        self.assertEqual(len(self.api.requests), 0)
+
+    def test_stream(self):
+        self.api.tables[("tokens", "balances")][0]["balance"] = "8"
+        self.api.tables[("tokens", "balances")][1]["balance"] = "7"
+        transfer = {"contract": "tokens", "action": "transfer", "sender": "holger80",
+                    "payload": json.dumps({"symbol": "ENG", "to": "beembot", "quantity": "2"}),
+                    "logs": json.dumps({})}
+        failed = {"contract": "tokens", "action": "transfer", "sender": "beembot",
+                  "payload": json.dumps({"symbol": "BTC", "to": "holger80", "quantity": "2"}),
+                  "logs": json.dumps({"errors": ["overdrawn balance"]})}
+        blocks = [{"blockNumber": 11, "timestamp": "2019-01-01T00:00:00", "transactions": [transfer, failed]}]
+        self.api.requests = []
+        trxs = list(self.mirror.stream(blockchain=BlockSource(blocks), stop=11))
+        self.assertEqual(len(trxs), 1)
+        self.assertEqual(len(self.api.requests), 2)
+        self.assertEqual(self.mirror.block_num, 11)
+        balance = self.mirror.find_one("tokens", "balances", query={"account": "beembot", "symbol": "ENG"})
+        self.assertEqual(balance["balance"], "7")
+        self.assertEqual(len(self.mirror.find("tokens", "balances", query={})), 3)
+
+    def test_stream_market(self):
+        # beembot sells 1 ENG into the bid of holger80 at 0.9
+        events = [{"contract": "tokens", "event": "transferFromContract",
+                   "data": {"from": "market", "to": "holger80", "symbol": "ENG", "quantity": "1"}},
+                  {"contract": "tokens", "event": "transferFromContract",
+                   "data": {"from": "market", "to": "beembot", "symbol": "STEEMP", "quantity": "0.9"}}]
+        sell = {"contract": "market", "action": "sell", "sender": "beembot",
+                "payload": json.dumps({"symbol": "ENG", "quantity": "1", "price": "0.9"}),
+                "logs": json.dumps({"events": events})}
+        self.api.tables[("market", "buyBook")].pop(0)
+        self.api.tables[("market", "tradesHistory")].append({"_id": 3, "symbol": "ENG", "type": "sell",
+                                                              "price": "0.9", "quantity": "1"})
+        self.api.tables[("market", "buyBook")].append({"_id": 3, "account": "other", "symbol": "ENG",
+                                                       "price": "0.5", "quantity": "1"})
+        blocks = [{"blockNumber": 11, "timestamp": "2019-01-01T00:00:00", "transactions": [sell, sell]}]
+        self.api.requests = []
+        trxs = list(self.mirror.stream(blockchain=BlockSource(blocks), stop=11))
+        self.assertEqual(len(trxs), 2)
+        book_queries = [query for contract, table, query in self.api.requests if table == "buyBook"]
+        self.assertEqual(book_queries, [{"symbol": "ENG", "account": {"$in": ["beembot", "holger80"]}}])
+        book = self.mirror.find("market", "buyBook", query={"symbol": "ENG"})
+        self.assertEqual([order["_id"] for order in book], [2])
+        trades = self.mirror.find("market", "tradesHistory", query={"symbol": "ENG"})
+        self.assertEqual([trade["_id"] for trade in trades], [1, 3])
+        self.assertEqual(len(self.mirror.find("market", "tradesHistory", query={})), 3)
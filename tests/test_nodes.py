@@ -0,0 +1,42 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from steemengine.node import Nodes
+from steemengine.rpc import RPC
+from tests.helpers import Handler, LocalServer
+
+
+class RPCHandler(Handler):
+    def do_POST(self):
+        self.reply([{"jsonrpc": "2.0", "id": q["id"], "result": {"blockNumber": 1}} for q in self.read_json()])
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalServer(RPCHandler).start()
+        self.url = self.server.url
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_nodes(self):
+        nodes = Nodes(["http://a/", "http://b/", "http://c/"])
+        nodes.record_success(nodes[0], 0.5)
+        nodes.record_success(nodes[1], 0.1)
+        self.assertEqual(nodes.url, "http://c/")
+        nodes.record_success(nodes[2], 0.3)
+        self.assertEqual(nodes.url, "http://b/")
+        nodes.record_error(nodes[1])
+        self.assertEqual(nodes.url, "http://c/")
+        nodes.record_error(nodes[0])
+        nodes.record_error(nodes[2])
+        self.assertEqual(nodes.url, "http://b/")
+
+    def test_failover(self):
+        rpc = RPC(url=["http://127.0.0.1:1/", self.url], backoff_factor=0.01)
+        self.assertEqual(rpc.getLatestBlockInfo(endpoint="blockchain"), [{"blockNumber": 1}])
+        self.assertEqual(rpc.nodes[0].error_cnt, 1)
+        self.assertEqual(rpc.url, self.url)
+        self.assertTrue(rpc.nodes[1].latency is not None)
@@ -0,0 +1,132 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import decimal
+import json
+import unittest
+from steemengine.exceptions import SnapshotNotConsistent
+from steemengine.orderbook import OrderBook
+
+
+class BookApi(object):
+    url = "https://api.steem-engine.com/"
+
+    def get_latest_block_info(self):
+        return {"blockNumber": 100}
+
+    def find_all(self, contract_name, table_name, query={}, **kwargs):
+        if table_name == "buyBook":
+            return [{"_id": 1, "txId": "b1", "account": "a", "symbol": "ENG", "quantity": "10", "price": "0.9", "timestamp": 1},
+                    {"_id": 2, "txId": "b2", "account": "b", "symbol": "ENG", "quantity": "5", "price": "0.95", "timestamp": 2},
+                    {"_id": 3, "txId": "b3", "account": "c", "symbol": "ENG", "quantity": "1", "price": "0.9", "timestamp": 3}]
+        return [{"_id": 4, "txId": "s1", "account": "d", "symbol": "ENG", "quantity": "2", "price": "1.1", "timestamp": 1},
+                {"_id": 5, "txId": "s2", "account": "e", "symbol": "ENG", "quantity": "3", "price": "1.0", "timestamp": 2}]
+
+
+class MovingHeadApi(BookApi):
+    """The taker t9 (buy 2 @ 1.0) is in block 101, which is produced while the
+        first snapshot is fetched. Both snapshots already show s2 with 1 left.
+    """
+    def __init__(self, heads):
+        self.heads = list(heads)
+        self.fetches = 0
+
+    def get_latest_block_info(self):
+        return {"blockNumber": self.heads.pop(0)}
+
+    def find_all(self, contract_name, table_name, query={}, **kwargs):
+        self.fetches += 1
+        orders = BookApi.find_all(self, contract_name, table_name, query=query, **kwargs)
+        if table_name == "sellBook":
+            orders[1]["quantity"] = "1"
+        return orders
+
+
+class BlockSource(object):
+    def __init__(self, transactions):
+        self.transactions = transactions
+
+    def stream(self, start=None, stop=None, **kwargs):
+        for trx in self.transactions:
+            if start <= trx["blockNumber"] <= stop:
+                yield trx
+
+
+def market_trx(action, sender, payload, trx_id="t1"):
+    return {"contract": "market", "action": action, "sender": sender, "transactionId": trx_id,
+            "payload": json.dumps(payload), "logs": "{}"}
+
+
+class Testcases(unittest.TestCase):
+    def test_snapshot(self):
+        book = OrderBook("eng", api=BookApi())
+        self.assertEqual(book.best_bid(), (decimal.Decimal("0.95"), decimal.Decimal("5")))
+        self.assertEqual(book.best_ask(), (decimal.Decimal("1.0"), decimal.Decimal("3")))
+        self.assertEqual(book.spread(), decimal.Decimal("0.05"))
+        self.assertEqual(book.get_bids(), [(decimal.Decimal("0.95"), decimal.Decimal("5")),
+                                           (decimal.Decimal("0.9"), decimal.Decimal("11"))])
+        self.assertEqual([o["txId"] for o in book.get_orders("buy")], ["b2", "b1", "b3"])
+
+    def test_buy_matches_asks(self):
+        book = OrderBook("ENG", api=BookApi())
+        self.assertTrue(book.apply_transaction(market_trx("buy", "f", {"symbol": "ENG", "quantity": "4", "price": "1.1"})))
+        self.assertEqual(book.get_asks(), [(decimal.Decimal("1.1"), decimal.Decimal("1"))])
+        self.assertEqual(book.best_bid()[0], decimal.Decimal("0.95"))
+
+    def test_sell_adds_order(self):
+        book = OrderBook("ENG", api=BookApi())
+        book.apply_transaction(market_trx("sell", "f", {"symbol": "ENG", "quantity": "8", "price": "0.9"}, "t2"))
+        self.assertEqual(book.get_bids(), [(decimal.Decimal("0.9"), decimal.Decimal("8"))])
+        self.assertEqual(book.best_ask(), (decimal.Decimal("1.0"), decimal.Decimal("3")))
+        book.apply_transaction(market_trx("sell", "f", {"symbol": "ENG", "quantity": "10", "price": "0.8"}, "t3"))
+        self.assertTrue(book.best_bid() is None)
+        self.assertEqual(book.best_ask(), (decimal.Decimal("0.8"), decimal.Decimal("2")))
+
+    def test_cancel(self):
+        book = OrderBook("ENG", api=BookApi())
+        self.assertFalse(book.apply_transaction(market_trx("cancel", "a", {"type": "buy", "id": "b2"})))
+        self.assertTrue(book.apply_transaction(market_trx("cancel", "b", {"type": "buy", "id": "b2"})))
+        self.assertTrue(book.apply_transaction(market_trx("cancel", "d", {"type": "sell", "id": 4})))
+        self.assertEqual(book.best_bid(), (decimal.Decimal("0.9"), decimal.Decimal("11")))
+        self.assertEqual(book.get_asks(), [(decimal.Decimal("1.0"), decimal.Decimal("3"))])
+
+    def test_snapshot_overlap(self):
+        book = OrderBook("ENG", api=BookApi())
+        # b1 was placed while the snapshot was fetched and is streamed again
+        self.assertFalse(book.apply_transaction(market_trx("buy", "a", {"symbol": "ENG", "quantity": "10",
+                                                                          "price": "0.9"}, "b1")))
+        self.assertEqual(book.get_bids(), [(decimal.Decimal("0.95"), decimal.Decimal("5")),
+                                           (decimal.Decimal("0.9"), decimal.Decimal("11"))])
+        self.assertFalse(book.apply_transaction(market_trx("sell", "e", {"symbol": "ENG", "quantity": "3",
+                                                                           "price": "1.0"}, "s2")))
+        self.assertEqual(book.best_bid(), (decimal.Decimal("0.95"), decimal.Decimal("5")))
+        self.assertEqual(book.best_ask(), (decimal.Decimal("1.0"), decimal.Decimal("3")))
+
+    def test_add_replaces_order(self):
+        book = OrderBook("ENG", api=BookApi())
+        book._add_order("buy", book.bids, {"txId": "b1", "account": "a", "quantity": "4", "price": "0.9"})
+        self.assertEqual(book.get_bids()[1], (decimal.Decimal("0.9"), decimal.Decimal("5")))
+        self.assertEqual(len(book.get_orders("buy", "0.9")), 2)
+        book._add_order("buy", book.bids, {"txId": "b1", "account": "a", "quantity": "4", "price": "0.8"})
+        self.assertEqual(book.get_bids()[1:], [(decimal.Decimal("0.9"), decimal.Decimal("1")),
+                                               (decimal.Decimal("0.8"), decimal.Decimal("4"))])
+
+    def test_snapshot_head_changed(self):
+        api = MovingHeadApi([100, 101, 101])
+        book = OrderBook("ENG", api=api)
+        self.assertEqual(api.fetches, 4)
+        self.assertEqual(book.block_num, 101)
+        taker = market_trx("buy", "f", {"symbol": "ENG", "quantity": "2", "price": "1.0"}, "t9")
+        taker["blockNumber"] = 101
+        later = market_trx("sell", "g", {"symbol": "ENG", "quantity": "1", "price": "1.2"}, "t10")
+        later["blockNumber"] = 102
+        applied = list(book.stream(blockchain=BlockSource([taker, later]), stop=102))
+        self.assertEqual([trx["transactionId"] for trx in applied], ["t10"])
+        self.assertEqual(book.best_ask(), (decimal.Decimal("1.0"), decimal.Decimal("1")))
+        self.assertEqual(book.best_bid(), (decimal.Decimal("0.95"), decimal.Decimal("5")))
+        self.assertEqual(book.block_num, 102)
+
+    def test_snapshot_not_consistent(self):
+        with self.assertRaises(SnapshotNotConsistent):
+            OrderBook("ENG", api=MovingHeadApi(range(100, 110)), snapshot_tries=3)
@@ -0,0 +1,40 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from steemengine.portfolio import Portfolio, NUMPY_AVAILABLE
+
+
+class PortfolioApi(object):
+    def __init__(self):
+        self.requests = []
+        self.balances = [
+            {"account": "a", "symbol": "ENG", "balance": "10", "stake": "5"},
+            {"account": "a", "symbol": "STEEMP", "balance": "2"},
+            {"account": "b", "symbol": "BTC", "balance": "1", "pendingUnstake": "1"},
+            {"account": "c", "symbol": "NOMARKET", "balance": "100"}]
+        self.metrics = [{"symbol": "ENG", "highestBid": "0.5", "lastPrice": "0.6"},
+                        {"symbol": "BTC", "highestBid": "0", "lastPrice": "3"}]
+
+    def find_all(self, contract_name, table_name, query={}, page_size=1000, offset=0, indexes=[], prefetch=False):
+        self.requests.append((table_name, query))
+        if table_name == "metrics":
+            return iter(self.metrics)
+        return iter([b for b in self.balances if b["account"] in query["account"]["$in"]])
+
+
+@unittest.skipIf(not NUMPY_AVAILABLE, "numpy is not installed")
+class Testcases(unittest.TestCase):
+    def test_portfolio(self):
+        api = PortfolioApi()
+        portfolio = Portfolio(["a", "b", "c", "d"], api=api, chunk_size=3)
+        results = list(portfolio)
+        self.assertEqual([r["account"] for r in results], ["a", "b", "c", "d"])
+        self.assertAlmostEqual(results[0]["value"], 15 * 0.5 + 2)
+        self.assertAlmostEqual(results[1]["value"], 6)
+        self.assertEqual(results[2]["value"], 0)
+        self.assertEqual(results[3]["balances"], [])
+        self.assertEqual(len(api.requests), 3)
+        self.assertAlmostEqual(portfolio.get_total_value(), 15.5)
+        self.assertEqual(len(api.requests), 5)
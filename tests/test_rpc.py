@@ -5,7 +5,30 @@ from __future__ import unicode_literals
 from builtins import range
 from builtins import super
 import unittest
-from steemengine.rpc import RPC
+from steemengine.rpc import RPC, RPCError, RPCErrorDoRetry, create_session, get_backoff_time
+from tests.helpers import Handler, LocalServer
+
+
+class RateLimitHandler(Handler):
+    """Replies with 429 to every other request, starting with the first"""
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        if len(self.requests) % 2 == 1:
+            self.reply(b"Too Many Requests", status=429, headers={"Retry-After": "0"})
+        else:
+            self.reply([{"symbol": "ENG"}])
+
+
+class UnavailableHandler(Handler):
+    """Replies with 503 to every request"""
+    requests = []
+
+    def do_POST(self):
+        self.read_json()
+        self.requests.append(self.path)
+        self.reply(b"Service Temporarily Unavailable", status=503)
 
 
 class Testcases(unittest.TestCase):
@@ -18,3 +41,65 @@ class Testcases(unittest.TestCase):
         rpc = RPC()
         result = rpc.getContract({"name": "token"}, endpoint="contracts")
         self.assertTrue(len(result) > 0)
+
+    def test_rpc_batch(self):
+        rpc = RPC()
+        with rpc.batch(endpoint="blockchain") as batch:
+            batch.getBlockInfo({"blockNumber": 1910})
+            batch.getBlockInfo({"blockNumber": 1911})
+        self.assertEqual(len(batch.results), 2)
+        self.assertEqual(batch.results[0]["blockNumber"], 1910)
+        self.assertEqual(batch.results[1]["blockNumber"], 1911)
+
+    def test_create_session(self):
+        session = create_session(pool_connections=2, pool_maxsize=20, num_retries=4)
+        adapter = session.get_adapter("https://api.steem-engine.com/rpc/")
+        self.assertEqual(adapter._pool_maxsize, 20)
+        self.assertEqual(adapter.max_retries.total, 4)
+        self.assertTrue(502 in adapter.max_retries.status_forcelist)
+
+    def test_check_for_server_error(self):
+        rpc = RPC()
+        with self.assertRaises(RPCErrorDoRetry) as cm:
+            rpc._check_for_server_error("<html>500 items</html>", status_code=502, node="http://node/", latency=0.5)
+        self.assertEqual(str(cm.exception), "Bad Gateway")
+        self.assertEqual(cm.exception.status_code, 502)
+        self.assertEqual(cm.exception.node, "http://node/")
+        self.assertTrue(cm.exception.retryable)
+        with self.assertRaises(RPCErrorDoRetry) as cm:
+            rpc._check_for_server_error("<html><title>503 Service Unavailable</title></html>", status_code=200)
+        self.assertEqual(cm.exception.status_code, 503)
+        with self.assertRaises(RPCError) as cm:
+            rpc._check_for_server_error("<html>500 items</html>", status_code=200)
+        self.assertFalse(cm.exception.retryable)
+        self.assertEqual(str(cm.exception), "Client returned invalid format. Expected JSON!")
+
+    def test_backoff_time(self):
+        for cnt in range(1, 10):
+            sleeptime = get_backoff_time(cnt, backoff_factor=0.5, max_backoff=10)
+            self.assertTrue(0 <= sleeptime <= min(0.5 * 2 ** cnt, 10))
+
+    def test_request_get_retry_after(self):
+        with LocalServer(RateLimitHandler) as server:
+            rpc = RPC(url=server.url + "rpc/", num_retries=0, backoff_factor=10)
+            ret = rpc.request_get(server.url + "history/accountHistory", {"account": "a b", "symbol": "ENG"})
+        self.assertEqual(ret, [{"symbol": "ENG"}])
+        self.assertEqual(len(RateLimitHandler.requests), 2)
+        self.assertTrue("account=a+b" in RateLimitHandler.requests[1])
+
+    def test_retry_layers(self):
+        with LocalServer(UnavailableHandler) as server:
+            url = server.url + "rpc/"
+            # calls are retried by the RPC, the session does not retry
+            rpc = RPC(url=url, num_retries_call=2, backoff_factor=0)
+            self.assertEqual(rpc.num_retries, 0)
+            with self.assertRaises(RPCErrorDoRetry):
+                rpc.getLatestBlockInfo(endpoint="blockchain")
+            self.assertEqual(len(UnavailableHandler.requests), 3)
+            # without call retries, the session retries the request
+            UnavailableHandler.requests = []
+            rpc = RPC(url=url, num_retries_call=0, backoff_factor=0)
+            self.assertEqual(rpc.num_retries, 3)
+            with self.assertRaises(RPCErrorDoRetry):
+                rpc.getLatestBlockInfo(endpoint="blockchain")
+            self.assertEqual(len(UnavailableHandler.requests), 4)
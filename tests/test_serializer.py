@@ -0,0 +1,29 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from steemengine.serializer import SERIALIZERS, get_serializer, set_serializer
+
+
+class Testcases(unittest.TestCase):
+    def test_serializers(self):
+        obj = {"method": "find", "params": {"query": {"symbol": "ENG"}, "memo": "ä"}, "id": 1}
+        for name in SERIALIZERS:
+            serializer = SERIALIZERS[name]()
+            data = serializer.dumps(obj)
+            self.assertTrue(isinstance(data, bytes))
+            self.assertEqual(serializer.loads(data), obj)
+            self.assertEqual(serializer.loads(data.decode("utf8")), obj)
+            self.assertEqual(serializer.loads('{"memo": "a\nb"}'), {"memo": "a\nb"})
+            with self.assertRaises(ValueError):
+                serializer.loads("<html>Bad Gateway</html>")
+
+    def test_set_serializer(self):
+        serializer = get_serializer()
+        set_serializer("json")
+        self.assertEqual(get_serializer().name, "json")
+        with self.assertRaises(ValueError):
+            set_serializer("not_existing")
+        set_serializer(serializer)
+        self.assertTrue(get_serializer() is serializer)
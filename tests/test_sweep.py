@@ -0,0 +1,83 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import decimal
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+from steemengine.actionbatch import ActionBatch
+from steemengine.sweep import plan_sweep, get_token_price, execute_sweep
+from steemengine.tokenobject import Token
+from tests.helpers import FakeSteem
+
+
+class TokenList(object):
+    def __init__(self, tokens):
+        self.tokens = dict((t["symbol"], Token(t, api=object())) for t in tokens)
+
+    def get_token(self, symbol):
+        return self.tokens.get(symbol)
+
+
+class SweepWallet(object):
+    account = "test"
+
+    def __init__(self):
+        self.steem = FakeSteem()
+
+    def batch(self):
+        return ActionBatch(self.account, steem_instance=self.steem)
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.wallet = [{"symbol": "ENG", "balance": "0.3", "stake": "2"},
+                       {"symbol": "BTC", "balance": "0", "stake": "0"},
+                       {"symbol": "DUST", "balance": "0.001"},
+                       {"symbol": "NOMARKET", "balance": "5"}]
+        self.tokens = TokenList([{"symbol": "ENG", "precision": 8, "stakingEnabled": True},
+                                 {"symbol": "BTC", "precision": 8, "stakingEnabled": False},
+                                 {"symbol": "DUST", "precision": 3, "stakingEnabled": False},
+                                 {"symbol": "NOMARKET", "precision": 0, "stakingEnabled": False}])
+        self.metrics = {"ENG": {"symbol": "ENG", "highestBid": "0.5", "lastPrice": "0.6"},
+                        "DUST": {"symbol": "DUST", "highestBid": "0", "lastPrice": "0.1"}}
+
+    def test_token_price(self):
+        self.assertEqual(get_token_price(self.metrics["ENG"]), "0.5")
+        self.assertEqual(get_token_price(self.metrics["DUST"]), "0.1")
+        self.assertTrue(get_token_price(None) is None)
+
+    def test_plan(self):
+        plan = plan_sweep("transfer", self.wallet, self.tokens, self.metrics)
+        self.assertEqual([e["symbol"] for e in plan], ["ENG", "DUST", "NOMARKET"])
+        self.assertEqual(plan[0]["amount"], decimal.Decimal("0.3"))
+        self.assertAlmostEqual(plan[0]["value"], 0.15)
+        self.assertTrue(plan[2]["value"] is None)
+        plan = plan_sweep("stake", self.wallet, self.tokens, self.metrics)
+        self.assertEqual([e["symbol"] for e in plan], ["ENG"])
+        plan = plan_sweep("unstake", self.wallet, self.tokens, self.metrics)
+        self.assertEqual(plan[0]["amount"], decimal.Decimal("2"))
+        plan = plan_sweep("sell", self.wallet, self.tokens, self.metrics)
+        self.assertEqual([e["symbol"] for e in plan], ["ENG"])
+        self.assertEqual(plan[0]["price"], "0.5")
+        with self.assertRaises(ValueError):
+            plan_sweep("burn", self.wallet, self.tokens, self.metrics)
+
+
+    def test_execute(self):
+        wallet = SweepWallet()
+        plan = plan_sweep("sell", self.wallet, self.tokens, self.metrics)
+        self.assertEqual(execute_sweep("sell", plan, wallet), [{"trx_num": 1}])
+        self.assertEqual(wallet.steem.broadcasts[-1], {"contractName": "market", "contractAction": "sell",
+                                                       "contractPayload": {"symbol": "ENG", "quantity": "0.30000000",
+                                                                           "price": "0.5"}})
+        plan = plan_sweep("transfer", self.wallet, self.tokens, self.metrics)
+        with mock.patch("steemengine.sweep.Account", return_value={"name": "test1"}):
+            execute_sweep("transfer", plan, wallet, to="test1", memo="sweep")
+        self.assertEqual([action["contractPayload"] for action in wallet.steem.broadcasts[-1]],
+                         [{"symbol": "ENG", "to": "test1", "quantity": "0.30000000", "memo": "sweep"},
+                          {"symbol": "DUST", "to": "test1", "quantity": "0.001", "memo": "sweep"},
+                          {"symbol": "NOMARKET", "to": "test1", "quantity": "5", "memo": "sweep"}])
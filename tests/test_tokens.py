@@ -11,3 +11,10 @@ class Testcases(unittest.TestCase):
         tokens = Tokens()
         self.assertTrue(tokens is not None)
         self.assertTrue(len(tokens) > 0)
+
+    def test_get_token(self):
+        tokens = Tokens()
+        token = tokens.get_token("eng")
+        self.assertEqual(token["symbol"], "ENG")
+        self.assertTrue(tokens.get_token("ENG") is token)
+        self.assertTrue(tokens.get_token("NOTEXISTING_TOKEN") is None)
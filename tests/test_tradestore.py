@@ -0,0 +1,137 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from steemengine.tradestore import TradeStore, NUMPY_AVAILABLE, get_trades_from_transaction, get_trade_id
+
+
+class TradesApi(object):
+    def __init__(self, trades):
+        self.trades = trades
+
+    def find(self, contract_name, table_name, query={}, limit=1000, offset=0, indexes=[]):
+        trades = sorted(self.trades, key=lambda t: t["_id"], reverse=True)
+        return trades[offset:offset + limit]
+
+
+def make_trade(i, timestamp, price, quantity):
+    return {"_id": i, "type": "buy", "symbol": "ENG", "timestamp": timestamp, "price": str(price),
+            "quantity": str(quantity)}
+
+
+class BlockSource(object):
+    def __init__(self, blocks):
+        self.blocks_list = blocks
+        self.starts = []
+
+    def blocks(self, start=None, stop=None):
+        self.starts.append(start)
+        for block in self.blocks_list:
+            if start <= block["blockNumber"] <= stop:
+                yield block
+
+
+def buy_trx(trx_id, buyer, fills):
+    events = []
+    for seller, quantity, steem_quantity in fills:
+        events.append({"contract": "tokens", "event": "transferFromContract",
+                       "data": {"from": "market", "to": buyer, "symbol": "ENG", "quantity": quantity}})
+        events.append({"contract": "tokens", "event": "transferFromContract",
+                       "data": {"from": "market", "to": seller, "symbol": "STEEMP", "quantity": steem_quantity}})
+    return {"contract": "market", "action": "buy", "sender": buyer, "transactionId": trx_id,
+            "payload": json.dumps({"symbol": "ENG", "quantity": "3", "price": "1"}),
+            "logs": json.dumps({"events": events})}
+
+
+@unittest.skipIf(not NUMPY_AVAILABLE, "numpy is not installed")
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_sync_and_ohlcv(self):
+        api = TradesApi([make_trade(i, 1000 + i * 30, 1 + i, 1) for i in range(5)])
+        store = TradeStore("eng", directory=self.tmp_dir, api=api)
+        self.assertEqual(store.sync_history(page_size=2), 5)
+        self.assertEqual(store.sync_history(page_size=2), 0)
+        api.trades.append(make_trade(5, 1150, 10, 2))
+        self.assertEqual(store.sync_history(page_size=2), 1)
+        self.assertEqual(len(store), 6)
+
+        candles = store.ohlcv(60)
+        self.assertEqual(list(candles["timestamp"]), [960, 1020, 1080, 1140])
+        self.assertEqual(list(candles["trades"]), [1, 2, 2, 1])
+        self.assertEqual(candles["open"][1], 2)
+        self.assertEqual(candles["close"][1], 3)
+        self.assertEqual(candles["high"][2], 5)
+        self.assertEqual(candles["low"][2], 4)
+        self.assertEqual(candles["volume"][3], 2)
+        self.assertAlmostEqual(candles["vwap"][1], 2.5)
+        self.assertEqual(len(store.ohlcv(60, start=1060, end=1140)), 2)
+        self.assertAlmostEqual(store.vwap(), (1 + 2 + 3 + 4 + 5 + 20) / 7.)
+
+    def test_trades_from_transaction(self):
+        events = [{"contract": "tokens", "event": "transferToContract",
+                   "data": {"from": "buyer", "to": "market", "symbol": "STEEMP", "quantity": "3"}},
+                  {"contract": "tokens", "event": "transferFromContract",
+                   "data": {"from": "market", "to": "buyer", "symbol": "ENG", "quantity": "2"}},
+                  {"contract": "tokens", "event": "transferFromContract",
+                   "data": {"from": "market", "to": "seller", "symbol": "STEEMP", "quantity": "1"}},
+                  {"contract": "tokens", "event": "transferFromContract",
+                   "data": {"from": "market", "to": "buyer", "symbol": "ENG", "quantity": "1"}},
+                  {"contract": "tokens", "event": "transferFromContract",
+                   "data": {"from": "market", "to": "seller2", "symbol": "STEEMP", "quantity": "0.6"}}]
+        trx = {"contract": "market", "action": "buy", "sender": "buyer",
+               "payload": json.dumps({"symbol": "ENG", "quantity": "3", "price": "1"}),
+               "logs": json.dumps({"events": events}), "timestamp": "2019-06-01T00:00:30"}
+        trades = get_trades_from_transaction(trx)
+        self.assertEqual(len(trades), 2)
+        self.assertAlmostEqual(trades[0][0], 0.5)
+        self.assertAlmostEqual(trades[1][0], 0.6)
+        store = TradeStore("ENG", directory=self.tmp_dir, api=object())
+        self.assertEqual(store.apply_transaction(trx), 2)
+        self.assertEqual(store.get_trades()["timestamp"][0], 1559347230)
+
+
+    def test_sync_same_second(self):
+        store = TradeStore("ENG", directory=self.tmp_dir, api=TradesApi([]))
+        trx = buy_trx("t1", "buyer", [("seller", "1", "1")])
+        self.assertEqual(store.apply_transaction(trx, timestamp=1000), 1)
+        self.assertEqual(store.apply_transaction(trx, timestamp=1000), 0)
+        store.api.trades = [make_trade(7, 990, 1, 1), make_trade(8, 1000, 2, 1), make_trade(9, 1000, 3, 1)]
+        self.assertEqual(store.sync_history(page_size=2), 2)
+        self.assertEqual(store.get_last_history_id(), 9)
+        store.api.trades.append(make_trade(10, 1000, 4, 1))
+        self.assertEqual(store.sync_history(page_size=2), 1)
+        self.assertEqual(list(store.get_trades()["price"]), [1, 2, 3, 4])
+
+    def test_stream_checkpoint(self):
+        path = os.path.join(self.tmp_dir, "checkpoints.json")
+        blocks = [{"blockNumber": 10, "timestamp": "2019-06-01T00:00:00",
+                   "transactions": [buy_trx("t1", "buyer", [("s1", "1", "0.5"), ("s2", "1", "0.6")])]},
+                  {"blockNumber": 11, "timestamp": "2019-06-01T00:00:03",
+                   "transactions": [buy_trx("t2", "buyer", [("s1", "2", "1")])]},
+                  {"blockNumber": 12, "timestamp": "2019-06-01T00:00:03", "transactions": []}]
+        source = BlockSource(blocks)
+        store = TradeStore("ENG", directory=self.tmp_dir, api=object(), checkpoint_store=path)
+        self.assertEqual([trx["transactionId"] for trx in store.stream(blockchain=source, start=10, stop=11)],
+                         ["t1", "t2"])
+        self.assertEqual(list(store.get_trades()["id"]), [get_trade_id("t1", 0), get_trade_id("t1", 1),
+                                                          get_trade_id("t2", 0)])
+
+        store = TradeStore("ENG", directory=self.tmp_dir, api=object(), checkpoint_store=path)
+        self.assertEqual(store.block_num, 11)
+        list(store.stream(blockchain=source, stop=12))
+        self.assertEqual(source.starts[-1], 12)
+        # block 11 is streamed again, its trade is already stored
+        self.assertEqual(list(store.stream(blockchain=source, start=11, stop=12)), [])
+        self.assertEqual(len(store), 3)
+        store.reset()
+        self.assertTrue(TradeStore("ENG", directory=self.tmp_dir, api=object(), checkpoint_store=path).block_num is None)
@@ -0,0 +1,44 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import unittest
+from steemengine.transaction import Transaction
+
+
+class Testcases(unittest.TestCase):
+    def test_transaction(self):
+        trx = Transaction({"contract": "tokens", "action": "transfer",
+                           "payload": '{"symbol": "ENG", "to": "test", "quantity": "1"}',
+                           "logs": '{"events": []}'})
+        self.assertEqual(trx["contract"], "tokens")
+        self.assertEqual(trx.payload["symbol"], "ENG")
+        self.assertTrue(trx.payload is trx.payload)
+        self.assertEqual(trx.logs, {"events": []})
+        self.assertEqual(json.loads(json.dumps(trx))["logs"], '{"events": []}')
+        trx["payload"] = '{"symbol": "BTC"}'
+        self.assertEqual(trx.payload["symbol"], "BTC")
+
+    def test_empty_payload(self):
+        trx = Transaction({"payload": "", "logs": None})
+        self.assertTrue(trx.payload is None)
+        self.assertTrue(trx.logs is None)
+
+    def test_cache_reset(self):
+        trx = Transaction({"payload": '{"symbol": "ENG"}', "logs": '{"events": []}'})
+        self.assertEqual(trx.payload["symbol"], "ENG")
+        trx.update({"payload": '{"symbol": "BTC"}'})
+        self.assertEqual(trx.payload["symbol"], "BTC")
+        trx.update(logs='{"errors": ["failed"]}')
+        self.assertEqual(trx.logs, {"errors": ["failed"]})
+        del trx["payload"]
+        self.assertTrue(trx.payload is None)
+        trx.setdefault("payload", '{"symbol": "STEEMP"}')
+        self.assertEqual(trx.payload["symbol"], "STEEMP")
+        trx.setdefault("payload", '{"symbol": "ENG"}')
+        self.assertEqual(trx.payload["symbol"], "STEEMP")
+        trx.pop("logs")
+        self.assertTrue(trx.logs is None)
+        trx.clear()
+        self.assertTrue(trx.payload is None)
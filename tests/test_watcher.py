@@ -0,0 +1,82 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from steemengine.watcher import TransferWatcher
+
+
+def make_transfer(sender, to, symbol, quantity, memo="", errors=False):
+    logs = {"errors": ["overdrawn balance"]} if errors else {"events": []}
+    return {"contract": "tokens", "action": "transfer", "sender": sender, "transactionId": "%s-%s" % (sender, to),
+            "payload": json.dumps({"symbol": symbol, "to": to, "quantity": quantity, "memo": memo}),
+            "logs": json.dumps(logs)}
+
+
+class FakeBlockchain(object):
+    def __init__(self, blocks):
+        self.blocks_by_num = dict((block["blockNumber"], block) for block in blocks)
+        self.starts = []
+
+    def blocks(self, start=None, stop=None):
+        self.starts.append(start)
+        if start is None:
+            start = min(self.blocks_by_num)
+        if stop is None:
+            stop = max(self.blocks_by_num)
+        for block_num in range(start, stop + 1):
+            yield self.blocks_by_num[block_num]
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        market_trx = {"contract": "market", "action": "buy", "sender": "a", "payload": "{}", "logs": "{}"}
+        self.blockchain = FakeBlockchain([
+            {"blockNumber": 1, "timestamp": "2019-06-01T12:00:00",
+             "transactions": [make_transfer("a", "bot", "ENG", "1", "memo1"), market_trx,
+                              make_transfer("b", "other", "ENG", "2")]},
+            {"blockNumber": 2, "timestamp": "2019-06-01T12:00:03",
+             "transactions": [make_transfer("c", "bot", "BTC", "3"),
+                              make_transfer("d", "bot", "eng", "4", errors=True)]},
+            {"blockNumber": 3, "timestamp": "2019-06-01T12:00:06", "transactions": []},
+            {"blockNumber": 4, "timestamp": "2019-06-01T12:00:09",
+             "transactions": [make_transfer("e", "bot", "ENG", "5")]}])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_filter(self):
+        watcher = TransferWatcher(["bot"], ["eng"], api=object())
+        transfers = list(watcher.stream(blockchain=self.blockchain))
+        self.assertEqual([t["from"] for t in transfers], ["a", "e"])
+        self.assertEqual(transfers[0]["memo"], "memo1")
+        self.assertEqual(transfers[0]["blockNumber"], 1)
+        self.assertEqual(watcher.block_num, 4)
+        watcher = TransferWatcher(api=object())
+        watcher.add_symbol("btc")
+        transfers = list(watcher.stream(blockchain=self.blockchain))
+        self.assertEqual([t["symbol"] for t in transfers], ["BTC"])
+        watcher = TransferWatcher(symbols=["ENG"], api=object())
+        transfers = list(watcher.stream(blockchain=self.blockchain))
+        self.assertEqual([t["to"] for t in transfers], ["bot", "other", "bot"])
+
+    def test_checkpoint(self):
+        path = os.path.join(self.tmp_dir, "watcher.json")
+        watcher = TransferWatcher(["bot"], ["ENG"], api=object(), checkpoint_store=path)
+        received = []
+        watcher.add_callback(received.append)
+        watcher.run(blockchain=self.blockchain, stop=2)
+        self.assertEqual([t["from"] for t in received], ["a"])
+        watcher = TransferWatcher(["bot"], ["ENG"], api=object(), checkpoint_store=path)
+        self.assertEqual(watcher.block_num, 2)
+        watcher.add_callback(received.append)
+        watcher.run(blockchain=self.blockchain)
+        self.assertEqual(self.blockchain.starts[-1], 3)
+        self.assertEqual([t["from"] for t in received], ["a", "e"])
+        watcher.reset()
+        self.assertTrue(TransferWatcher(api=object(), checkpoint_store=path).block_num is None)